@@ -4,5 +4,8 @@ Face Recognition for Team Authentication
 """
 
 from .face_auth_manager import FaceAuthManager
+from .face_embedding_index import FaceEmbeddingIndex
+from .face_ann_index import IVFIndex
+from .face_recognizer import FaceRecognizer, get_face_recognizer
 
-__all__ = ['FaceAuthManager']
\ No newline at end of file
+__all__ = ['FaceAuthManager', 'FaceEmbeddingIndex', 'IVFIndex', 'FaceRecognizer', 'get_face_recognizer']
\ No newline at end of file
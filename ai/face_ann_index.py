@@ -0,0 +1,153 @@
+"""
+MedLink Face ANN Index
+Inverted-file (IVF) approximate nearest-neighbour search over normalized
+face embeddings - NumPy only. A spherical k-means coarse quantizer splits
+the gallery into nlist cells; a query is only compared with the photos in
+its nprobe closest cells (higher nprobe = better recall, slower)
+"""
+
+import numpy as np
+
+
+class IVFIndex:
+    """IVF index over the rows of an external embedding matrix"""
+
+    def __init__(self, dim=512, nlist=None, nprobe=8, kmeans_iterations=10, seed=0):
+        """
+        Args:
+            dim: Embedding size
+            nlist: Number of cells (default: 4 * sqrt(gallery size) at training)
+            nprobe: Cells searched per query
+            kmeans_iterations: Training iterations
+            seed: Random seed for training
+        """
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.kmeans_iterations = kmeans_iterations
+        self.seed = seed
+
+        self.centroids = None                    # (nlist, dim), normalized
+        self.assign = np.zeros(0, dtype=np.int32)  # Cell of every matrix row
+        self.trained_size = 0
+        self._lists = None                       # Cached row ids per cell
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    # ==================== TRAINING ====================
+
+    def train(self, matrix):
+        """
+        Fit the coarse quantizer and assign every row
+
+        Args:
+            matrix: (N, dim) normalized embeddings
+        """
+        n = len(matrix)
+        if n == 0:
+            self.centroids = None
+            self.assign = np.zeros(0, dtype=np.int32)
+            self._lists = None
+            return
+
+        nlist = self.nlist or max(1, int(4 * np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(self.seed)
+
+        # Train on at most 256 points per cell
+        sample = matrix[rng.choice(n, size=min(n, nlist * 256), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(self.kmeans_iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+
+            empty = counts == 0
+            if empty.any():
+                # Re-seed empty cells with random points
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.maximum(norms, 1e-12)
+
+        self.centroids = centroids.astype(np.float32)
+        self.assign = self._nearest_cells(matrix)
+        self.trained_size = n
+        self._lists = None
+
+    def load_centroids(self, centroids, matrix):
+        """Reuse persisted centroids and assign the current rows"""
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.assign = self._nearest_cells(matrix)
+        self.trained_size = len(matrix)
+        self._lists = None
+
+    def needs_training(self, size, growth=4):
+        """True when untrained or the gallery grew growth-fold since training"""
+        return not self.is_trained or size > growth * max(self.trained_size, 1)
+
+    def _nearest_cells(self, vectors):
+        if len(vectors) == 0:
+            return np.zeros(0, dtype=np.int32)
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    # ==================== UPDATES ====================
+
+    def add(self, vectors):
+        """Assign new rows appended at the end of the matrix"""
+        vectors = np.atleast_2d(vectors)
+        self.assign = np.concatenate([self.assign, self._nearest_cells(vectors)])
+        self._lists = None
+
+    def update(self, row, vector):
+        """Re-assign a replaced row"""
+        self.assign[row] = self._nearest_cells(np.atleast_2d(vector))[0]
+        self._lists = None
+
+    def remove(self, keep_mask):
+        """Drop rows (same boolean mask applied to the matrix)"""
+        self.assign = self.assign[keep_mask]
+        self._lists = None
+
+    def _cell_lists(self):
+        if self._lists is None:
+            order = np.argsort(self.assign, kind='stable')
+            bounds = np.searchsorted(self.assign[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+        return self._lists
+
+    # ==================== SEARCH ====================
+
+    def search(self, matrix, query, k=1, nprobe=None):
+        """
+        Approximate top-k by cosine similarity
+
+        Args:
+            matrix: (N, dim) normalized embeddings (the rows this index covers)
+            query: (dim,) normalized query
+            k: Results wanted
+            nprobe: Cells to search (default: self.nprobe)
+
+        Returns:
+            tuple: (row ids, similarities), best first
+        """
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        cell_scores = self.centroids @ query
+        if nprobe < len(cell_scores):
+            cells = np.argpartition(-cell_scores, nprobe - 1)[:nprobe]
+        else:
+            cells = np.arange(len(cell_scores))
+
+        lists = self._cell_lists()
+        candidates = np.concatenate([lists[c] for c in cells])
+        if len(candidates) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        scores = matrix[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return candidates[top], scores[top]
@@ -4,13 +4,24 @@ Enhanced with live camera preview, real-time status, and animations
 """
 
 import customtkinter as ctk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, TclError
 from PIL import Image, ImageTk
 import cv2
-import threading
-import time
 import os
-from face_auth_manager import FaceAuthManager
+import threading
+from face_recognizer import get_face_recognizer
+
+
+def _call_in_ui(widget, fn):
+    """
+    Schedule fn on the Tk main thread from a recognizer callback
+    Dropped if the dialog was closed before the worker finished.
+    """
+    try:
+        if widget.winfo_exists():
+            widget.after(0, fn)
+    except (TclError, RuntimeError):
+        pass  # Window destroyed / main loop gone
 
 
 class FaceRegistrationDialog(ctk.CTkToplevel):
@@ -23,7 +34,9 @@ class FaceRegistrationDialog(ctk.CTkToplevel):
         self.geometry("600x750")
         self.resizable(False, False)
         
-        self.face_manager = FaceAuthManager()
+        # Shared warm recognizer - registrations update its gallery
+        self.recognizer = get_face_recognizer()
+        self.face_manager = self.recognizer.manager
         self.selected_photo = None
         
         self._create_widgets()
@@ -433,19 +446,17 @@ class FaceRegistrationDialog(ctk.CTkToplevel):
         self.register_btn.configure(state="disabled", text="⏳ Registering...")
         self.update()
         
-        # Register in thread
-        def register():
-            result = self.face_manager.register_team_member(
-                username=username,
-                full_name=fullname,
-                role=role,
-                photo_path=self.selected_photo
-            )
-            
-            self.after(0, lambda: self._handle_registration_result(result))
-        
-        thread = threading.Thread(target=register, daemon=True)
-        thread.start()
+        # Register on the recognizer thread (model already loaded there)
+        future = self.recognizer.submit(
+            self.face_manager.register_team_member,
+            username=username,
+            full_name=fullname,
+            role=role,
+            photo_path=self.selected_photo
+        )
+        future.add_done_callback(
+            lambda f: _call_in_ui(self, lambda: self._handle_registration_result(self.recognizer._result_or_error(f)))
+        )
     
     def _handle_registration_result(self, result):
         """Handle registration result"""
@@ -476,15 +487,22 @@ class FaceLoginDialog(ctk.CTkToplevel):
         self.geometry("720x850")
         self.resizable(False, False)
         
-        self.face_manager = FaceAuthManager()
+        self.recognizer = get_face_recognizer()
+        self.face_manager = self.recognizer.manager
         self.on_success_callback = on_success_callback
         
         self.cap = None
         self.is_scanning = False
         self.preview_running = False
+        self.camera_error = False
+        self.last_frame = None  # Latest BGR preview frame (used for scanning)
+        self.scan_cancel = threading.Event()
         
         self._create_widgets()
         
+        # Scan button follows the recognizer warm-up
+        self.recognizer.add_listener(self._on_recognizer_state)
+        
         # Center window
         self.update_idletasks()
         x = (self.winfo_screenwidth() // 2) - (720 // 2)
@@ -597,12 +615,39 @@ class FaceLoginDialog(ctk.CTkToplevel):
         )
         users_label.pack()
     
+    def _on_recognizer_state(self, state, message):
+        """Recognizer state change (called from the recognizer thread)"""
+        _call_in_ui(self, lambda: self._show_recognizer_state(state, message))
+    
+    def _show_recognizer_state(self, state, message):
+        """Show model readiness while not scanning"""
+        if self.is_scanning or not self.winfo_exists():
+            return
+        
+        if state == "ready":
+            self.status_icon.configure(text="⏺", text_color="gray")
+            self.status_label.configure(text="Ready to scan", text_color="gray")
+            self.details_label.configure(text="Press 'Scan Face' to begin", text_color="gray")
+            if not self.camera_error:
+                self.scan_btn.configure(state="normal", text="📷 Scan Face")
+        elif state == "error":
+            self.status_icon.configure(text="❌", text_color="red")
+            self.status_label.configure(text="Recognition Unavailable", text_color="red")
+            self.details_label.configure(text=message, text_color="red")
+            self.scan_btn.configure(state="disabled")
+        else:
+            self.status_icon.configure(text="⏳", text_color="yellow")
+            self.status_label.configure(text="Starting up...", text_color="yellow")
+            self.details_label.configure(text=message, text_color="yellow")
+            self.scan_btn.configure(state="disabled", text="⏳ Loading model...")
+    
     def start_preview(self):
         """Start live camera preview"""
         try:
             self.cap = cv2.VideoCapture(0)
             
             if not self.cap.isOpened():
+                self.camera_error = True
                 self.preview_label.configure(
                     text="❌ Camera not available\n\nPlease check your webcam connection",
                     font=("Arial", 16, "bold"),
@@ -617,6 +662,7 @@ class FaceLoginDialog(ctk.CTkToplevel):
             self.update_preview()
             
         except Exception as e:
+            self.camera_error = True
             self.preview_label.configure(
                 text=f"❌ Camera Error\n\n{str(e)}",
                 font=("Arial", 14),
@@ -633,6 +679,8 @@ class FaceLoginDialog(ctk.CTkToplevel):
             ret, frame = self.cap.read()
             
             if ret:
+                self.last_frame = frame
+                
                 # Convert BGR to RGB
                 frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
                 
@@ -731,17 +779,32 @@ class FaceLoginDialog(ctk.CTkToplevel):
         self.scan_btn.configure(state="disabled", text="⏳ Processing...")
         self.update()
         
-        # Run recognition in thread
-        def recognize():
-            time.sleep(1.5)  # Give time to see "searching" message
-            
-            result = self.face_manager.recognize_from_webcam()
-            
-            # Update UI in main thread
-            self.after(0, lambda: self._handle_result(result))
-        
-        thread = threading.Thread(target=recognize, daemon=True)
-        thread.start()
+        # Run recognition on the warm recognizer thread, update UI in main thread
+        on_result = lambda result: _call_in_ui(self, lambda: self._handle_result(result))
+        
+        if self.preview_running:
+            # Score live preview frames until enough agree (camera is ours)
+            self.scan_cancel.clear()
+            self.recognizer.recognize_stream_async(
+                lambda: self.last_frame,
+                callback=on_result,
+                on_progress=lambda progress: _call_in_ui(self, lambda: self._show_progress(progress)),
+                cancel=self.scan_cancel
+            )
+        else:
+            self.recognizer.recognize_async(callback=on_result)
+    
+    def _show_progress(self, progress):
+        """Show streaming recognition progress"""
+        if not self.is_scanning:
+            return
+        if progress["votes"]:
+            text = f"Matching... {progress['votes']}/{progress['votes_required']} frames agree"
+        elif progress["last_skip"]:
+            text = progress["last_skip"]
+        else:
+            text = "Analyzing face features..."
+        self.details_label.configure(text=text, text_color="yellow")
     
     def _handle_result(self, result):
         """Handle recognition result"""
@@ -828,6 +891,8 @@ class FaceLoginDialog(ctk.CTkToplevel):
     def on_closing(self):
         """Clean up when closing"""
         self.preview_running = False
+        self.scan_cancel.set()
+        self.recognizer.remove_listener(self._on_recognizer_state)
         
         if self.cap is not None:
             self.cap.release()
@@ -845,6 +910,9 @@ if __name__ == "__main__":
     app.geometry("500x400")
     app.title("🎭 MedLink Face Recognition Test")
     
+    # Load the face model in the background while the window opens
+    get_face_recognizer()
+    
     # Title
     title = ctk.CTkLabel(
         app,
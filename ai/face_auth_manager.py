@@ -10,6 +10,60 @@ import json
 from datetime import datetime
 from pathlib import Path
 import shutil
+import time
+from collections import deque
+
+try:
+    from .face_embedding_index import FaceEmbeddingIndex
+except ImportError:
+    from face_embedding_index import FaceEmbeddingIndex
+
+MODEL_NAME = "Facenet512"
+MATCH_THRESHOLD = 0.6  # Cosine distance (same as the DeepFace.find check before)
+
+# Streaming recognition (recognize_stream)
+STREAM_VOTES_REQUIRED = 3   # K frames that must agree ...
+STREAM_WINDOW = 5           # ... among the last N scored frames
+STREAM_TIME_BUDGET = 4.0    # seconds before giving up
+MIN_SHARPNESS = 60.0        # Variance of Laplacian - blurrier frames are skipped
+
+# Approximate search for large galleries (see face_ann_index.py)
+ANN_MIN_GALLERY = 2000      # Photos before the IVF index is used (None = always exact)
+ANN_NPROBE = 16             # Cells searched per query - raise for recall, lower for speed
+ANN_NLIST = None            # Cells (None = 4 * sqrt(gallery size))
+
+
+def largest_face(img, enforce_detection=False):
+    """
+    Facenet512 representation of the largest face in an image
+    (shared by FaceAuthManager and the bulk enrollment workers)
+    
+    Args:
+        img: Image path or BGR numpy array
+        enforce_detection: Return None unless the detector finds a face
+                           (otherwise the whole image is embedded)
+    
+    Returns:
+        dict: DeepFace face ('embedding', 'facial_area', ...) or None if no face was found
+    """
+    try:
+        faces = DeepFace.represent(
+            img_path=img,
+            model_name=MODEL_NAME,
+            enforce_detection=enforce_detection,
+            detector_backend='opencv'
+        )
+    except ValueError:
+        if enforce_detection:
+            return None  # No face detected
+        raise
+    if not faces:
+        return None
+    return max(
+        faces,
+        key=lambda face: face.get("facial_area", {}).get("w", 0) * face.get("facial_area", {}).get("h", 0)
+    )
+
 
 class FaceAuthManager:
     def __init__(self, base_path="data"):
@@ -25,6 +79,19 @@ class FaceAuthManager:
         # Load configuration
         self.config = self._load_config()
         
+        # Precomputed gallery embeddings (synced with team_faces on first use)
+        self.embeddings = FaceEmbeddingIndex(
+            self.base_path,
+            model_name=MODEL_NAME,
+            ann_min_size=ANN_MIN_GALLERY,
+            ann_nprobe=ANN_NPROBE,
+            ann_nlist=ANN_NLIST
+        )
+        self._embeddings_synced = False
+        
+        # Webcams opened by recognize_from_webcam (reused across attempts)
+        self._cameras = {}
+        
     def _load_config(self):
         """Load face recognition configuration"""
         if self.config_file.exists():
@@ -40,6 +107,58 @@ class FaceAuthManager:
         with open(self.config_file, 'w', encoding='utf-8') as f:
             json.dump(self.config, f, indent=4, ensure_ascii=False)
     
+    def _embed(self, img, enforce_detection=False):
+        """
+        Facenet512 embedding of the largest face in an image
+        
+        Args:
+            img: Image path or BGR numpy array
+            enforce_detection: Return None unless the detector finds a face
+                               (otherwise the whole image is embedded)
+        
+        Returns:
+            list: Embedding or None if no face was found
+        """
+        face = largest_face(img, enforce_detection)
+        return face["embedding"] if face else None
+    
+    def bulk_enroll(self, source, workers=None, progress=None):
+        """
+        Enroll many team members from a CSV file or photo directory
+        (detection, quality checks and embeddings run in a process pool)
+        
+        Args:
+            source: CSV (username,full_name,role,photos) or <dir>/<username>/ folders
+            workers: Worker processes (default: min(4, CPU count); 0 = no pool)
+            progress: Optional callback(done, total)
+        
+        Returns:
+            dict: enrolled, photos_added, failures (per photo), seconds
+        """
+        try:
+            from .face_bulk_enroll import bulk_enroll
+        except ImportError:
+            from face_bulk_enroll import bulk_enroll
+        return bulk_enroll(self, source, workers=workers, progress=progress)
+    
+    def _ensure_embeddings(self):
+        """Embed photos missing from the gallery (once per process)"""
+        if not self._embeddings_synced:
+            added, removed = self.embeddings.sync(self.faces_db, lambda path: self._embed(str(path)))
+            if added or removed:
+                print(f"🎭 Face gallery updated: +{added} / -{removed} photos")
+            self._embeddings_synced = True
+    
+    def _index_photo(self, username, photo_path):
+        """Add one stored photo to the embedding gallery (retried by the next sync on failure)"""
+        try:
+            embedding = self._embed(str(photo_path))
+            if embedding is not None:
+                self.embeddings.add(username, Path(photo_path).name, embedding)
+                self.embeddings.train_ann()
+        except Exception as e:
+            print(f"⚠️ Could not embed {photo_path}: {e}")
+    
     def register_team_member(self, username, full_name, role, photo_path):
         """
         Register a new team member with their face
@@ -81,6 +200,7 @@ class FaceAuthManager:
             photo_name = f"{username}_main.jpg"
             destination = user_folder / photo_name
             shutil.copy(photo_path, destination)
+            self._index_photo(username, destination)
             
             # Save user config
             self.config[username] = {
@@ -119,6 +239,7 @@ class FaceAuthManager:
             photo_name = f"{username}_{photo_count + 1}.jpg"
             destination = user_folder / photo_name
             shutil.copy(photo_path, destination)
+            self._index_photo(username, destination)
             
             # Update config
             self.config[username]["photo_count"] = photo_count + 1
@@ -135,6 +256,47 @@ class FaceAuthManager:
                 "message": f"❌ Error: {str(e)}"
             }
     
+    def _get_camera(self, camera_index=0):
+        """Opened cv2.VideoCapture for camera_index (kept open between calls)"""
+        cap = self._cameras.get(camera_index)
+        if cap is None or not cap.isOpened():
+            cap = cv2.VideoCapture(camera_index)
+            if not cap.isOpened():
+                cap.release()
+                return None
+            self._cameras[camera_index] = cap
+        return cap
+    
+    def release_camera(self, camera_index=None):
+        """Release one (or every) camera kept open by recognize_from_webcam"""
+        indexes = list(self._cameras) if camera_index is None else [camera_index]
+        for index in indexes:
+            cap = self._cameras.pop(index, None)
+            if cap is not None:
+                cap.release()
+    
+    def capture_frame(self, camera_index=0):
+        """
+        Read one BGR frame from the (reused) webcam
+        
+        Returns:
+            numpy.ndarray: Frame or None
+        """
+        cap = self._get_camera(camera_index)
+        if cap is None:
+            return None
+        
+        ret, frame = cap.read()
+        if not ret:
+            # Camera went away (unplugged / sleep) - reopen once
+            self.release_camera(camera_index)
+            cap = self._get_camera(camera_index)
+            if cap is None:
+                return None
+            ret, frame = cap.read()
+        
+        return frame if ret else None
+    
     def recognize_from_webcam(self, camera_index=0):
         """
         Recognize team member from webcam
@@ -145,8 +307,6 @@ class FaceAuthManager:
         Returns:
             dict: Recognition result with username and confidence
         """
-        temp_photo = self.base_path / "temp_face.jpg"
-        
         try:
             # Check if database is empty
             if not self.config:
@@ -155,64 +315,59 @@ class FaceAuthManager:
                     "message": "❌ No team members registered yet!"
                 }
             
-            # Capture frame from webcam
-            cap = cv2.VideoCapture(camera_index)
-            
-            if not cap.isOpened():
+            # Capture frame from webcam (camera stays open for the next attempt)
+            if self._get_camera(camera_index) is None:
                 return {
                     "success": False,
                     "message": "❌ Could not open webcam!"
                 }
             
-            # Read frame
-            ret, frame = cap.read()
-            cap.release()
+            frame = self.capture_frame(camera_index)
             
-            if not ret:
+            if frame is None:
                 return {
                     "success": False,
                     "message": "❌ Could not capture frame!"
                 }
             
-            # Save temporary frame
-            cv2.imwrite(str(temp_photo), frame)
+            return self.recognize_frame(frame)
+                
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"❌ Error: {str(e)}"
+            }
+    
+    def recognize_frame(self, frame):
+        """
+        Recognize team member in an in-memory frame (no temp files)
+        
+        Args:
+            frame: BGR numpy array (as returned by cv2.VideoCapture.read)
+        
+        Returns:
+            dict: Recognition result with username and confidence
+        """
+        try:
+            # Check if database is empty
+            if not self.config:
+                return {
+                    "success": False,
+                    "message": "❌ No team members registered yet!"
+                }
             
-            # Find matching face
-            result = DeepFace.find(
-                img_path=str(temp_photo),
-                db_path=str(self.faces_db),
-                model_name="Facenet512",
-                enforce_detection=False,
-                silent=True
-            )
+            # Embed the captured face and match it against the gallery
+            self._ensure_embeddings()
+            embedding = self._embed(frame)
             
-            # Clean up temp file
-            if temp_photo.exists():
-                temp_photo.unlink()
+            best_match = self.embeddings.match(embedding) if embedding is not None else None
             
             # Check if any matches found
-            if len(result) > 0 and len(result[0]) > 0:
-                # Get best match
-                best_match = result[0].iloc[0]
-                matched_path = Path(best_match['identity'])
-                username = matched_path.parent.name
-                
-                # Get user info
-                user_info = self.config.get(username, {})
+            if best_match is not None:
+                username, _, distance = best_match
                 
-                # Distance < 0.4 is considered a good match for Facenet512
-                confidence = 1 - (best_match['distance'] / 1.5)
-                confidence = max(0, min(1, confidence)) * 100  # Convert to percentage
-                
-                if best_match['distance'] < 0.6:  # Good match threshold
-                    return {
-                        "success": True,
-                        "username": username,
-                        "full_name": user_info.get("full_name", username),
-                        "role": user_info.get("role", "unknown"),
-                        "confidence": round(confidence, 2),
-                        "message": f"✅ Welcome {user_info.get('full_name', username)}!"
-                    }
+                if distance < MATCH_THRESHOLD:  # Good match threshold
+                    return self._welcome(username, self._confidence(distance))
                 else:
                     return {
                         "success": False,
@@ -225,15 +380,129 @@ class FaceAuthManager:
                 }
                 
         except Exception as e:
-            # Clean up temp file if exists
-            if temp_photo.exists():
-                temp_photo.unlink()
-            
             return {
                 "success": False,
                 "message": f"❌ Error: {str(e)}"
             }
     
+    @staticmethod
+    def _confidence(distance):
+        """Cosine distance -> confidence percentage"""
+        # Distance < 0.4 is considered a good match for Facenet512
+        confidence = 1 - (distance / 1.5)
+        return max(0, min(1, confidence)) * 100  # Convert to percentage
+    
+    def _welcome(self, username, confidence):
+        """Successful recognition result"""
+        user_info = self.config.get(username, {})
+        return {
+            "success": True,
+            "username": username,
+            "full_name": user_info.get("full_name", username),
+            "role": user_info.get("role", "unknown"),
+            "confidence": round(confidence, 2),
+            "message": f"✅ Welcome {user_info.get('full_name', username)}!"
+        }
+    
+    @staticmethod
+    def frame_sharpness(frame):
+        """Variance of the Laplacian of a BGR frame (low = blurred)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.Laplacian(gray, cv2.CV_64F).var()
+    
+    def recognize_stream(self, get_frame, votes_required=STREAM_VOTES_REQUIRED,
+                         window=STREAM_WINDOW, time_budget=STREAM_TIME_BUDGET,
+                         min_sharpness=MIN_SHARPNESS, on_progress=None, cancel=None):
+        """
+        Recognize over successive frames with early exit
+        
+        Frames without a detected face or below min_sharpness are skipped.
+        Accepts as soon as votes_required of the last `window` scored frames
+        match the same user below MATCH_THRESHOLD.
+        
+        Args:
+            get_frame: Callable returning the latest BGR frame (or None)
+            votes_required: K agreeing frames needed
+            window: N most recent scored frames considered
+            time_budget: Seconds before giving up
+            min_sharpness: Minimum variance of Laplacian
+            on_progress: Optional callback(dict) after every frame
+            cancel: Optional threading.Event to stop early
+        
+        Returns:
+            dict: Recognition result (plus frames_scored / frames_skipped)
+        """
+        if not self.config:
+            return {
+                "success": False,
+                "message": "❌ No team members registered yet!"
+            }
+        
+        self._ensure_embeddings()
+        
+        votes = deque(maxlen=window)  # (username or None, confidence)
+        scored = skipped = 0
+        last_skip = None
+        previous = None
+        deadline = time.monotonic() + time_budget
+        
+        while time.monotonic() < deadline:
+            if cancel is not None and cancel.is_set():
+                return {"success": False, "message": "❌ Recognition cancelled"}
+            
+            frame = get_frame()
+            if frame is None or frame is previous:
+                time.sleep(0.01)  # Wait for a new frame
+                continue
+            previous = frame
+            
+            if self.frame_sharpness(frame) < min_sharpness:
+                skipped += 1
+                last_skip = "Hold still - image is blurred"
+            else:
+                embedding = self._embed(frame, enforce_detection=True)
+                if embedding is None:
+                    skipped += 1
+                    last_skip = "No face detected"
+                else:
+                    scored += 1
+                    best_match = self.embeddings.match(embedding)
+                    if best_match is not None and best_match[2] < MATCH_THRESHOLD:
+                        votes.append((best_match[0], self._confidence(best_match[2])))
+                    else:
+                        votes.append((None, 0))
+            
+            agreeing = {}
+            for username, confidence in votes:
+                if username is not None:
+                    agreeing.setdefault(username, []).append(confidence)
+            leader = max(agreeing.items(), key=lambda item: len(item[1]), default=(None, []))
+            
+            if on_progress is not None:
+                on_progress({
+                    "frames_scored": scored,
+                    "frames_skipped": skipped,
+                    "votes": len(leader[1]),
+                    "votes_required": votes_required,
+                    "last_skip": last_skip
+                })
+            
+            if len(leader[1]) >= votes_required:
+                result = self._welcome(leader[0], sum(leader[1]) / len(leader[1]))
+                result.update(frames_scored=scored, frames_skipped=skipped)
+                return result
+        
+        if scored == 0:
+            message = f"❌ {last_skip or 'No frames received'}"
+        else:
+            message = "❌ Face not recognized with high confidence"
+        return {
+            "success": False,
+            "message": message,
+            "frames_scored": scored,
+            "frames_skipped": skipped
+        }
+    
     def get_registered_users(self):
         """Get list of all registered users"""
         return [
@@ -255,6 +524,8 @@ class FaceAuthManager:
             if user_folder.exists():
                 shutil.rmtree(user_folder)
             
+            self.embeddings.remove_user(username)
+            
             if username in self.config:
                 del self.config[username]
                 self._save_config()
@@ -288,7 +559,6 @@ if __name__ == "__main__":
     print("\n📷 Testing face recognition...")
     print("Position your face in front of the camera...")
     
-    import time
     time.sleep(2)
     
     result = manager.recognize_from_webcam()
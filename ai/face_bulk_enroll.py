@@ -0,0 +1,271 @@
+"""
+MedLink Bulk Face Enrollment
+Enroll many team members at once: photo checks and Facenet512 embeddings
+run in a process pool, the gallery and config are written once at the end
+
+Usage:
+    python ai/face_bulk_enroll.py staff_photos/            # <dir>/<username>/*.jpg
+    python ai/face_bulk_enroll.py staff.csv --workers 6    # username,full_name,role,photos
+
+CSV photos are separated by ';' and relative to the CSV file. A directory
+may contain a people.csv (username,full_name,role) for names and roles.
+"""
+
+import csv
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+
+try:
+    from .face_auth_manager import FaceAuthManager, MIN_SHARPNESS, largest_face
+except ImportError:
+    from face_auth_manager import FaceAuthManager, MIN_SHARPNESS, largest_face
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+MIN_FACE_SIZE = 80  # Pixels - smaller detected faces give poor embeddings
+DEFAULT_ROLE = "doctor"
+
+
+# ==================== MANIFEST ====================
+
+def _split_photos(value, base_dir):
+    return [
+        base_dir / photo.strip()
+        for photo in (value or "").split(";")
+        if photo.strip()
+    ]
+
+
+def _folder_photos(folder):
+    return sorted(
+        path for path in Path(folder).iterdir()
+        if path.suffix.lower() in IMAGE_EXTENSIONS
+    )
+
+
+def load_manifest(source):
+    """
+    Read the people to enroll
+
+    Args:
+        source: CSV file (username,full_name,role,photos) or directory of
+                <username>/ folders (optional people.csv for names/roles)
+
+    Returns:
+        list: [{'username', 'full_name', 'role', 'photos': [Path]}]
+    """
+    source = Path(source)
+    if not source.exists():
+        raise ValueError(f"{source} does not exist")
+
+    if source.is_file():
+        with open(source, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        return [
+            {
+                "username": row["username"].strip(),
+                "full_name": (row.get("full_name") or row["username"]).strip(),
+                "role": (row.get("role") or DEFAULT_ROLE).strip().lower(),
+                "photos": _split_photos(row.get("photos"), source.parent)
+            }
+            for row in rows if (row.get("username") or "").strip()
+        ]
+
+    people = {}
+    people_csv = source / "people.csv"
+    if people_csv.exists():
+        with open(people_csv, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                if (row.get("username") or "").strip():
+                    people[row["username"].strip()] = row
+
+    entries = []
+    for folder in sorted(path for path in source.iterdir() if path.is_dir()):
+        row = people.get(folder.name, {})
+        entries.append({
+            "username": folder.name,
+            "full_name": (row.get("full_name") or folder.name).strip(),
+            "role": (row.get("role") or DEFAULT_ROLE).strip().lower(),
+            "photos": _split_photos(row.get("photos"), source) or _folder_photos(folder)
+        })
+    return entries
+
+
+# ==================== WORKER ====================
+
+def process_photo(photo_path, min_sharpness=MIN_SHARPNESS, min_face_size=MIN_FACE_SIZE):
+    """
+    Quality-check and embed one photo (runs in a worker process)
+
+    Returns:
+        dict: {'photo', 'embedding' or None, 'error' or None}
+    """
+    result = {"photo": str(photo_path), "embedding": None, "error": None}
+
+    image = cv2.imread(str(photo_path))
+    if image is None:
+        result["error"] = "Unreadable image"
+        return result
+
+    sharpness = FaceAuthManager.frame_sharpness(image)
+    if sharpness < min_sharpness:
+        result["error"] = f"Too blurry (sharpness {sharpness:.0f} < {min_sharpness:.0f})"
+        return result
+
+    largest = largest_face(image, enforce_detection=True)
+    if largest is None:
+        result["error"] = "No face detected"
+        return result
+
+    facial_area = largest.get("facial_area", {})
+    if min(facial_area.get("w", 0), facial_area.get("h", 0)) < min_face_size:
+        result["error"] = f"Face too small ({facial_area.get('w', 0)}x{facial_area.get('h', 0)} px)"
+        return result
+
+    result["embedding"] = [float(x) for x in largest["embedding"]]
+    return result
+
+
+# ==================== ENROLLMENT ====================
+
+def _store_photo(photo, destination):
+    """Copy a JPEG into the gallery; other formats are re-encoded as JPEG"""
+    if Path(photo).suffix.lower() in ('.jpg', '.jpeg'):
+        shutil.copy(photo, destination)
+        return
+    image = cv2.imread(str(photo))
+    if image is None or not cv2.imwrite(str(destination), image):
+        raise OSError(f"Could not convert {photo} to JPEG")
+
+
+def bulk_enroll(manager, source, workers=None, progress=None):
+    """
+    Enroll everyone in a manifest
+
+    Args:
+        manager: FaceAuthManager to enroll into
+        source: CSV file or directory (see load_manifest)
+        workers: Worker processes (default: min(4, CPU count); 0 = in this process).
+                 Every worker loads its own copy of the model.
+        progress: Optional callback(done, total) per processed photo
+
+    Returns:
+        dict: enrolled (usernames), photos_added, failures [{'username', 'photo', 'error'}], seconds
+    """
+    started = time.perf_counter()
+    entries = load_manifest(source)
+    failures = []
+
+    jobs = []
+    for entry in entries:
+        if not entry["photos"]:
+            failures.append({"username": entry["username"], "photo": None, "error": "No photos"})
+        for photo in entry["photos"]:
+            jobs.append((entry["username"], photo))
+
+    results = {}
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+
+    if workers == 0:
+        for done, (username, photo) in enumerate(jobs, 1):
+            key = (username, str(photo))
+            try:
+                results[key] = process_photo(photo)
+            except Exception as e:
+                results[key] = {"photo": key[1], "embedding": None, "error": str(e)}
+            if progress:
+                progress(done, len(jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_photo, str(photo)): (username, str(photo)) for username, photo in jobs}
+            for done, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    results[key] = {"photo": key[1], "embedding": None, "error": str(e)}
+                if progress:
+                    progress(done, len(jobs))
+
+    # Copy accepted photos and update gallery/config in memory, then save once
+    enrolled = []
+    photos_added = 0
+    for entry in entries:
+        username = entry["username"]
+        accepted = []
+        for photo in entry["photos"]:
+            result = results[(username, str(photo))]
+            if result["error"]:
+                failures.append({"username": username, "photo": str(photo), "error": result["error"]})
+            else:
+                accepted.append((photo, result["embedding"]))
+        if not accepted:
+            continue
+
+        user_folder = manager.faces_db / username
+        user_folder.mkdir(parents=True, exist_ok=True)
+        photo_count = len(list(user_folder.glob("*.jpg")))
+
+        for photo, embedding in accepted:
+            main_photo = user_folder / f"{username}_main.jpg"
+            if not main_photo.exists():
+                destination = main_photo
+            else:
+                destination = user_folder / f"{username}_{photo_count + 1}.jpg"
+            try:
+                _store_photo(photo, destination)
+            except OSError as e:
+                failures.append({"username": username, "photo": str(photo), "error": str(e)})
+                continue
+            manager.embeddings.add(username, destination.name, embedding, save=False)
+            photo_count += 1
+            photos_added += 1
+
+        user_config = manager.config.setdefault(username, {"registered_at": datetime.now().isoformat()})
+        user_config.update({
+            "full_name": entry["full_name"],
+            "role": entry["role"],
+            "photo_count": photo_count
+        })
+        enrolled.append(username)
+
+    if enrolled:
+        manager._save_config()
+        manager.embeddings.save()
+        manager.embeddings.train_ann()
+
+    return {
+        "enrolled": enrolled,
+        "photos_added": photos_added,
+        "failures": failures,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='MedLink Bulk Face Enrollment')
+    parser.add_argument('source', help='CSV file or directory of <username>/ photo folders')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (0 = no pool)')
+    parser.add_argument('--data', default='data', help='Face data directory')
+
+    args = parser.parse_args()
+
+    def show_progress(done, total):
+        print(f"\r📷 {done}/{total} photos processed", end="", flush=True)
+
+    report = FaceAuthManager(args.data).bulk_enroll(args.source, workers=args.workers, progress=show_progress)
+
+    print(f"\n✅ Enrolled {len(report['enrolled'])} team members "
+          f"({report['photos_added']} photos) in {report['seconds']}s")
+    if report["failures"]:
+        print(f"⚠️ {len(report['failures'])} photos rejected:")
+        for failure in report["failures"]:
+            print(f"   - {failure['username']}: {failure['photo']} - {failure['error']}")
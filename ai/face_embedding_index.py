@@ -0,0 +1,257 @@
+"""
+MedLink Face Embedding Index
+In-memory matrix of L2-normalized face embeddings (one row per registered
+photo) persisted as .npy + JSON index, matched with one matrix-vector product
+(or through an IVF index once the gallery is large)
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from .face_ann_index import IVFIndex
+except ImportError:
+    from face_ann_index import IVFIndex
+
+
+class FaceEmbeddingIndex:
+    """Gallery of normalized embeddings keyed by (username, photo)"""
+
+    def __init__(self, base_path="data", model_name="Facenet512", dim=512,
+                 ann_min_size=None, ann_nprobe=16, ann_nlist=None):
+        """
+        Args:
+            base_path: Directory of the .npy / .json files
+            model_name: Embedding model (stale files from another model are ignored)
+            dim: Embedding size
+            ann_min_size: Use the IVF index from this many photos on (None = always exact)
+            ann_nprobe: IVF cells searched per query (recall / latency trade-off)
+            ann_nlist: IVF cells (default: 4 * sqrt(gallery size))
+        """
+        self.base_path = Path(base_path)
+        self.matrix_file = self.base_path / "face_embeddings.npy"
+        self.index_file = self.base_path / "face_embeddings.json"
+        self.centroids_file = self.base_path / "face_embeddings_ivf.npy"
+        self.model_name = model_name
+        self.dim = dim
+
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        self.rows = []  # [(username, photo_name)] - row i of matrix
+        self._row_of = {}  # (username, photo_name) -> row
+        self._buffer = None  # Over-allocated storage behind matrix (amortized appends)
+
+        self.ann_min_size = ann_min_size
+        self.ann = IVFIndex(dim, nlist=ann_nlist, nprobe=ann_nprobe) if ann_min_size is not None else None
+
+        self.load()
+
+    # ==================== PERSISTENCE ====================
+
+    def load(self):
+        """Load the gallery from disk (empty if missing or from another model)"""
+        if not (self.matrix_file.exists() and self.index_file.exists()):
+            return False
+
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            matrix = np.load(self.matrix_file)
+        except Exception as e:
+            print(f"⚠️ Could not load face embeddings: {e}")
+            return False
+
+        rows = [tuple(row) for row in index.get("rows", [])]
+        if index.get("model_name") != self.model_name or matrix.shape != (len(rows), self.dim):
+            print("⚠️ Face embeddings are stale - they will be rebuilt")
+            return False
+
+        self.matrix = matrix.astype(np.float32, copy=False)
+        self.rows = rows
+        self._row_of = {key: row for row, key in enumerate(rows)}
+        self._buffer = None
+
+        if self.ann is not None and self.centroids_file.exists():
+            try:
+                centroids = np.load(self.centroids_file)
+                if centroids.ndim == 2 and centroids.shape[1] == self.dim:
+                    self.ann.load_centroids(centroids, self.matrix)
+            except Exception as e:
+                print(f"⚠️ Could not load face ANN index - it will be retrained: {e}")
+        return True
+
+    def save(self):
+        """Write matrix and index atomically"""
+        self.base_path.mkdir(parents=True, exist_ok=True)
+
+        tmp_matrix = self.matrix_file.with_suffix(".npy.tmp")
+        with open(tmp_matrix, 'wb') as f:
+            np.save(f, self.matrix)
+
+        tmp_index = self.index_file.with_suffix(".json.tmp")
+        with open(tmp_index, 'w', encoding='utf-8') as f:
+            json.dump({
+                "model_name": self.model_name,
+                "dim": self.dim,
+                "rows": [list(row) for row in self.rows]
+            }, f, ensure_ascii=False)
+
+        os.replace(tmp_matrix, self.matrix_file)
+        os.replace(tmp_index, self.index_file)
+
+        if self.ann is not None and self.ann.is_trained:
+            tmp_centroids = self.centroids_file.with_suffix(".npy.tmp")
+            with open(tmp_centroids, 'wb') as f:
+                np.save(f, self.ann.centroids)
+            os.replace(tmp_centroids, self.centroids_file)
+
+    # ==================== UPDATES ====================
+
+    def _normalize(self, embedding):
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dim:
+            raise ValueError(f"Expected a {self.dim}-d embedding, got {vector.shape[0]}")
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            raise ValueError("Embedding is all zeros")
+        return vector / norm
+
+    def add(self, username, photo_name, embedding, save=True):
+        """Add (or replace) the embedding of one photo"""
+        vector = self._normalize(embedding)
+        key = (username, photo_name)
+
+        row = self._row_of.get(key)
+        if row is not None:
+            self.matrix[row] = vector
+            if self._ann_trained:
+                self.ann.update(row, vector)
+        else:
+            n = len(self.rows)
+            if self._buffer is None or n >= len(self._buffer):
+                self._buffer = np.empty((max(16, 2 * n), self.dim), dtype=np.float32)
+                self._buffer[:n] = self.matrix
+            self._buffer[n] = vector
+            self.matrix = self._buffer[:n + 1]
+            self.rows.append(key)
+            self._row_of[key] = n
+            if self._ann_trained:
+                self.ann.add(vector)
+
+        if save:
+            self.save()
+
+    def remove(self, keep, save=True):
+        """Keep only rows where keep(username, photo_name) is true; returns rows removed"""
+        mask = np.array([bool(keep(*row)) for row in self.rows], dtype=bool)
+        removed = len(self.rows) - int(mask.sum())
+        if removed:
+            self.matrix = self.matrix[mask]
+            self._buffer = None
+            self.rows = [row for row, kept in zip(self.rows, mask) if kept]
+            self._row_of = {key: row for row, key in enumerate(self.rows)}
+            if self._ann_trained:
+                self.ann.remove(mask)
+            if save:
+                self.save()
+        return removed
+
+    def remove_user(self, username, save=True):
+        """Drop every photo of a user"""
+        return self.remove(lambda user, photo: user != username, save=save)
+
+    def sync(self, faces_db, embed_photo):
+        """
+        Bring the gallery in line with the team_faces folder
+
+        Only photos without an embedding are computed; rows whose photo
+        file is gone are dropped. The IVF index is (re)trained if needed.
+
+        Args:
+            faces_db: team_faces directory (one folder per username)
+            embed_photo: Callable(photo_path) -> embedding or None
+
+        Returns:
+            tuple: (added, removed)
+        """
+        faces_db = Path(faces_db)
+        on_disk = {
+            (photo.parent.name, photo.name)
+            for photo in faces_db.glob("*/*.jpg")
+        }
+
+        removed = self.remove(lambda user, photo: (user, photo) in on_disk, save=False)
+
+        added = 0
+        for username, photo_name in sorted(on_disk - self._row_of.keys()):
+            try:
+                embedding = embed_photo(faces_db / username / photo_name)
+            except Exception as e:
+                print(f"⚠️ Could not embed {username}/{photo_name}: {e}")
+                continue
+            if embedding is not None:
+                self.add(username, photo_name, embedding, save=False)
+                added += 1
+
+        if added or removed:
+            self.save()
+        self.train_ann()
+        return added, removed
+
+    # ==================== MATCHING ====================
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def _ann_trained(self):
+        return self.ann is not None and self.ann.is_trained
+
+    def train_ann(self):
+        """
+        (Re)train the IVF index when the gallery is large enough and the index
+        is untrained or the gallery grew 4x. Slow on big galleries - call it
+        after enrollment / sync, never on the match path.
+
+        Returns:
+            bool: True if the index was trained
+        """
+        if self.ann is None or len(self.rows) < self.ann_min_size:
+            return False
+        if not self.ann.needs_training(len(self.rows)):
+            return False
+        self.ann.train(self.matrix)
+        self.save()
+        return True
+
+    def _use_ann(self):
+        """IVF for large galleries once trained (exact search until then)"""
+        return self._ann_trained and len(self.rows) >= self.ann_min_size
+
+    def match(self, embedding):
+        """
+        Find the closest registered photo
+
+        Args:
+            embedding: Raw embedding of the captured face
+
+        Returns:
+            tuple: (username, photo_name, cosine_distance) or None if empty
+        """
+        if not self.rows:
+            return None
+
+        query = self._normalize(embedding)
+
+        if self._use_ann():
+            ids, similarities = self.ann.search(self.matrix, query, k=1)
+            if len(ids):
+                username, photo_name = self.rows[int(ids[0])]
+                return username, photo_name, float(1.0 - similarities[0])
+
+        similarities = self.matrix @ query
+        best = int(np.argmax(similarities))
+        username, photo_name = self.rows[best]
+        return username, photo_name, float(1.0 - similarities[best])
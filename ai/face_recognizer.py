@@ -0,0 +1,206 @@
+"""
+MedLink Face Recognizer Service
+Long-lived worker thread that loads Facenet512 and the OpenCV detector once
+and then serves recognition (and registration) requests from a queue
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+try:
+    from .face_auth_manager import FaceAuthManager
+except ImportError:
+    from face_auth_manager import FaceAuthManager
+
+
+class FaceRecognizer:
+    """
+    Owns the FaceAuthManager and runs all model work on one warm thread
+
+    States: 'idle' -> 'loading' -> 'ready' (or 'error')
+    """
+
+    def __init__(self, manager=None, base_path="data"):
+        self.manager = manager or FaceAuthManager(base_path)
+
+        self.state = "idle"
+        self.message = "Face recognition not started"
+        self.ready = threading.Event()
+
+        self._requests = queue.Queue()
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # ==================== LIFECYCLE ====================
+
+    def start(self):
+        """Start loading the model in the background (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="face-recognizer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the worker after queued requests and release the webcam"""
+        self._requests.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.manager.release_camera()
+
+    def _set_state(self, state, message):
+        self.state = state
+        self.message = message
+        for listener in list(self._listeners):
+            try:
+                listener(state, message)
+            except Exception as e:
+                print(f"⚠️ Face recognizer listener failed: {e}")
+
+    def add_listener(self, callback):
+        """
+        Get state changes as callback(state, message)
+
+        Called from the worker thread - GUI code should hop to the main
+        thread (e.g. widget.after(0, ...)). Called once immediately with
+        the current state.
+        """
+        self._listeners.append(callback)
+        callback(self.state, self.message)
+
+    def remove_listener(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _warm_up(self):
+        """Load Facenet512 + OpenCV detector and embed missing gallery photos"""
+        self._set_state("loading", "Loading face recognition model...")
+
+        # One forward pass on a blank image builds and caches both models
+        self.manager._embed(np.zeros((160, 160, 3), dtype=np.uint8))
+
+        self._set_state("loading", "Preparing face gallery...")
+        self.manager._ensure_embeddings()
+
+    def _run(self):
+        try:
+            self._warm_up()
+        except Exception as e:
+            self._set_state("error", f"Face recognition unavailable: {e}")
+            # Keep serving - requests will report the error themselves
+        else:
+            self._set_state("ready", f"Ready ({len(self.manager.embeddings)} face photos)")
+        self.ready.set()
+
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            future, fn, args, kwargs = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    # ==================== REQUESTS ====================
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the recognizer thread
+
+        Returns:
+            Future: Resolves after warm-up and any earlier requests
+        """
+        self.start()
+        future = Future()
+        self._requests.put((future, fn, args, kwargs))
+        return future
+
+    def recognize_async(self, camera_index=0, callback=None):
+        """
+        Queue a webcam recognition
+
+        Args:
+            camera_index: Webcam index
+            callback: Optional callback(result dict), called from the worker thread
+
+        Returns:
+            Future: Resolves to the recognize_from_webcam result
+        """
+        future = self.submit(self.manager.recognize_from_webcam, camera_index)
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(self._result_or_error(f)))
+        return future
+
+    def recognize_frame_async(self, frame, callback=None):
+        """
+        Queue recognition of an in-memory BGR frame (e.g. the GUI preview frame)
+
+        Args:
+            frame: BGR numpy array - not copied, don't modify it afterwards
+            callback: Optional callback(result dict), called from the worker thread
+
+        Returns:
+            Future: Resolves to the recognize_frame result
+        """
+        future = self.submit(self.manager.recognize_frame, frame)
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(self._result_or_error(f)))
+        return future
+
+    def recognize_stream_async(self, get_frame, callback=None, on_progress=None, cancel=None, **options):
+        """
+        Queue streaming recognition over live frames (see FaceAuthManager.recognize_stream)
+
+        Args:
+            get_frame: Callable returning the latest BGR frame - called from the worker thread
+            callback: Optional callback(result dict), called from the worker thread
+            on_progress: Optional callback(progress dict), called from the worker thread
+            cancel: Optional threading.Event to stop early
+            **options: votes_required, window, time_budget, min_sharpness
+
+        Returns:
+            Future: Resolves to the recognize_stream result
+        """
+        future = self.submit(
+            self.manager.recognize_stream, get_frame,
+            on_progress=on_progress, cancel=cancel, **options
+        )
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(self._result_or_error(f)))
+        return future
+
+    def recognize(self, camera_index=0, timeout=None):
+        """Recognize from webcam and wait for the result"""
+        return self._result_or_error(self.recognize_async(camera_index), timeout)
+
+    @staticmethod
+    def _result_or_error(future, timeout=None):
+        try:
+            return future.result(timeout)
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"❌ Error: {str(e)}"
+            }
+
+
+_recognizer = None
+_recognizer_lock = threading.Lock()
+
+
+def get_face_recognizer(base_path="data"):
+    """Shared FaceRecognizer (created and started on first call)"""
+    global _recognizer
+    with _recognizer_lock:
+        if _recognizer is None:
+            _recognizer = FaceRecognizer(base_path=base_path)
+            _recognizer.start()
+    return _recognizer
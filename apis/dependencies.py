@@ -7,6 +7,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 from datetime import datetime, timedelta
 from core.auth_manager import get_auth_manager
+from core.async_database import get_async_db  # Request-scoped AsyncSession: Depends(get_async_db)
 
 # JWT Configuration
 SECRET_KEY = "your-secret-key-change-in-production"
@@ -5,6 +5,7 @@ Main entry point for REST API
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import auth, patients, visits, medical, labs, imaging, cards, search, stats
+from core.async_database import dispose_async_engine
 
 # Create FastAPI app
 app = FastAPI(
@@ -47,6 +48,11 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled async database connections"""
+    await dispose_async_engine()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Patient API Routes
+Read endpoints run on the request's AsyncSession (core/async_patient_reader.py)
+"""
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.dependencies import get_current_user, get_async_db
+from core.async_patient_reader import async_patient_reader
+
+router = APIRouter()
+
+@router.get("/")
+async def list_patients(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """One page of patient summaries ordered by name (pass next_cursor for the next page)"""
+    page = await async_patient_reader.get_patients_page(db, limit, cursor)
+    page["patients"] = [summary.to_dict() for summary in page["patients"]]
+    return page
+
+@router.get("/card/{card_uid}")
+async def get_patient_by_card(
+    card_uid: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Get patient by active NFC card UID"""
+    patient = await async_patient_reader.get_patient_by_card(db, card_uid)
+    
+    if not patient:
+        raise HTTPException(status_code=404, detail="Card not found or inactive")
+    
+    return patient
+
+@router.get("/{national_id}")
+async def get_patient(
+    national_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Get complete patient record"""
+    patient = await async_patient_reader.get_patient(db, national_id)
+    
+    if not patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
+    
+    return patient
+
+@router.get("/{national_id}/visits")
+async def get_patient_visits(
+    national_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Get visits for a patient (newest first)"""
+    return await async_patient_reader.get_patient_visits(db, national_id, limit)
+
+@router.get("/{national_id}/lab-results")
+async def get_patient_lab_results(
+    national_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Get lab results for a patient (newest first)"""
+    return await async_patient_reader.get_patient_lab_results(db, national_id, limit)
+
+@router.get("/{national_id}/imaging")
+async def get_patient_imaging_results(
+    national_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Get imaging results for a patient (newest first)"""
+    return await async_patient_reader.get_patient_imaging_results(db, national_id, limit)
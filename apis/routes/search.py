@@ -0,0 +1,24 @@
+"""
+Search API Routes
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from api.dependencies import get_current_user, get_async_db
+from core.async_patient_reader import async_patient_reader
+
+router = APIRouter()
+
+@router.get("/patients")
+async def search_patients(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(get_current_user)
+):
+    """Search patients by name, national ID, phone or email (best match first)"""
+    summaries = await async_patient_reader.search_summaries(db, q, limit)
+    return {
+        "query": q,
+        "count": len(summaries),
+        "patients": [summary.to_dict() for summary in summaries]
+    }
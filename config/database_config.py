@@ -20,3 +20,84 @@ DB_SETTINGS = {
     'import_json_data': True,
     'generate_test_data': False
 }
+
+# Patient Record Cache (core/patient_cache.py)
+PATIENT_CACHE_SETTINGS = {
+    'enabled': True,
+    'max_size': 500,          # Patients kept in memory (LRU eviction)
+    'ttl_seconds': 300        # Max age of a cached record
+}
+
+# In-process Patient Search Index (core/patient_search_index.py)
+SEARCH_INDEX_SETTINGS = {
+    'enabled': True,
+    'build_on_first_search': True,   # Build in background; SQL fallback until ready
+    'min_gram': 1,                   # Shortest indexed name prefix
+    'max_gram': 15,                  # Longest indexed name prefix
+    'build_batch_size': 5000,        # Rows fetched per round trip while building
+    'max_age_seconds': 900           # Re-check when older; rebuild only if the patients table changed (writes from other processes); 0 = never
+}
+
+# Dashboard Statistics (core/statistics_engine.py)
+STATISTICS_SETTINGS = {
+    'refresh_interval_seconds': 60,  # Max age of cached statistics
+    'persist_summary': False,        # Store snapshots in the statistics_summary table
+    'background_refresh': False      # Recompute on a timer instead of on read
+}
+
+# Async Engine for FastAPI services (core/async_database.py)
+ASYNC_DATABASE_SETTINGS = {
+    'driver': 'aiomysql',                                  # Async MySQL driver
+    'sqlite_path': None,          # e.g. 'data/medlink_async.db' - local aiosqlite file instead of MySQL (tests / development only)
+    'pool_size': 20,
+    'max_overflow': 40,
+    'pool_recycle': 3600
+}
+
+# SQL Instrumentation / N+1 Detection (core/query_monitor.py)
+SQL_INSTRUMENTATION_SETTINGS = {
+    'enabled': False,             # Record every statement (development only)
+    'slow_query_ms': 200,         # Log statements slower than this
+    'n_plus_one_threshold': 5,    # Same statement this many times in one connection checkout
+    'recent_statements': 500      # Statements kept for inspection
+}
+
+# Provider Gateway Storage (core/gateway_store.py)
+GATEWAY_STORAGE_SETTINGS = {
+    'batch_size': 200,            # Max submissions written per INSERT / commit
+    'linger_ms': 2,               # Extra wait for more submissions before a commit
+    'max_queue': 5000,            # Pending submissions per worker (backpressure limit)
+    'token_cache_ttl': 60,        # Seconds before token/provider changes are seen
+    'dedup_max_entries': 100000,  # Idempotency keys answered from memory (per worker)
+    'dedup_ttl_seconds': 86400    # After this, replays are answered from the database
+}
+
+# Provider Gateway NDJSON Bulk Submission (/api/external/bulk)
+GATEWAY_BULK_SETTINGS = {
+    'chunk_size': 1000,           # Records per transaction (results are streamed per chunk)
+    'max_line_bytes': 1048576     # Longer lines are rejected without being buffered
+}
+
+# Provider Gateway Ingest Queue (core/ingest_queue.py)
+INGEST_QUEUE_SETTINGS = {
+    'enabled': True,              # Submissions return 202 + tracking ID; False = write inline
+    'path': 'data/gateway_ingest_queue.db',  # SQLite file shared by the workers on this host
+    'consumers': 2,               # Consumer tasks per worker process
+    'batch_size': 200,            # Jobs written to the database per transaction
+    'poll_interval_ms': 200,      # Idle consumers check for new jobs this often
+    'max_attempts': 8,            # Failed writes before a job is dead-lettered
+    'retry_backoff_ms': 500,      # First retry delay (doubles per attempt)
+    'max_backoff_seconds': 300,   # Longest retry delay
+    'lease_seconds': 120,         # Claimed jobs of a crashed worker are retried after this
+    'retention_hours': 72         # Stored jobs kept for status lookups
+}
+
+# Provider Gateway Access Log (core/api_access_log.py)
+API_ACCESS_LOG_SETTINGS = {
+    'ring_size': 1000,            # Recent entries kept in memory (/api/logs without filters)
+    'persist': True,              # Also write entries to the api_access_logs table
+    'batch_size': 500,            # Entries per INSERT
+    'flush_interval_ms': 1000,    # Maximum time an entry waits before it is written
+    'max_queue': 20000,           # Unwritten entries kept while the database is slow (then dropped)
+    'retention_days': 90          # Older api_access_logs rows are deleted (0 = keep)
+}
@@ -30,3 +30,41 @@ HARDWARE_SECURITY = {
     'log_all_hardware_access': True,
     'encrypt_hardware_logs': True
 }
+
+# In-memory Card UID Registry (core/card_registry.py)
+CARD_REGISTRY_CONFIG = {
+    'enabled': True,
+    'warm_on_startup': True,           # Load all cards in the background at startup
+    'poll_interval': 30,               # seconds between change checks (0 = off)
+    'unknown_ttl': 5,                  # seconds an unknown UID is answered without querying (0 = off)
+    'max_unknown': 10000               # cap on remembered unknown UIDs
+}
+
+# Card Usage Write-Behind (core/card_usage_recorder.py)
+CARD_USAGE_CONFIG = {
+    'enabled': True,
+    'flush_interval': 5,               # seconds between batched UPDATEs (max data lost on crash)
+    'max_pending': 1000                # flush early when this many cards are buffered
+}
+
+# Hardware Audit Event Log (utils/hardware_logger.py)
+HARDWARE_EVENT_LOG_CONFIG = {
+    'directory': 'data/hardware_audit_log',   # relative to the project root
+    'segment_max_bytes': 4 * 1024 * 1024,     # rotate the active segment at this size
+    'retention_days': 365,             # delete sealed segments older than this (0 = keep)
+    'max_segments': 0,                 # keep at most this many segments (0 = no limit)
+    'time_index_stride': 64,           # one sparse time index entry per N events
+    'fsync': False                     # fsync after every event (durable, slower)
+}
+
+# Background Audit Writer for hardware_audit_logs (core/audit_writer.py)
+AUDIT_WRITER_CONFIG = {
+    'enabled': True,
+    'flush_interval_ms': 500,          # write at least this often
+    'batch_size': 200,                 # ... or as soon as this many events are queued
+    'max_queue': 10000,                # backpressure: submit waits when the queue is full
+    'block_timeout_ms': 50,            # ... then spills the event to disk instead
+    'replay_interval_ms': 30000,       # retry the spill file this often, however busy the queue is
+    'spill_file': 'data/hardware_audit_spill.jsonl',      # used while MySQL is unreachable
+    'dead_letter_file': 'data/hardware_audit_dead.jsonl'  # events MySQL rejects (kept for inspection)
+}
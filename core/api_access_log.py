@@ -0,0 +1,405 @@
+"""
+API Access Log - Request log for the provider gateway (payment_gateway/main.py)
+Recent entries live in a fixed-size ring buffer, every entry is also written
+to the api_access_logs table in batches by a background task, and requests /
+errors / latency are aggregated per provider in memory
+
+Location: core/api_access_log.py
+"""
+
+import asyncio
+import itertools
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select, delete
+
+from config.database_config import API_ACCESS_LOG_SETTINGS
+from core.async_database import get_async_engine, get_async_sessionmaker
+from core.database import Base
+from core.models import ApiAccessLog
+
+
+# Latency histogram bucket upper bounds (ms) - the last bucket is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_INSERT = insert(ApiAccessLog.__table__)
+
+# Access entry of the request being handled (filled in by the handlers)
+_current_entry = ContextVar('api_access_entry', default=None)
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of the newest items
+
+    append() is O(1) and takes no lock: the slot comes from an itertools
+    counter (atomic under the GIL) and overwrites the oldest item.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = max(1, capacity)
+        self._slots = [None] * self.capacity
+        self._counter = itertools.count()
+        self._written = 0
+
+    def append(self, item):
+        position = next(self._counter)
+        self._slots[position % self.capacity] = item
+        self._written = max(self._written, position + 1)
+
+    def recent(self, limit: int = 50) -> List:
+        """Up to limit newest items, oldest first"""
+        end = self._written
+        start = max(0, end - min(limit, self.capacity))
+        items = [self._slots[i % self.capacity] for i in range(start, end)]
+        return [item for item in items if item is not None]
+
+    def __len__(self):
+        return min(self._written, self.capacity)
+
+
+class ProviderCounters:
+    """Requests, errors and latency histogram of one provider"""
+
+    def __init__(self, provider_name: str = None):
+        self.provider_name = provider_name
+        self.requests = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.endpoints = {}
+
+    def add(self, endpoint: str, status_code: int, latency_ms: Optional[float]):
+        self.requests += 1
+        if status_code is not None and status_code >= 400:
+            self.errors += 1
+        self.endpoints[endpoint] = self.endpoints.get(endpoint, 0) + 1
+        if latency_ms is not None:
+            self.total_ms += latency_ms
+            self.max_ms = max(self.max_ms, latency_ms)
+            self.buckets[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+
+    def _percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the percentile (None above the last bound)"""
+        timed = sum(self.buckets)
+        if not timed:
+            return None
+        rank = fraction * timed
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def to_dict(self) -> Dict:
+        timed = sum(self.buckets)
+        return {
+            'provider_name': self.provider_name,
+            'requests': self.requests,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / timed, 2) if timed else None,
+            'max_ms': round(self.max_ms, 2),
+            'p50_ms_le': self._percentile(0.50),
+            'p95_ms_le': self._percentile(0.95),
+            'p99_ms_le': self._percentile(0.99),
+            'endpoints': dict(self.endpoints)
+        }
+
+
+class ApiAccessLogger:
+    """Ring buffer + per-provider counters + batched api_access_logs writer"""
+
+    def __init__(self, ring_size: int = 1000, persist: bool = True, batch_size: int = 500,
+                 flush_interval_ms: int = 1000, max_queue: int = 20000, retention_days: int = 90):
+        """
+        Initialize log (the writer task starts with the first entry)
+
+        Args:
+            ring_size: Recent entries kept in memory
+            persist: Write entries to the api_access_logs table
+            batch_size: Entries per INSERT
+            flush_interval_ms: Maximum time an entry waits to be written
+            max_queue: Unwritten entries kept before new ones are dropped
+            retention_days: Delete older rows (0 = keep)
+        """
+        self.ring = RingBuffer(ring_size)
+        self.persist = persist
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.retention_days = retention_days
+
+        self.providers = {}  # provider_id -> ProviderCounters
+        self.started_at = datetime.now()
+
+        self._queue = None
+        self._writer = None
+        self._table_ready = False
+        self._last_purge = 0.0
+
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    # ==================== REQUEST CONTEXT ====================
+
+    def annotate(self, **fields):
+        """
+        Add fields (provider, endpoint, patient) to the current request's entry
+
+        Returns:
+            bool: False outside a request handled by AccessLogMiddleware
+        """
+        entry = _current_entry.get()
+        if entry is None:
+            return False
+        entry.update({key: value for key, value in fields.items() if value is not None})
+        return True
+
+    # ==================== RECORD ====================
+
+    def record(self, provider_id: int, provider_name: str, endpoint: str, patient_id: str = None,
+               method: str = None, status_code: int = None, latency_ms: float = None):
+        """
+        Log one provider request
+
+        Args:
+            provider_id: Authenticated provider
+            provider_name: Provider display name
+            endpoint: Route path
+            patient_id: Patient national ID the request was about
+            method: HTTP method
+            status_code: Response status
+            latency_ms: Time until the response was fully sent
+        """
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "provider_id": provider_id,
+            "provider_name": provider_name,
+            "method": method,
+            "endpoint": endpoint,
+            "patient_id": patient_id,
+            "status_code": status_code,
+            "latency_ms": round(latency_ms, 2) if latency_ms is not None else None
+        }
+        self.ring.append(entry)
+
+        counters = self.providers.get(provider_id)
+        if counters is None:
+            counters = self.providers[provider_id] = ProviderCounters(provider_name)
+        counters.add(endpoint, status_code, latency_ms)
+
+        if self.persist:
+            self._enqueue(entry)
+
+    def _enqueue(self, entry: Dict):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Outside the server's event loop - kept in memory only
+
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._writer = loop.create_task(self._write_loop())
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    # ==================== WRITER ====================
+
+    @staticmethod
+    def _row(entry: Dict) -> Dict:
+        return {
+            'timestamp': datetime.fromisoformat(entry['timestamp']),
+            'provider_id': entry['provider_id'],
+            'provider_name': entry['provider_name'],
+            'method': entry['method'],
+            'endpoint': entry['endpoint'],
+            'patient_national_id': str(entry['patient_id'])[:14] if entry['patient_id'] else None,
+            'status_code': entry['status_code'],
+            'latency_ms': entry['latency_ms']
+        }
+
+    async def _ensure_table(self):
+        if not self._table_ready:
+            async with get_async_engine().begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=[ApiAccessLog.__table__])
+            self._table_ready = True
+
+    async def _write_loop(self):
+        stopping = False
+        while not stopping:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [entry for entry in batch if entry is not None]
+            if not batch:
+                continue
+
+            try:
+                await self._ensure_table()
+                async with get_async_sessionmaker()() as session:
+                    await session.execute(_INSERT, [self._row(entry) for entry in batch])
+                    await session.commit()
+                self.written += len(batch)
+            except Exception as e:
+                # Access logs must not back up into request handling - drop the batch
+                self.failed_batches += 1
+                self.dropped += len(batch)
+                print(f"⚠️ API access log write failed ({len(batch)} entries dropped): {e}")
+
+            if self.retention_days and time.monotonic() - self._last_purge > 3600:
+                self._last_purge = time.monotonic()
+                await self._purge()
+
+    async def _purge(self):
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        try:
+            async with get_async_sessionmaker()() as session:
+                await session.execute(delete(ApiAccessLog).where(ApiAccessLog.timestamp < cutoff))
+                await session.commit()
+        except Exception as e:
+            print(f"⚠️ API access log purge failed: {e}")
+
+    async def close(self):
+        """Write queued entries and stop the writer task (app shutdown)"""
+        if self._writer is not None and not self._writer.done():
+            await self._queue.put(None)
+            await self._writer
+        self._writer = None
+        self._queue = None
+
+    # ==================== QUERY ====================
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Newest entries from memory, oldest first"""
+        return self.ring.recent(limit)
+
+    async def query(self, provider_id: int = None, endpoint: str = None, patient_id: str = None,
+                    start: datetime = None, end: datetime = None, limit: int = 100) -> List[Dict]:
+        """
+        Search the persisted log, newest first
+
+        Args:
+            provider_id: Only this provider
+            endpoint: Only this route path
+            patient_id: Only requests about this patient
+            start: Minimum timestamp (inclusive)
+            end: Maximum timestamp (inclusive)
+            limit: Max results
+
+        Returns:
+            List of entries
+        """
+        await self._ensure_table()
+
+        stmt = select(ApiAccessLog)
+        if provider_id is not None:
+            stmt = stmt.where(ApiAccessLog.provider_id == provider_id)
+        if endpoint:
+            stmt = stmt.where(ApiAccessLog.endpoint == endpoint)
+        if patient_id:
+            stmt = stmt.where(ApiAccessLog.patient_national_id == patient_id)
+        if start:
+            stmt = stmt.where(ApiAccessLog.timestamp >= start)
+        if end:
+            stmt = stmt.where(ApiAccessLog.timestamp <= end)
+        stmt = stmt.order_by(ApiAccessLog.timestamp.desc(), ApiAccessLog.id.desc()).limit(limit)
+
+        async with get_async_sessionmaker()() as session:
+            rows = (await session.execute(stmt)).scalars().all()
+        return [
+            {
+                "timestamp": row.timestamp.isoformat(),
+                "provider_id": row.provider_id,
+                "provider_name": row.provider_name,
+                "method": row.method,
+                "endpoint": row.endpoint,
+                "patient_id": row.patient_national_id,
+                "status_code": row.status_code,
+                "latency_ms": row.latency_ms
+            }
+            for row in rows
+        ]
+
+    def stats(self) -> Dict:
+        """Per-provider counters since this worker started"""
+        return {
+            "since": self.started_at.isoformat(),
+            "providers": {
+                provider_id: counters.to_dict()
+                for provider_id, counters in self.providers.items()
+            },
+            "log": {
+                "in_memory": len(self.ring),
+                "written": self.written,
+                "pending": self._queue.qsize() if self._queue is not None else 0,
+                "dropped": self.dropped,
+                "failed_batches": self.failed_batches
+            }
+        }
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware timing every request until its response is fully sent
+
+    Requests annotated with a provider (see ApiAccessLogger.annotate) are
+    recorded with their status code and latency.
+    """
+
+    def __init__(self, app, logger: ApiAccessLogger = None):
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        entry = {}
+        token = _current_entry.set(entry)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_entry.reset(token)
+            if 'provider_id' in entry:
+                route = scope.get('route')
+                (self.logger or api_access_log).record(
+                    entry['provider_id'],
+                    entry.get('provider_name'),
+                    entry.get('endpoint') or getattr(route, 'path', scope.get('path')),
+                    patient_id=entry.get('patient_id'),
+                    method=scope.get('method'),
+                    status_code=status_code,
+                    latency_ms=(time.perf_counter() - started) * 1000
+                )
+
+
+# Global instance
+api_access_log = ApiAccessLogger(**API_ACCESS_LOG_SETTINGS)
@@ -0,0 +1,171 @@
+"""
+Core Async Database Connection - For the FastAPI services
+Async engine and request-scoped AsyncSession factory next to the sync engine
+in core/database.py (same models, same Base)
+
+Location: core/async_database.py
+"""
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+import importlib.util
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from config.database_config import DATABASE_CONFIG, ASYNC_DATABASE_SETTINGS
+from config.settings import BASE_DIR
+
+# Lazily created (importing this module must not need the async driver)
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def build_async_url() -> str:
+    """
+    Build the async database URL
+
+    Uses mysql+<driver> (aiomysql by default). A local aiosqlite file is only
+    used when ASYNC_DATABASE_SETTINGS['sqlite_path'] is set explicitly
+    (relative paths are under the project root).
+
+    Returns:
+        str: SQLAlchemy async URL
+
+    Raises:
+        ImportError: The configured driver is not installed
+    """
+    sqlite_path = ASYNC_DATABASE_SETTINGS.get('sqlite_path')
+    if sqlite_path:
+        path = Path(sqlite_path)
+        return f"sqlite+aiosqlite:///{path if path.is_absolute() else BASE_DIR / path}"
+
+    driver = ASYNC_DATABASE_SETTINGS.get('driver', 'aiomysql')
+    if importlib.util.find_spec(driver) is None:
+        raise ImportError(
+            f"Async database driver '{driver}' is not installed (pip install {driver}) - "
+            f"set ASYNC_DATABASE_SETTINGS['sqlite_path'] to use a local SQLite file instead"
+        )
+
+    return (
+        f"mysql+{driver}://{DATABASE_CONFIG['user']}:{DATABASE_CONFIG['password']}"
+        f"@{DATABASE_CONFIG['host']}/{DATABASE_CONFIG['database']}"
+        f"?charset={DATABASE_CONFIG['charset']}"
+    )
+
+
+def configure_async_engine(url: str = None, **engine_kwargs):
+    """
+    Create (or replace) the async engine
+
+    Args:
+        url: Async database URL (default: build_async_url())
+        engine_kwargs: Extra create_async_engine arguments
+
+    Returns:
+        AsyncEngine: The new engine
+    """
+    global _async_engine, _AsyncSessionLocal
+
+    url = url or build_async_url()
+
+    options = {'pool_pre_ping': True, 'echo': False}
+    if not url.startswith('sqlite'):
+        options.update(
+            pool_size=ASYNC_DATABASE_SETTINGS.get('pool_size', 20),
+            max_overflow=ASYNC_DATABASE_SETTINGS.get('max_overflow', 40),
+            pool_recycle=ASYNC_DATABASE_SETTINGS.get('pool_recycle', 3600)
+        )
+    options.update(engine_kwargs)
+
+    _async_engine = create_async_engine(url, **options)
+    _AsyncSessionLocal = async_sessionmaker(
+        bind=_async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False  # Objects stay readable after commit (no lazy IO)
+    )
+    return _async_engine
+
+
+def get_async_engine():
+    """Get the async engine (created on first use)"""
+    if _async_engine is None:
+        configure_async_engine()
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    """Get the AsyncSession factory (created on first use)"""
+    if _AsyncSessionLocal is None:
+        configure_async_engine()
+    return _AsyncSessionLocal
+
+
+@asynccontextmanager
+async def get_async_db_context():
+    """
+    Async context manager for database sessions - AUTO close
+
+    Usage:
+        async with get_async_db_context() as db:
+            result = await db.execute(select(Patient).limit(10))
+            # Auto-commits on success, auto-rollback on error
+
+    Yields:
+        AsyncSession: SQLAlchemy async session
+    """
+    session = get_async_sessionmaker()()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+async def get_async_db():
+    """
+    FastAPI dependency - one AsyncSession per request
+
+    Usage:
+        @router.get("/patients/{national_id}")
+        async def get_patient(national_id: str, db: AsyncSession = Depends(get_async_db)):
+            ...
+
+    Yields:
+        AsyncSession: Closed when the request finishes
+    """
+    session = get_async_sessionmaker()()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def init_async_db():
+    """Create all database tables through the async engine"""
+    from core.database import Base
+    import core.models
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def dispose_async_engine():
+    """Close all pooled connections (call on application shutdown)"""
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+# Export everything
+__all__ = [
+    'build_async_url',
+    'configure_async_engine',
+    'get_async_engine',
+    'get_async_sessionmaker',
+    'get_async_db_context',
+    'get_async_db',
+    'init_async_db',
+    'dispose_async_engine'
+]
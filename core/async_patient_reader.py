@@ -0,0 +1,178 @@
+"""
+Async Patient Reader - Non-blocking versions of the hot patient read paths
+For FastAPI endpoints: every method takes the request's AsyncSession
+(see core/async_database.get_async_db) and returns the same dicts as the
+sync managers, sharing the patient cache and search index with them
+
+Location: core/async_patient_reader.py
+"""
+
+import asyncio
+from typing import List, Optional
+
+from sqlalchemy import select, desc, or_
+from sqlalchemy.orm import selectinload
+
+from core.models import Patient, PatientCard, Visit, LabResult, ImagingResult
+from core.patient_aggregate import aggregate_loader
+from core.patient_cache import patient_cache
+from core.patient_search_index import patient_search_index
+from core.patient_summary import PatientSummary, to_summaries
+from core.pagination import keyset_page_async
+from core.search_engine import search_engine, convert_patient_to_dict
+from core.visit_manager import visit_manager
+from core.lab_manager import lab_manager
+from core.imaging_manager import imaging_manager
+
+
+class AsyncPatientReader:
+    """Async read-only access to patients and their records"""
+
+    def __init__(self):
+        pass
+
+    def _patient_select(self):
+        """select(Patient) with the eager loading convert_patient_to_dict needs"""
+        return select(Patient).options(*aggregate_loader.options(search_engine.RESULT_PROFILE))
+
+    # ==================== PATIENTS ====================
+
+    async def get_patient(self, db, national_id: str) -> Optional[dict]:
+        """
+        Get complete patient dict (same as search_engine.search_by_national_id)
+
+        Args:
+            db: AsyncSession
+            national_id: Patient National ID
+
+        Returns:
+            dict: Patient data or None
+        """
+        cached = patient_cache.get(national_id, view='search')
+        if cached is not None:
+            return cached
+
+        version = patient_cache.version
+        result = await db.execute(
+            self._patient_select().where(Patient.national_id == national_id)
+        )
+        patient = result.scalars().first()
+        if not patient:
+            return None
+
+        patient_dict = convert_patient_to_dict(patient)
+        patient_cache.put(national_id, patient_dict, view='search', version=version)  # Stores its own copy
+        return patient_dict
+
+    async def get_patient_by_card(self, db, card_uid: str) -> Optional[dict]:
+        """
+        Get patient dict by active NFC card UID
+
+        Args:
+            db: AsyncSession
+            card_uid: NFC card UID
+
+        Returns:
+            dict: Patient data or None
+        """
+        result = await db.execute(
+            select(PatientCard.patient_national_id).where(
+                PatientCard.card_uid == card_uid,
+                PatientCard.is_active == True
+            )
+        )
+        national_id = result.scalar()
+        if not national_id:
+            return None
+        return await self.get_patient(db, national_id)
+
+    async def get_patients_page(self, db, limit: int = 100, cursor: Optional[str] = None) -> dict:
+        """
+        Get one page of patient summaries ordered by name (keyset pagination)
+
+        Returns:
+            dict: {'patients': [PatientSummary], 'next_cursor': str or None, 'has_more': bool}
+        """
+        rows, next_cursor = await keyset_page_async(
+            db,
+            select(*PatientSummary.COLUMNS),
+            search_engine.PAGE_ORDER,
+            limit,
+            cursor
+        )
+        return {
+            'patients': to_summaries(rows),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+
+    async def search_summaries(self, db, query: str, limit: int = 50) -> List[PatientSummary]:
+        """
+        Universal patient search returning PatientSummary rows
+
+        Args:
+            db: AsyncSession
+            query: Search term (name, national ID, phone or email)
+            limit: Maximum results
+
+        Returns:
+            List[PatientSummary]: Matching patients
+        """
+        clean_query = query.strip()
+        # Ranking is CPU work (and may start a rebuild) - keep it off the event loop
+        ranked = await asyncio.to_thread(patient_search_index.lookup, clean_query, limit)
+
+        if ranked is not None:
+            if not ranked:
+                return []
+            result = await db.execute(
+                select(*PatientSummary.COLUMNS).where(Patient.national_id.in_(ranked))
+            )
+            by_id = {row.national_id: row for row in result.all()}
+            return to_summaries(by_id[nid] for nid in ranked if nid in by_id)
+
+        # Cold start - index still building
+        result = await db.execute(
+            select(*PatientSummary.COLUMNS).where(
+                or_(
+                    Patient.full_name.ilike(f"%{clean_query}%"),
+                    Patient.national_id.contains(clean_query),
+                    Patient.phone.contains(clean_query),
+                    Patient.email.ilike(f"%{clean_query}%")
+                )
+            ).limit(limit)
+        )
+        return to_summaries(result.all())
+
+    # ==================== MEDICAL RECORDS ====================
+
+    async def get_patient_visits(self, db, national_id: str, limit: int = 50) -> List[dict]:
+        """Get visits for a patient (newest first)"""
+        result = await db.execute(
+            select(Visit).options(selectinload(Visit.vital_signs)).where(
+                Visit.patient_national_id == national_id
+            ).order_by(desc(Visit.visit_date), desc(Visit.visit_time)).limit(limit)
+        )
+        return [visit_manager._visit_to_dict(v) for v in result.scalars().all()]
+
+    async def get_patient_lab_results(self, db, national_id: str, limit: int = 50) -> List[dict]:
+        """Get lab results for a patient (newest first)"""
+        result = await db.execute(
+            select(LabResult).where(
+                LabResult.patient_national_id == national_id
+            ).order_by(desc(LabResult.test_date)).limit(limit)
+        )
+        return [lab_manager._lab_to_dict(r) for r in result.scalars().all()]
+
+    async def get_patient_imaging_results(self, db, national_id: str, limit: int = 50) -> List[dict]:
+        """Get imaging results for a patient (newest first)"""
+        result = await db.execute(
+            select(ImagingResult).where(
+                ImagingResult.patient_national_id == national_id
+            ).order_by(desc(ImagingResult.imaging_date)).limit(limit)
+        )
+        return [imaging_manager._imaging_to_dict(r) for r in result.scalars().all()]
+
+
+# Global instance
+async_patient_reader = AsyncPatientReader()
@@ -0,0 +1,399 @@
+"""
+Audit Writer - Background group-commit sink for hardware_audit_logs
+Authentication code submits events to a bounded queue; a writer thread
+inserts them in multi-row batches, spills them to a JSON lines file while
+the database is unreachable and replays the spill file once it is back.
+Rows the database rejects are written one by one; those that still fail
+go to a dead-letter file instead of holding up their batch.
+
+Location: core/audit_writer.py
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+
+from config.hardware_config import AUDIT_WRITER_CONFIG
+from config.settings import BASE_DIR
+from core.database import get_db
+from core.models import HardwareAuditLog, EventType
+
+
+# hardware_audit_logs columns accepted by submit()
+_COLUMNS = (
+    'event_type', 'user_id', 'user_type', 'device_id', 'card_uid', 'fingerprint_id',
+    'success', 'ip_address', 'user_agent', 'error_message', 'event_metadata', 'timestamp'
+)
+
+_INSERT = insert(HardwareAuditLog.__table__)
+
+
+def _event_type(value) -> EventType:
+    if isinstance(value, EventType):
+        return value
+    try:
+        return EventType(value)
+    except ValueError:
+        return EventType.other
+
+
+class AuditLogWriter:
+    """Queue + writer thread doing batched INSERTs into hardware_audit_logs"""
+
+    def __init__(self, flush_interval_ms: int = 500, batch_size: int = 200,
+                 max_queue: int = 10000, block_timeout_ms: int = 50,
+                 replay_interval_ms: int = 30000, spill_file=None, dead_letter_file=None,
+                 enabled: bool = True):
+        """
+        Initialize writer (the thread starts on the first event)
+
+        Args:
+            flush_interval_ms: Maximum time an event waits in the queue
+            batch_size: Write as soon as this many events are queued
+            max_queue: Queue capacity (backpressure limit)
+            block_timeout_ms: How long submit() waits for space before spilling
+            replay_interval_ms: How often the spill file is retried (also under load)
+            spill_file: JSON lines file used while the database is unreachable
+            dead_letter_file: JSON lines file for events the database rejects
+            enabled: False drops audit events
+        """
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.block_timeout = block_timeout_ms / 1000
+        self.replay_interval = replay_interval_ms / 1000
+        self.spill_file = str(spill_file or BASE_DIR / 'data' / 'hardware_audit_spill.jsonl')
+        self.dead_letter_file = str(dead_letter_file or BASE_DIR / 'data' / 'hardware_audit_dead.jsonl')
+        self.enabled = enabled
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self._last_replay = 0.0
+
+        self.written = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.failed_batches = 0
+        self.dead_lettered = 0
+        self.spill_errors = 0  # Events lost because the spill or dead-letter file could not be written
+
+    # ==================== SUBMIT ====================
+
+    def submit(self, event_type, success: bool = True, **fields) -> bool:
+        """
+        Queue one audit event (never touches the database)
+
+        Args:
+            event_type: EventType or its value ('fingerprint_login', 'nfc_card_scan', ...);
+                        unknown values are stored as 'other'
+            success: Whether the operation succeeded
+            **fields: Other hardware_audit_logs columns (user_id, card_uid, ...);
+                      unknown keys go into event_metadata
+
+        Returns:
+            bool: False if the event was spilled to disk instead of queued
+        """
+        if not self.enabled:
+            return True
+
+        metadata = dict(fields.pop('event_metadata', None) or {})
+        row = {column: None for column in _COLUMNS}
+        for key, value in fields.items():
+            if key in row:
+                row[key] = value
+            else:
+                metadata[key] = value
+
+        row['event_type'] = _event_type(event_type)
+        if row['event_type'] is EventType.other and event_type not in (EventType.other, 'other'):
+            metadata.setdefault('event', str(event_type))  # Keep the original name
+        row['success'] = bool(success)
+        row['event_metadata'] = metadata or None
+        row['timestamp'] = row['timestamp'] or datetime.now()
+        for key in ('user_id', 'fingerprint_id'):
+            if row[key] is not None:
+                row[key] = str(row[key])
+
+        self._ensure_started()
+        try:
+            self._queue.put(row, timeout=self.block_timeout)
+            return True
+        except queue.Full:
+            # Backpressure limit reached - keep login latency bounded
+            self._spill([row])
+            return False
+
+    # ==================== WRITER THREAD ====================
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+            # On a timer, so a steady stream of events cannot starve the replay
+            if time.monotonic() - self._last_replay >= self.replay_interval:
+                self._last_replay = time.monotonic()
+                if os.path.exists(self.spill_file) or os.path.exists(self._replay_file):
+                    self.replay_spill()
+
+    def _collect(self) -> List[Dict]:
+        """Wait for the first event, then gather up to batch_size until the interval ends"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> List[Dict]:
+        rows = []
+        while True:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                return rows
+
+    def _insert(self, rows: List[Dict]):
+        """One transaction, multi-row INSERT (executemany)"""
+        db = get_db()
+        try:
+            db.execute(_INSERT, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert_each(self, rows: List[Dict]):
+        """
+        Insert rows one transaction each after their batch was rejected
+
+        Returns:
+            tuple: written count, rejected [(row, error)], rows left unwritten
+                   because the database became unreachable
+        """
+        written, rejected = 0, []
+        for i, row in enumerate(rows):
+            try:
+                self._insert([row])
+            except OperationalError:
+                return written, rejected, rows[i:]
+            except Exception as e:
+                rejected.append((row, e))
+            else:
+                written += 1
+        return written, rejected, []
+
+    def _write(self, rows: List[Dict]) -> bool:
+        with self._flush_lock:
+            try:
+                self._insert(rows)
+            except OperationalError as e:
+                self.failed_batches += 1
+                print(f"⚠️ Audit log write failed ({e}) - spilling {len(rows)} events to disk")
+                self._spill(rows)
+                return False
+            except Exception as e:
+                # One bad row must not spill its whole batch
+                self.failed_batches += 1
+                print(f"⚠️ Audit log batch rejected ({e}) - writing {len(rows)} events one by one")
+                written, rejected, unwritten = self._insert_each(rows)
+                self.written += written
+                self._dead_letter(rejected)
+                if unwritten:
+                    self._spill(unwritten)
+                return not rejected and not unwritten
+            self.written += len(rows)
+            return True
+
+    def flush(self) -> int:
+        """
+        Write everything queued now (synchronously)
+
+        Returns:
+            int: Number of events written
+        """
+        rows = self._drain()
+        written = 0
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            if self._write(batch):
+                written += len(batch)
+        return written
+
+    def stop(self):
+        """Stop the writer thread and flush what is left (shutdown hook)"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    # ==================== SPILL FILE ====================
+
+    @property
+    def _replay_file(self) -> str:
+        return self.spill_file + '.replay'
+
+    @staticmethod
+    def _to_line(row: Dict, error: Exception = None) -> str:
+        record = dict(row)
+        record['event_type'] = row['event_type'].value
+        record['timestamp'] = row['timestamp'].isoformat() if row['timestamp'] else None
+        if error is not None:
+            record['error'] = f"{error.__class__.__name__}: {error}"[:500]
+        return json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+    def _append(self, path: str, lines: List[str]) -> bool:
+        try:
+            with self._spill_lock:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.writelines(lines)
+        except OSError as e:
+            self.spill_errors += len(lines)
+            print(f"❌ Audit file write failed ({e}) - {len(lines)} events lost")
+            return False
+        return True
+
+    def _spill(self, rows: List[Dict]) -> bool:
+        """Append rows to the spill file; on I/O errors they are counted and dropped"""
+        if not self._append(self.spill_file, [self._to_line(row) for row in rows]):
+            return False
+        self.spilled += len(rows)
+        return True
+
+    def _dead_letter(self, rejected: List):
+        """Append rows the database rejected (with the error) to the dead-letter file"""
+        if not rejected:
+            return
+        if self._append(self.dead_letter_file, [self._to_line(row, error) for row, error in rejected]):
+            self.dead_lettered += len(rejected)
+            print(f"⚠️ {len(rejected)} audit events rejected by the database - see {self.dead_letter_file}")
+
+    def replay_spill(self) -> int:
+        """
+        Insert spilled events
+
+        The replay file is kept while the database is unreachable; rows the
+        database rejects go to the dead-letter file.
+
+        Returns:
+            int: Number of events replayed
+        """
+        with self._flush_lock:
+            with self._spill_lock:
+                if not os.path.exists(self._replay_file):
+                    if not os.path.exists(self.spill_file):
+                        return 0
+                    try:
+                        os.replace(self.spill_file, self._replay_file)
+                    except OSError as e:
+                        print(f"❌ Audit spill file rename failed: {e}")
+                        return 0
+
+            rows = []
+            try:
+                with open(self._replay_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Half-written line
+                        record['event_type'] = _event_type(record.get('event_type'))
+                        record['timestamp'] = datetime.fromisoformat(record['timestamp']) \
+                            if record.get('timestamp') else datetime.now()
+                        rows.append({column: record.get(column) for column in _COLUMNS})
+            except OSError as e:
+                print(f"❌ Audit spill file read failed: {e}")
+                return 0
+
+            written, rejected, unwritten = len(rows), [], []
+            try:
+                if rows:
+                    self._insert(rows)
+            except OperationalError:
+                return 0  # Database still unreachable - keep the replay file
+            except Exception:
+                written, rejected, unwritten = self._insert_each(rows)
+
+            self._dead_letter(rejected)
+            self.replayed += written
+            if written:
+                print(f"✅ Replayed {written} spilled audit events")
+
+            if unwritten:
+                # Database went away part way - keep only what is left
+                try:
+                    with open(self._replay_file + '.tmp', 'w', encoding='utf-8') as f:
+                        f.writelines(self._to_line(row) for row in unwritten)
+                    os.replace(self._replay_file + '.tmp', self._replay_file)
+                except OSError as e:
+                    # The replay file still holds the written rows - they will be replayed twice
+                    print(f"❌ Audit replay file rewrite failed: {e}")
+            else:
+                try:
+                    os.remove(self._replay_file)
+                except OSError as e:
+                    print(f"⚠️ Could not remove replayed audit spill file: {e}")
+            return written
+
+    # ==================== STATISTICS ====================
+
+    def stats(self) -> Dict:
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'spilled': self.spilled,
+            'replayed': self.replayed,
+            'failed_batches': self.failed_batches,
+            'dead_lettered': self.dead_lettered,
+            'spill_errors': self.spill_errors
+        }
+
+
+# Global instance
+audit_writer = AuditLogWriter(
+    flush_interval_ms=AUDIT_WRITER_CONFIG.get('flush_interval_ms', 500),
+    batch_size=AUDIT_WRITER_CONFIG.get('batch_size', 200),
+    max_queue=AUDIT_WRITER_CONFIG.get('max_queue', 10000),
+    block_timeout_ms=AUDIT_WRITER_CONFIG.get('block_timeout_ms', 50),
+    replay_interval_ms=AUDIT_WRITER_CONFIG.get('replay_interval_ms', 30000),
+    spill_file=BASE_DIR / AUDIT_WRITER_CONFIG.get('spill_file', 'data/hardware_audit_spill.jsonl'),
+    dead_letter_file=BASE_DIR / AUDIT_WRITER_CONFIG.get('dead_letter_file', 'data/hardware_audit_dead.jsonl'),
+    enabled=AUDIT_WRITER_CONFIG.get('enabled', True)
+)
+
+# Flush queued events on normal interpreter exit
+atexit.register(audit_writer.stop)
@@ -8,7 +8,9 @@ from core.database import get_db
 from core.models import User, Patient
 from utils.security import hash_password, verify_password
 from typing import Tuple, Optional, Dict
-from sqlalchemy import text
+from core.card_registry import card_registry
+from core.card_usage_recorder import card_usage_recorder
+from core.audit_writer import audit_writer
 
 
 class AuthManager:
@@ -51,36 +53,39 @@ class AuthManager:
         Handles BOTH doctors (owner_id = user_id) and patients (owner_id = national_id)
         """
         try:
+            # Resolve card in memory (database only on a registry miss)
+            card = card_registry.lookup(card_uid, ['nfc_cards'])
+            
+            if not card:
+                print(f"❌ Card {card_uid} not found in database")
+                self._audit_nfc_login(card_uid, False, error="Card not recognized")
+                return False, "Card not recognized", None
+            
+            owner_id, card_type, is_active, status = card.owner_id, card.card_type, card.is_active, card.status
+            
+            print(f"✅ Card found: UID={card.card_uid}, Type={card_type}, Active={is_active}, Status={status}")
+            print(f"   Owner ID: {owner_id}, Name: {card.owner_name}")
+            
+            # Check if active
+            if is_active in [0, False, '0', 'false']:
+                self._audit_nfc_login(card_uid, False, owner_id, card_type, "Card is inactive")
+                return False, "Card is inactive", None
+            
+            # Check status
+            if status and str(status).lower() != 'active':
+                self._audit_nfc_login(card_uid, False, owner_id, card_type, f"Card status: {status}")
+                return False, f"Card status: {status}", None
+            
+            # The registry can lag a deactivation made elsewhere - confirm in the database
+            current = card_registry.confirm(card)
+            if current is None or not current.usable:
+                error = "Card not recognized" if current is None else (
+                    f"Card status: {current.status}" if current.is_active else "Card is inactive"
+                )
+                self._audit_nfc_login(card_uid, False, owner_id, card_type, error)
+                return False, error, None
+            
             with get_db() as db:
-                # Query card from nfc_cards table
-                result = db.execute(
-                    text("""
-                        SELECT card_uid, owner_id, owner_name, card_type, 
-                               is_active, status
-                        FROM nfc_cards 
-                        WHERE card_uid = :card_uid
-                    """),
-                    {"card_uid": card_uid}
-                ).fetchone()
-                
-                if not result:
-                    print(f"❌ Card {card_uid} not found in database")
-                    return False, "Card not recognized", None
-                
-                # Parse result
-                db_card_uid, owner_id, owner_name, card_type, is_active, status = result
-                
-                print(f"✅ Card found: UID={db_card_uid}, Type={card_type}, Active={is_active}, Status={status}")
-                print(f"   Owner ID: {owner_id}, Name: {owner_name}")
-                
-                # Check if active
-                if is_active in [0, False, '0', 'false']:
-                    return False, "Card is inactive", None
-                
-                # Check status
-                if status and str(status).lower() != 'active':
-                    return False, f"Card status: {status}", None
-                
                 # Handle based on card type
                 if card_type == 'doctor':
                     # Doctor: owner_id is user_id in users table
@@ -118,6 +123,13 @@ class AuthManager:
                 else:
                     return False, f"Unknown card type: {card_type}", None
                 
+                # Usage stats are written behind (read-only login)
+                card_usage_recorder.record(
+                    card.card_uid, card.source,
+                    patient_national_id=owner_id if card_type == 'patient' else None
+                )
+                self._audit_nfc_login(card_uid, True, owner_id, card_type)
+                
                 # Store current user
                 self.current_user = user_data
                 
@@ -129,6 +141,19 @@ class AuthManager:
             traceback.print_exc()
             return False, f"Card authentication failed: {str(e)}", None
     
+    def _audit_nfc_login(self, card_uid: str, success: bool, owner_id=None,
+                         card_type: str = None, error: str = None):
+        """Queue NFC login event for hardware_audit_logs (written in the background)"""
+        audit_writer.submit(
+            'nfc_card_scan' if success else 'failed_login',
+            success=success,
+            user_id=owner_id,
+            user_type=card_type,
+            device_id='nfc',
+            card_uid=card_uid,
+            error_message=error
+        )
+    
     def _convert_user_to_dict(self, user: User) -> Dict:
         """Convert User model to dictionary"""
         return {
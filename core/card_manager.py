@@ -5,8 +5,15 @@ Location: core/card_manager.py (REPLACE YOUR FILE)
 """
 
 from core.database import get_db
-from core.models import DoctorCard, PatientCard, User, Patient
-from datetime import datetime
+from core.models import User, Patient
+from core.patient_aggregate import aggregate_loader
+from core.patient_cache import patient_cache
+from core.patient_loader import (
+    allergies_to_dicts, chronic_diseases_to_dicts, family_history_to_dicts,
+    disabilities_to_dicts, emergency_directives_to_dict, lifestyle_to_dict
+)
+from core.card_registry import card_registry
+from core.card_usage_recorder import card_usage_recorder
 
 
 def safe_get_attr(obj, attr_name, default=None):
@@ -43,61 +50,54 @@ class CardManager:
         Returns:
             dict: Card information or None
         """
+        # Resolve the UID in memory (doctor cards first), status from the database
+        entry = self._usable_card(card_uid, ['doctor_cards', 'patient_cards'])
+        if not entry:
+            return None
+
         db = get_db()
         try:
-            # Try doctor card first
-            dc = db.query(DoctorCard).filter(
-                DoctorCard.card_uid == card_uid,
-                DoctorCard.is_active == True
-            ).first()
-
-            if dc:
-                # Update last used
-                dc.last_used = datetime.now()
-                db.commit()
+            if entry.card_type == 'doctor':
+                # Usage stats are written behind (read-only tap)
+                card_usage_recorder.record(card_uid, entry.source)
 
+                user = db.get(User, entry.owner_id)
                 return {
                     "card_type": "doctor",
-                    "card_uid": dc.card_uid,
-                    "full_name": dc.full_name,
-                    "username": dc.username,
-                    "user_id": dc.user_id,
+                    "card_uid": entry.card_uid,
+                    "full_name": entry.owner_name,
+                    "username": user.username if user else None,
+                    "user_id": entry.owner_id,
                     "user": {
-                        "user_id": dc.user.user_id,
-                        "username": dc.user.username,
-                        "full_name": dc.user.full_name,
-                        "role": safe_get_attr(dc.user, 'role', 'doctor'),
-                        "specialization": safe_get_attr(dc.user, 'specialization'),
-                        "hospital": safe_get_attr(dc.user, 'hospital')
-                    } if dc.user else None
+                        "user_id": user.user_id,
+                        "username": user.username,
+                        "full_name": user.full_name,
+                        "role": safe_get_attr(user, 'role', 'doctor'),
+                        "specialization": safe_get_attr(user, 'specialization'),
+                        "hospital": safe_get_attr(user, 'hospital')
+                    } if user else None
                 }
 
-            # Try patient card
-            pc = db.query(PatientCard).filter(
-                PatientCard.card_uid == card_uid,
-                PatientCard.is_active == True
-            ).first()
-
-            if pc:
-                # Update last used
-                pc.last_used = datetime.now()
-                db.commit()
-
-                return {
-                    "card_type": "patient",
-                    "card_uid": pc.card_uid,
-                    "full_name": pc.full_name,
-                    "national_id": pc.patient_national_id,  # ✅ Correct attribute
-                    "patient": {
-                        "national_id": pc.patient.national_id,
-                        "full_name": pc.patient.full_name,
-                        "age": safe_get_attr(pc.patient, 'age', 0),
-                        "gender": safe_get_attr(pc.patient, 'gender', 'Unknown'),
-                        "blood_type": safe_get_attr(pc.patient, 'blood_type', 'Unknown'),
-                    } if pc.patient else None
-                }
-
-            return None
+            card_usage_recorder.record(card_uid, entry.source, patient_national_id=entry.owner_id)
+
+            patient = db.query(
+                Patient.national_id, Patient.full_name, Patient.age,
+                Patient.gender, Patient.blood_type
+            ).filter(Patient.national_id == entry.owner_id).first()
+
+            return {
+                "card_type": "patient",
+                "card_uid": entry.card_uid,
+                "full_name": entry.owner_name,
+                "national_id": entry.owner_id,  # ✅ Correct attribute
+                "patient": {
+                    "national_id": patient.national_id,
+                    "full_name": patient.full_name,
+                    "age": safe_get_attr(patient, 'age', 0),
+                    "gender": safe_get_attr(patient, 'gender', 'Unknown'),
+                    "blood_type": safe_get_attr(patient, 'blood_type', 'Unknown'),
+                } if patient else None
+            }
         finally:
             db.close()
 
@@ -112,21 +112,42 @@ class CardManager:
         Returns:
             dict: Complete patient data or None
         """
-        db = get_db()
-        try:
-            # Find patient card
-            patient_card = db.query(PatientCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
+        national_id = self._get_card_national_id(card_uid)
 
-            if not patient_card:
-                return None
+        if not national_id:
+            return None
+
+        # Re-scanning a card is served from the patient cache
+        return patient_cache.get_or_load(
+            national_id,
+            lambda: self._load_patient_dict(national_id),
+            view='card'
+        )
+
+    def _get_card_national_id(self, card_uid: str):
+        """Get national ID of the patient owning an active card"""
+        entry = self._usable_card(card_uid, ['patient_cards'])
+        return entry.owner_id if entry else None
+
+    @staticmethod
+    def _usable_card(card_uid: str, sources: list):
+        """
+        Registry entry of an active card, re-checked against the database
+        (the registry can lag a deactivation made by another process)
+        """
+        entry = card_registry.get_active(card_uid, sources)
+        if not entry:
+            return None
+        entry = card_registry.confirm(entry)
+        return entry if entry is not None and entry.usable else None
 
-            # ✅ FIXED: Use correct attribute name
-            patient = db.query(Patient).filter_by(
-                national_id=patient_card.patient_national_id
-            ).first()
+    def _load_patient_dict(self, national_id: str):
+        """Load complete patient dict from the database (cache miss path)"""
+        db = get_db()
+        try:
+            # Load patient with all relationships up front
+            # (one query per relationship, not per access)
+            patient = aggregate_loader.load(db, national_id, 'clinical')
 
             if not patient:
                 return None
@@ -150,17 +171,17 @@ class CardManager:
 
             # JSON fields - safe access
             patient_dict['emergency_contact'] = safe_get_attr(patient, 'emergency_contact', {}) or {}
-            patient_dict['allergies'] = safe_get_attr(patient, 'allergies', []) or []
-            patient_dict['chronic_diseases'] = safe_get_attr(patient, 'chronic_diseases', []) or []
-            
-            # Phase 8-11 fields - may not exist in older schemas
-            patient_dict['family_history'] = safe_get_attr(patient, 'family_history', {}) or {}
-            patient_dict['disabilities_special_needs'] = safe_get_attr(patient, 'disabilities_special_needs', {}) or {}
-            patient_dict['emergency_directives'] = safe_get_attr(patient, 'emergency_directives', {}) or {}
-            patient_dict['lifestyle'] = safe_get_attr(patient, 'lifestyle', {}) or {}
             patient_dict['insurance'] = safe_get_attr(patient, 'insurance', {}) or {}
             patient_dict['external_links'] = safe_get_attr(patient, 'external_links', {}) or {}
 
+            # Clinical relationships - plain dicts, never ORM instances
+            patient_dict['allergies'] = allergies_to_dicts(patient)
+            patient_dict['chronic_diseases'] = chronic_diseases_to_dicts(patient)
+            patient_dict['family_history'] = family_history_to_dicts(patient)
+            patient_dict['disabilities_special_needs'] = disabilities_to_dicts(patient)
+            patient_dict['emergency_directives'] = emergency_directives_to_dict(patient)
+            patient_dict['lifestyle'] = lifestyle_to_dict(patient)
+
             # Relationships - convert to lists (safely)
             try:
                 if hasattr(patient, 'current_medications'):
@@ -169,7 +190,7 @@ class CardManager:
                             'name': safe_get_attr(m, 'medication_name', 'Unknown'),
                             'dosage': safe_get_attr(m, 'dosage', ''),
                             'frequency': safe_get_attr(m, 'frequency', ''),
-                            'started_date': str(m.started_date) if hasattr(m, 'started_date') and m.started_date else None
+                            'started_date': str(m.start_date) if m.start_date else None
                         }
                         for m in patient.current_medications 
                         if safe_get_attr(m, 'is_active', True)
@@ -246,7 +267,7 @@ class CardManager:
             return patient_dict
 
         except Exception as e:
-            print(f"Error in get_patient_by_card: {e}")
+            print(f"Error loading patient {national_id}: {e}")
             import traceback
             traceback.print_exc()
             return None
@@ -263,29 +284,26 @@ class CardManager:
         Returns:
             dict: Doctor user data or None
         """
+        entry = card_registry.get_active(card_uid, ['doctor_cards'])
+        if not entry:
+            return None
+
         db = get_db()
         try:
-            doctor_card = db.query(DoctorCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
-
-            if doctor_card:
-                user = db.query(User).filter_by(
-                    user_id=doctor_card.user_id).first()
-                if user:
-                    return {
-                        'user_id': safe_get_attr(user, 'user_id'),
-                        'username': safe_get_attr(user, 'username', ''),
-                        'full_name': safe_get_attr(user, 'full_name', 'Unknown'),
-                        'role': safe_get_attr(user, 'role', 'doctor'),
-                        'national_id': safe_get_attr(user, 'national_id', ''),
-                        'specialization': safe_get_attr(user, 'specialization'),
-                        'hospital': safe_get_attr(user, 'hospital'),
-                        'license_number': safe_get_attr(user, 'license_number'),
-                        'email': safe_get_attr(user, 'email', ''),
-                        'phone': safe_get_attr(user, 'phone', '')
-                    }
+            user = db.get(User, entry.owner_id)
+            if user:
+                return {
+                    'user_id': safe_get_attr(user, 'user_id'),
+                    'username': safe_get_attr(user, 'username', ''),
+                    'full_name': safe_get_attr(user, 'full_name', 'Unknown'),
+                    'role': safe_get_attr(user, 'role', 'doctor'),
+                    'national_id': safe_get_attr(user, 'national_id', ''),
+                    'specialization': safe_get_attr(user, 'specialization'),
+                    'hospital': safe_get_attr(user, 'hospital'),
+                    'license_number': safe_get_attr(user, 'license_number'),
+                    'email': safe_get_attr(user, 'email', ''),
+                    'phone': safe_get_attr(user, 'phone', '')
+                }
             return None
         finally:
             db.close()
@@ -312,27 +330,11 @@ class CardManager:
 
     def is_doctor_card(self, card_uid: str):
         """Check if card is a doctor card"""
-        db = get_db()
-        try:
-            card = db.query(DoctorCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
-            return card is not None
-        finally:
-            db.close()
+        return card_registry.get_active(card_uid, ['doctor_cards']) is not None
 
     def is_patient_card(self, card_uid: str):
         """Check if card is a patient card"""
-        db = get_db()
-        try:
-            card = db.query(PatientCard).filter_by(
-                card_uid=card_uid,
-                is_active=True
-            ).first()
-            return card is not None
-        finally:
-            db.close()
+        return card_registry.get_active(card_uid, ['patient_cards']) is not None
 
 
 # Global instance
@@ -0,0 +1,362 @@
+"""
+Card Registry - In-memory index of NFC card UIDs
+One hash lookup resolves a tapped card to (type, owner, status) instead of
+querying doctor_cards, patient_cards and nfc_cards in turn
+
+Location: core/card_registry.py
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, case, and_
+
+from config.hardware_config import CARD_REGISTRY_CONFIG
+from core.database import get_db
+from core.models import DoctorCard, PatientCard, NFCCard, CardStatus
+
+
+class CardEntry:
+    """Registry entry for one card row"""
+
+    __slots__ = ('card_uid', 'card_type', 'owner_id', 'owner_name', 'status', 'is_active', 'source')
+
+    def __init__(self, card_uid, card_type, owner_id, owner_name, status, is_active, source):
+        self.card_uid = card_uid
+        self.card_type = card_type      # 'doctor' or 'patient'
+        self.owner_id = owner_id        # user_id (doctor) or national_id (patient)
+        self.owner_name = owner_name
+        self.status = status            # 'active', 'inactive', 'lost', 'damaged'
+        self.is_active = is_active
+        self.source = source            # Table the card came from
+
+    @property
+    def usable(self) -> bool:
+        """Active flag set and status active"""
+        return bool(self.is_active) and (self.status or 'active') == 'active'
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"<CardEntry(uid='{self.card_uid}', type='{self.card_type}', owner='{self.owner_id}')>"
+
+
+def _status_value(status) -> Optional[str]:
+    return status.value if hasattr(status, 'value') else status
+
+
+# Card tables in lookup order (doctor cards win, as in CardManager.get_card)
+#   source -> (model, query columns, row -> CardEntry)
+_SOURCES = {
+    'doctor_cards': (
+        DoctorCard,
+        (DoctorCard.card_uid, DoctorCard.user_id, DoctorCard.full_name,
+         DoctorCard.status, DoctorCard.is_active),
+        lambda r: CardEntry(r[0], 'doctor', r[1], r[2], _status_value(r[3]), r[4], 'doctor_cards')
+    ),
+    'patient_cards': (
+        PatientCard,
+        (PatientCard.card_uid, PatientCard.patient_national_id, PatientCard.full_name,
+         PatientCard.status, PatientCard.is_active),
+        lambda r: CardEntry(r[0], 'patient', r[1], r[2], _status_value(r[3]), r[4], 'patient_cards')
+    ),
+    'nfc_cards': (
+        NFCCard,
+        (NFCCard.card_uid, NFCCard.owner_id, NFCCard.owner_name, NFCCard.card_type,
+         NFCCard.status, NFCCard.is_active),
+        lambda r: CardEntry(r[0], r[3], r[1], r[2], _status_value(r[4]), r[5], 'nfc_cards')
+    ),
+}
+
+
+class CardRegistry:
+    """Thread-safe UID -> CardEntry index, one dict per card table"""
+
+    def __init__(self, poll_interval: float = 30, enabled: bool = True,
+                 unknown_ttl: float = 5, max_unknown: int = 10000):
+        """
+        Initialize registry
+
+        Args:
+            poll_interval: Seconds between change checks (0 disables polling)
+            enabled: False sends every lookup to the database
+            unknown_ttl: Seconds a UID found in no card table is answered
+                         without querying again (0 disables)
+            max_unknown: Most unknown UIDs remembered at once
+        """
+        self.poll_interval = poll_interval
+        self.enabled = enabled
+        self.unknown_ttl = unknown_ttl
+        self.max_unknown = max_unknown
+
+        self._tables = {source: {} for source in _SOURCES}
+        self._fingerprints = {}  # source -> (count, max id, usable id sum, state checksum)
+        self._unknown = {}       # card_uid -> monotonic expiry (negative cache)
+        self._lock = threading.RLock()
+
+        self.ready = False
+        self.warmed_at = None
+        self.hits = 0
+        self.misses = 0
+        self.unknown_hits = 0
+
+        self._poll_thread = None
+        self._stop_event = threading.Event()
+
+    # ==================== LOOKUP ====================
+
+    def lookup(self, card_uid: str, sources: List[str] = None,
+               active_only: bool = False) -> Optional[CardEntry]:
+        """
+        Resolve a card UID
+
+        Args:
+            card_uid: NFC card UID
+            sources: Tables to consider, in order (default: all)
+            active_only: Skip cards whose is_active flag is off
+
+        Returns:
+            CardEntry or None
+        """
+        if not card_uid:
+            return None
+        sources = sources or list(_SOURCES)
+
+        if self.enabled and self.ready:
+            with self._lock:
+                known, entry = self._find(card_uid, sources, active_only)
+                if known:
+                    self.hits += 1
+                    return entry
+                expires = self._unknown.get(card_uid)
+                if expires is not None and expires > time.monotonic():
+                    self.unknown_hits += 1
+                    return None
+                self.misses += 1
+            # Not indexed yet (e.g. registered by another process)
+        else:
+            with self._lock:
+                self.misses += 1
+
+        self.refresh_card(card_uid)
+
+        with self._lock:
+            known, entry = self._find(card_uid, sources, active_only)
+            if not known and self.unknown_ttl:
+                # Unknown card: skip the three table queries on repeated scans
+                if len(self._unknown) >= self.max_unknown:
+                    self._unknown.clear()
+                self._unknown[card_uid] = time.monotonic() + self.unknown_ttl
+            return entry
+
+    def get_active(self, card_uid: str, sources: List[str] = None) -> Optional[CardEntry]:
+        """Resolve a card UID, returning None if the card is inactive"""
+        return self.lookup(card_uid, sources, active_only=True)
+
+    def confirm(self, entry: CardEntry) -> Optional[CardEntry]:
+        """
+        Re-read one card row from its table (authentication paths)
+
+        The registry can lag a change made by another process until the
+        next poll; this updates the entry from the database.
+
+        Args:
+            entry: Entry returned by lookup()
+
+        Returns:
+            CardEntry: Current entry, or None if the row is gone
+        """
+        model, columns, to_entry = _SOURCES[entry.source]
+        db = get_db()
+        try:
+            row = db.query(*columns).filter(model.card_uid == entry.card_uid).first()
+        finally:
+            db.close()
+
+        current = to_entry(row) if row else None
+        with self._lock:
+            if current is None:
+                self._tables[entry.source].pop(entry.card_uid, None)
+            else:
+                self._tables[entry.source][entry.card_uid] = current
+        return current
+
+    def _find(self, card_uid: str, sources: List[str], active_only: bool):
+        """(uid known in any card table, matching entry in sources or None)"""
+        for source in sources:
+            entry = self._tables[source].get(card_uid)
+            if entry is not None and (not active_only or entry.is_active):
+                return True, entry
+        known = any(card_uid in table for table in self._tables.values())
+        return known, None
+
+    # ==================== LOADING ====================
+
+    def warm(self) -> int:
+        """
+        Load every card from all card tables (column-only queries)
+
+        Returns:
+            int: Number of cards indexed
+        """
+        started = time.perf_counter()
+        db = get_db()
+        try:
+            tables = {}
+            fingerprints = {}
+            for source in _SOURCES:
+                tables[source] = self._load_table(db, source)
+                fingerprints[source] = self._fingerprint(db, source)
+        finally:
+            db.close()
+
+        with self._lock:
+            self._tables = tables
+            self._fingerprints = fingerprints
+            self._unknown.clear()
+            self.ready = True
+            self.warmed_at = time.time()
+
+        count = sum(len(t) for t in tables.values())
+        print(f"✅ Card registry loaded: {count} cards in {time.perf_counter() - started:.3f}s")
+        return count
+
+    def warm_in_background(self):
+        """Warm the registry on a daemon thread and start polling"""
+        def run():
+            try:
+                self.warm()
+            except Exception as e:
+                print(f"❌ Card registry warm-up failed: {e}")
+            if self.poll_interval:
+                self.start_polling()
+
+        threading.Thread(target=run, name='card-registry-warm', daemon=True).start()
+
+    def refresh_card(self, card_uid: str):
+        """
+        Reload one UID from every card table
+        Call after registering, activating or deactivating a card.
+        """
+        db = get_db()
+        try:
+            found = {}
+            for source, (model, columns, to_entry) in _SOURCES.items():
+                row = db.query(*columns).filter(model.card_uid == card_uid).first()
+                found[source] = to_entry(row) if row else None
+        finally:
+            db.close()
+
+        with self._lock:
+            self._unknown.pop(card_uid, None)
+            for source, entry in found.items():
+                if entry is None:
+                    self._tables[source].pop(card_uid, None)
+                else:
+                    self._tables[source][card_uid] = entry
+
+    def remove(self, card_uid: str):
+        """Drop a UID from the registry"""
+        with self._lock:
+            for table in self._tables.values():
+                table.pop(card_uid, None)
+
+    def _load_table(self, db, source: str) -> Dict[str, CardEntry]:
+        _, columns, to_entry = _SOURCES[source]
+        return {row[0]: to_entry(row) for row in db.query(*columns)}
+
+    # ==================== DELTA POLL ====================
+
+    def _fingerprint(self, db, source: str):
+        """
+        (count, max id, sum of usable ids, state checksum)
+        Changes on insert, delete, (de)activation and any status change
+        (active -> lost/damaged/inactive) of a single card.
+        """
+        model = _SOURCES[source][0]
+        usable = and_(model.is_active == True, model.status == CardStatus.active)
+        state = case(
+            (model.status == CardStatus.inactive, 2),
+            (model.status == CardStatus.lost, 3),
+            (model.status == CardStatus.damaged, 5),
+            else_=1
+        ) + case((model.is_active == True, 7), else_=0)
+        return tuple(db.query(
+            func.count(model.id),
+            func.max(model.id),
+            func.sum(case((usable, model.id), else_=0)),
+            func.sum(model.id * state)
+        ).one())
+
+    def poll(self) -> List[str]:
+        """
+        Reload only the card tables whose fingerprint changed
+
+        Returns:
+            List[str]: Reloaded tables
+        """
+        changed = []
+        db = get_db()
+        try:
+            for source in _SOURCES:
+                fingerprint = self._fingerprint(db, source)
+                if fingerprint != self._fingerprints.get(source):
+                    table = self._load_table(db, source)
+                    with self._lock:
+                        self._tables[source] = table
+                        self._fingerprints[source] = fingerprint
+                        self._unknown.clear()  # New cards may be among them
+                    changed.append(source)
+        finally:
+            db.close()
+        return changed
+
+    def start_polling(self, interval: float = None):
+        """Start the delta poll daemon thread"""
+        if self._poll_thread is not None and self._poll_thread.is_alive():
+            return
+
+        interval = interval or self.poll_interval
+        self._stop_event.clear()
+
+        def run():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"❌ Card registry poll failed: {e}")
+
+        self._poll_thread = threading.Thread(target=run, name='card-registry-poll', daemon=True)
+        self._poll_thread.start()
+
+    def stop_polling(self):
+        """Stop the delta poll thread"""
+        self._stop_event.set()
+        if self._poll_thread is not None:
+            self._poll_thread.join(timeout=5)
+            self._poll_thread = None
+
+    # ==================== STATISTICS ====================
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'cards': {source: len(table) for source, table in self._tables.items()},
+                'hits': self.hits,
+                'misses': self.misses,
+                'unknown_hits': self.unknown_hits,
+                'unknown_cached': len(self._unknown),
+                'warmed_at': self.warmed_at
+            }
+
+
+# Global instance
+card_registry = CardRegistry(
+    poll_interval=CARD_REGISTRY_CONFIG.get('poll_interval', 30),
+    enabled=CARD_REGISTRY_CONFIG.get('enabled', True),
+    unknown_ttl=CARD_REGISTRY_CONFIG.get('unknown_ttl', 5),
+    max_unknown=CARD_REGISTRY_CONFIG.get('max_unknown', 10000)
+)
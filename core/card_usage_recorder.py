@@ -0,0 +1,231 @@
+"""
+Card Usage Recorder - Write-behind batching of card scan statistics
+Card taps are buffered in memory and flushed periodically as batched UPDATEs
+(last_used, use_count and Patient.nfc_scan_count), so authentication stays
+read-only
+
+Location: core/card_usage_recorder.py
+"""
+
+import atexit
+import threading
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import update, bindparam, func
+
+from config.hardware_config import CARD_USAGE_CONFIG
+from core.database import get_db
+from core.models import DoctorCard, PatientCard, NFCCard, Patient
+
+
+# Card table -> model
+_CARD_MODELS = {
+    'doctor_cards': DoctorCard,
+    'patient_cards': PatientCard,
+    'nfc_cards': NFCCard,
+}
+
+
+def _increment_statement(model, key_column, count_column, time_column):
+    """UPDATE table SET count = COALESCE(count, 0) + :n, time = :ts WHERE key = :key"""
+    return update(model.__table__).where(
+        key_column == bindparam('b_key')
+    ).values({
+        count_column.name: func.coalesce(count_column, 0) + bindparam('b_count'),
+        time_column.name: bindparam('b_time'),
+    })
+
+
+_CARD_UPDATES = {
+    source: _increment_statement(model, model.card_uid, model.use_count, model.last_used)
+    for source, model in _CARD_MODELS.items()
+}
+
+_PATIENT_UPDATE = _increment_statement(
+    Patient, Patient.national_id, Patient.nfc_scan_count, Patient.nfc_card_last_scan
+)
+
+
+class CardUsageRecorder:
+    """Buffer card scans and write them in batches on a background thread"""
+
+    def __init__(self, flush_interval: float = 5, max_pending: int = 1000, enabled: bool = True):
+        """
+        Initialize recorder
+
+        Args:
+            flush_interval: Seconds between flushes (upper bound of data lost on crash)
+            max_pending: Flush early when this many cards/patients are buffered
+            enabled: False drops usage statistics
+        """
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enabled = enabled
+
+        self._cards = {}     # (source, card_uid) -> [count, last_used]
+        self._patients = {}  # national_id -> [count, last_scan]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+        self._thread = None
+        self._wake = threading.Event()
+        self._stopping = False
+
+        self.flushed_scans = 0
+        self.flush_count = 0
+        self.failed_flushes = 0
+
+    # ==================== RECORD ====================
+
+    def record(self, card_uid: str, source: str, patient_national_id: str = None):
+        """
+        Record one card scan (no database access)
+
+        Args:
+            card_uid: NFC card UID
+            source: Card table ('doctor_cards', 'patient_cards' or 'nfc_cards')
+            patient_national_id: Patient owning the card (updates nfc_scan_count)
+        """
+        if not self.enabled or source not in _CARD_MODELS:
+            return
+
+        now = datetime.now()
+        with self._lock:
+            entry = self._cards.get((source, card_uid))
+            if entry is None:
+                self._cards[(source, card_uid)] = [1, now]
+            else:
+                entry[0] += 1
+                entry[1] = now
+
+            if patient_national_id:
+                entry = self._patients.get(patient_national_id)
+                if entry is None:
+                    self._patients[patient_national_id] = [1, now]
+                else:
+                    entry[0] += 1
+                    entry[1] = now
+
+            pending = len(self._cards) + len(self._patients)
+
+        self._ensure_started()
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def pending(self) -> Dict:
+        """Buffered scans not yet written"""
+        with self._lock:
+            return {
+                'cards': sum(count for count, _ in self._cards.values()),
+                'patients': sum(count for count, _ in self._patients.values())
+            }
+
+    # ==================== FLUSH ====================
+
+    def flush(self) -> int:
+        """
+        Write buffered scans as one batched UPDATE per table
+
+        Returns:
+            int: Number of card scans written
+        """
+        with self._flush_lock:
+            with self._lock:
+                cards, self._cards = self._cards, {}
+                patients, self._patients = self._patients, {}
+
+            if not cards and not patients:
+                return 0
+
+            by_source = {}
+            for (source, card_uid), (count, last_used) in cards.items():
+                by_source.setdefault(source, []).append(
+                    {'b_key': card_uid, 'b_count': count, 'b_time': last_used}
+                )
+            patient_rows = [
+                {'b_key': national_id, 'b_count': count, 'b_time': last_scan}
+                for national_id, (count, last_scan) in patients.items()
+            ]
+
+            db = get_db()
+            try:
+                for source, rows in by_source.items():
+                    db.execute(_CARD_UPDATES[source], rows)
+                if patient_rows:
+                    db.execute(_PATIENT_UPDATE, patient_rows)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.failed_flushes += 1
+                print(f"❌ Card usage flush failed: {e}")
+                self._requeue(cards, patients)
+                return 0
+            finally:
+                db.close()
+
+            scans = sum(count for count, _ in cards.values())
+            self.flushed_scans += scans
+            self.flush_count += 1
+            return scans
+
+    def _requeue(self, cards: Dict, patients: Dict):
+        """Put unwritten scans back (merged with scans recorded meanwhile)"""
+        with self._lock:
+            for buffer, failed in ((self._cards, cards), (self._patients, patients)):
+                for key, (count, last) in failed.items():
+                    entry = buffer.get(key)
+                    if entry is None:
+                        buffer[key] = [count, last]
+                    else:
+                        entry[0] += count
+                        entry[1] = max(entry[1], last)
+
+    # ==================== BACKGROUND THREAD ====================
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self.start()
+
+    def start(self):
+        """Start the flush thread"""
+        self._stopping = False
+
+        def run():
+            while not self._stopping:
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+                self.flush()
+
+        self._thread = threading.Thread(target=run, name='card-usage-flush', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flush thread and write what is left"""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict:
+        return {
+            'pending': self.pending(),
+            'flushed_scans': self.flushed_scans,
+            'flush_count': self.flush_count,
+            'failed_flushes': self.failed_flushes
+        }
+
+
+# Global instance
+card_usage_recorder = CardUsageRecorder(
+    flush_interval=CARD_USAGE_CONFIG.get('flush_interval', 5),
+    max_pending=CARD_USAGE_CONFIG.get('max_pending', 1000),
+    enabled=CARD_USAGE_CONFIG.get('enabled', True)
+)
+
+# Write remaining scans on normal interpreter exit
+atexit.register(card_usage_recorder.stop)
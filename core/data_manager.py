@@ -6,6 +6,7 @@ MySQL Version - Compatible with existing GUI
 from datetime import datetime, date
 from database.database_manager import *
 from core.models import *
+from core.statistics_engine import statistics_engine
 import json
 
 class DataManager:
@@ -57,16 +58,16 @@ class DataManager:
             return db.query(ImagingResult).count()
     
     def get_dashboard_stats(self):
-        """Get dashboard statistics"""
-        with get_db() as db:
-            return {
-                'total_patients': db.query(Patient).count(),
-                'total_doctors': db.query(Doctor).count(),
-                'total_visits': db.query(Visit).count(),
-                'total_lab_results': db.query(LabResult).count(),
-                'total_imaging': db.query(ImagingResult).count(),
-                'active_cards': db.query(NFCCard).filter(NFCCard.is_active == True).count()
-            }
+        """Get dashboard statistics (cached, see core/statistics_engine.py)"""
+        stats = statistics_engine.get_statistics()
+        return {
+            'total_patients': stats['patients']['total'],
+            'total_doctors': stats['doctors']['total'],
+            'total_visits': stats['records']['visits'],
+            'total_lab_results': stats['records']['lab_results'],
+            'total_imaging': stats['records']['imaging_results'],
+            'active_cards': stats['active_cards']
+        }
     
     def get_recent_activity(self, limit=10):
         """Get recent system activity"""
@@ -170,35 +171,34 @@ class DataManager:
     
     def get_statistics_report(self):
         """Generate comprehensive statistics report"""
-        with get_db() as db:
-            stats = {
-                'patients': {
-                    'total': db.query(Patient).count(),
-                    'male': db.query(Patient).filter(Patient.gender == 'Male').count(),
-                    'female': db.query(Patient).filter(Patient.gender == 'Female').count(),
-                    'with_nfc': db.query(Patient).filter(Patient.nfc_card_assigned == True).count()
-                },
-                'doctors': {
-                    'total': db.query(Doctor).count()
-                },
-                'medical_records': {
-                    'visits': db.query(Visit).count(),
-                    'lab_results': db.query(LabResult).count(),
-                    'imaging_results': db.query(ImagingResult).count(),
-                    'surgeries': db.query(Surgery).count(),
-                    'hospitalizations': db.query(Hospitalization).count(),
-                    'vaccinations': db.query(Vaccination).count()
-                },
-                'health_data': {
-                    'allergies': db.query(Allergy).count(),
-                    'chronic_diseases': db.query(ChronicDisease).count(),
-                    'current_medications': db.query(CurrentMedication).filter(
-                        CurrentMedication.is_active == True
-                    ).count()
-                }
+        stats = statistics_engine.get_statistics()
+        patients = stats['patients']
+        records = stats['records']
+        
+        return {
+            'patients': {
+                'total': patients['total'],
+                'male': patients['male'],
+                'female': patients['female'],
+                'with_nfc': patients['with_nfc']
+            },
+            'doctors': {
+                'total': stats['doctors']['total']
+            },
+            'medical_records': {
+                'visits': records['visits'],
+                'lab_results': records['lab_results'],
+                'imaging_results': records['imaging_results'],
+                'surgeries': records['surgeries'],
+                'hospitalizations': records['hospitalizations'],
+                'vaccinations': records['vaccinations']
+            },
+            'health_data': {
+                'allergies': records['allergies'],
+                'chronic_diseases': records['chronic_diseases'],
+                'current_medications': records['active_medications']
             }
-            
-            return stats
+        }
     
     def search_all(self, search_term):
         """Search across patients, doctors, and records"""
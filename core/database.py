@@ -12,7 +12,7 @@ from pathlib import Path
 
 # Add config to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config.database_config import DATABASE_CONFIG
+from config.database_config import DATABASE_CONFIG, SQL_INSTRUMENTATION_SETTINGS
 
 # Create Base for models
 Base = declarative_base()
@@ -34,6 +34,12 @@ engine = create_engine(
     max_overflow=20
 )
 
+# SQL instrumentation (no-op until enabled or a query budget is active)
+from core.query_monitor import query_monitor
+query_monitor.install(engine)
+if SQL_INSTRUMENTATION_SETTINGS.get('enabled', False):
+    query_monitor.enable()
+
 # Create SessionLocal
 SessionLocal = sessionmaker(
     bind=engine,
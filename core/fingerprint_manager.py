@@ -5,8 +5,8 @@ MySQL Version - Compatible with existing GUI
 
 from datetime import datetime
 from core.database import get_db
-from core.models import Doctor, User, HardwareAuditLog
-import uuid
+from core.models import Doctor, User, HardwareAuditLog, EventType
+from core.audit_writer import audit_writer
 
 class FingerprintManager:
     """Manage fingerprint biometric authentication for doctors"""
@@ -184,27 +184,29 @@ class FingerprintManager:
                 'login_count': d.fingerprint_login_count
             } for d in doctors]
     
+    # Fingerprint actions -> hardware_audit_logs event types
+    _EVENT_TYPES = {
+        'authentication_success': 'fingerprint_login',
+        'authentication_failed': 'failed_login',
+    }
+
     def _log_fingerprint_event(self, user_id, event_type, success, fingerprint_id=None):
-        """Log fingerprint event to audit log"""
-        with get_db() as db:
-            log = HardwareAuditLog(
-                event_id=f"FP-{uuid.uuid4().hex[:12]}",
-                timestamp=datetime.now(),
-                event_type=f"fingerprint_{event_type}",
-                user_id=user_id,
-                fingerprint_id=fingerprint_id,
-                accessed_by=user_id,
-                access_type='fingerprint',
-                success=success
-            )
-            db.add(log)
-            db.commit()
+        """Queue fingerprint event for the audit log (written in the background)"""
+        audit_writer.submit(
+            self._EVENT_TYPES.get(event_type, 'other'),
+            success=success,
+            user_id=user_id,
+            user_type='doctor',
+            device_id='fingerprint',
+            fingerprint_id=fingerprint_id,
+            event_metadata={'event': f"fingerprint_{event_type}"}
+        )
     
     def get_fingerprint_logs(self, user_id=None, limit=50):
         """Get fingerprint authentication logs"""
         with get_db() as db:
             query = db.query(HardwareAuditLog).filter(
-                HardwareAuditLog.event_type.like('fingerprint_%')
+                HardwareAuditLog.device_id == 'fingerprint'
             )
             
             if user_id:
@@ -218,7 +220,8 @@ class FingerprintManager:
         """Get recent failed fingerprint attempts"""
         with get_db() as db:
             return db.query(HardwareAuditLog).filter(
-                HardwareAuditLog.event_type == 'fingerprint_authentication_failed',
+                HardwareAuditLog.device_id == 'fingerprint',
+                HardwareAuditLog.event_type == EventType.failed_login,
                 HardwareAuditLog.success == False
             ).order_by(
                 HardwareAuditLog.timestamp.desc()
@@ -0,0 +1,533 @@
+"""
+Gateway Store - Database storage for the provider gateway (payment_gateway/main.py)
+Providers, API tokens and submitted records live in the database, so every
+uvicorn worker sees the same data. Submissions from concurrent requests are
+group-committed: one multi-row INSERT and one commit per batch. Submissions
+carrying an idempotency key are stored once; replays get the original record.
+
+Location: core/gateway_store.py
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, date
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, select, func, tuple_
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from config.database_config import GATEWAY_STORAGE_SETTINGS
+from core.async_database import get_async_engine, get_async_sessionmaker
+from core.database import Base
+from core.models import ApiProvider, ApiToken, ExternalRecord
+
+
+# record_type -> public ID prefix
+RECORD_TYPES = {
+    'lab_results': 'LAB',
+    'imaging_results': 'IMG',
+    'visits': 'VIS',
+    'surgeries': 'SRG',
+    'hospitalizations': 'HSP',
+    'prescriptions': 'RX'
+}
+
+_INSERT = insert(ExternalRecord.__table__)
+
+
+def new_record_id(record_type: str) -> str:
+    """Globally unique record ID (no counter shared between workers needed)"""
+    return f"{RECORD_TYPES[record_type]}-{uuid.uuid4().hex}"
+
+
+def idempotency_key_for(record_type: str, data: Dict, idempotency_key: str = None) -> Optional[str]:
+    """
+    Explicit key, or the provider's "external_id" as natural key (per record type)
+
+    Raises:
+        ValueError: Key longer than the idempotency_key column
+    """
+    if not idempotency_key and data.get('external_id') not in (None, ''):
+        idempotency_key = f"{record_type}:{data['external_id']}"
+    if not idempotency_key:
+        return None
+    if len(str(idempotency_key)) > 100:
+        raise ValueError("Idempotency key is longer than 100 characters")
+    return str(idempotency_key)
+
+
+def validate_submission(record_type: str, data: Dict):
+    """
+    Check what the external_records columns need before a row is built or queued
+
+    Raises:
+        ValueError: Unknown record type or invalid patient_national_id
+    """
+    if record_type not in RECORD_TYPES:
+        raise ValueError(f"Unknown record type: {record_type}")
+    national_id = data.get('patient_national_id')
+    if not isinstance(national_id, str) or not national_id.strip() or len(national_id) > 14:
+        raise ValueError("patient_national_id must be a string of at most 14 characters")
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+
+class DedupIndex:
+    """Bounded, time-expiring map of idempotency key -> stored record (LRU eviction)"""
+
+    def __init__(self, max_entries: int = 100000, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, record)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, record):
+        self._entries[key] = (time.monotonic() + self.ttl, record)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _dedup_key(row: Dict):
+    return (row['provider_id'], row['idempotency_key']) if row.get('idempotency_key') else None
+
+
+def _row_dict(record) -> Dict:
+    return {
+        'record_id': record.record_id,
+        'record_type': record.record_type,
+        'patient_national_id': record.patient_national_id,
+        'provider_id': record.provider_id,
+        'provider_name': record.provider_name,
+        'idempotency_key': record.idempotency_key,
+        'payload': record.payload,
+        'submitted_at': record.submitted_at
+    }
+
+
+class GatewayStore:
+    """Async storage with a group-commit writer task (one per worker process)"""
+
+    def __init__(self, batch_size: int = 200, linger_ms: int = 2,
+                 max_queue: int = 5000, token_cache_ttl: int = 60,
+                 dedup_max_entries: int = 100000, dedup_ttl_seconds: int = 86400):
+        """
+        Initialize store (the writer task starts on the first submission)
+
+        Args:
+            batch_size: Max submissions per INSERT / commit
+            linger_ms: Extra wait for more submissions before committing
+            max_queue: Pending submissions before submit() waits (backpressure)
+            token_cache_ttl: Seconds tokens/providers are served from memory
+            dedup_max_entries: Idempotency keys remembered in memory
+            dedup_ttl_seconds: How long a key is answered from memory
+        """
+        self.batch_size = batch_size
+        self.linger = linger_ms / 1000
+        self.max_queue = max_queue
+        self.token_cache_ttl = token_cache_ttl
+
+        self._queue = None
+        self._writer = None
+        self._inflight = {}  # Dedup key -> Future of the queued submission
+        self.dedup = DedupIndex(dedup_max_entries, dedup_ttl_seconds)
+
+        self._tokens = {}
+        self._providers = {}
+        self._cache_loaded_at = 0.0
+        self._cache_lock = None
+
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.replays = 0
+
+    # ==================== SETUP ====================
+
+    async def init(self, providers: List[Dict] = None, tokens: List[Dict] = None):
+        """
+        Create the gateway tables and seed providers/tokens if empty
+
+        Safe to run from every worker at startup: a worker that loses the
+        seeding race just skips it.
+
+        Args:
+            providers: [{'id', 'name', 'type', 'contact', 'address', 'status'}]
+            tokens: [{'token', 'provider_id', 'permissions', 'status', 'created_at', 'expires_at'}]
+        """
+        tables = [ApiProvider.__table__, ApiToken.__table__, ExternalRecord.__table__]
+        try:
+            async with get_async_engine().begin() as conn:
+                await conn.run_sync(Base.metadata.create_all, tables=tables)
+        except Exception as e:
+            # Another worker created them at the same moment
+            print(f"⚠️ Gateway tables: {e}")
+
+        if not providers:
+            return
+
+        session_factory = get_async_sessionmaker()
+        async with session_factory() as session:
+            if await session.scalar(select(func.count()).select_from(ApiProvider)):
+                return
+            try:
+                await session.execute(insert(ApiProvider.__table__), [
+                    {
+                        'id': p['id'], 'name': p['name'], 'provider_type': p.get('type'),
+                        'contact': p.get('contact'), 'address': p.get('address'),
+                        'status': p.get('status', 'active')
+                    }
+                    for p in providers
+                ])
+                if tokens:
+                    await session.execute(insert(ApiToken.__table__), [
+                        {
+                            'token': t['token'], 'provider_id': t['provider_id'],
+                            'permissions': t.get('permissions', []),
+                            'status': t.get('status', 'active'),
+                            'created_at': date.fromisoformat(t['created_at']) if t.get('created_at') else None,
+                            'expires_at': date.fromisoformat(t['expires_at']) if t.get('expires_at') else None
+                        }
+                        for t in tokens
+                    ])
+                await session.commit()
+                print(f"✅ Seeded {len(providers)} gateway providers")
+            except IntegrityError:
+                await session.rollback()
+
+        self._cache_loaded_at = 0.0
+
+    async def close(self):
+        """Write pending submissions and stop the writer task (app shutdown)"""
+        if self._writer is not None and not self._writer.done():
+            await self._queue.put(None)
+            await self._writer
+        self._writer = None
+        self._queue = None
+
+    # ==================== PROVIDERS & TOKENS ====================
+
+    async def _refresh_cache(self):
+        if time.monotonic() - self._cache_loaded_at < self.token_cache_ttl:
+            return
+
+        if self._cache_lock is None:
+            self._cache_lock = asyncio.Lock()
+        async with self._cache_lock:
+            if time.monotonic() - self._cache_loaded_at < self.token_cache_ttl:
+                return
+
+            session_factory = get_async_sessionmaker()
+            async with session_factory() as session:
+                providers = (await session.execute(select(ApiProvider).order_by(ApiProvider.id))).scalars().all()
+                tokens = (await session.execute(select(ApiToken))).scalars().all()
+
+            self._providers = {
+                p.id: {
+                    "id": p.id,
+                    "name": p.name,
+                    "type": p.provider_type,
+                    "contact": p.contact,
+                    "address": p.address,
+                    "status": p.status
+                }
+                for p in providers
+            }
+            self._tokens = {
+                t.token: {
+                    "provider_id": t.provider_id,
+                    "provider_name": self._providers.get(t.provider_id, {}).get("name"),
+                    "token": t.token,
+                    "permissions": list(t.permissions or []),
+                    "created_at": _iso(t.created_at),
+                    "expires_at": _iso(t.expires_at),
+                    "status": t.status
+                }
+                for t in tokens
+            }
+            self._cache_loaded_at = time.monotonic()
+
+    async def get_token(self, token: str) -> Optional[Dict]:
+        """Token info dict or None if unknown"""
+        await self._refresh_cache()
+        return self._tokens.get(token)
+
+    async def list_tokens(self) -> List[Dict]:
+        await self._refresh_cache()
+        return list(self._tokens.values())
+
+    async def list_providers(self) -> List[Dict]:
+        await self._refresh_cache()
+        return list(self._providers.values())
+
+    async def get_provider(self, provider_id: int) -> Optional[Dict]:
+        await self._refresh_cache()
+        return self._providers.get(provider_id)
+
+    # ==================== SUBMISSIONS ====================
+
+    @staticmethod
+    def build_record(record_type: str, token_info: Dict, data: Dict,
+                     idempotency_key: str = None) -> Dict:
+        """
+        external_records row for one submission (ID assigned here)
+
+        Without an explicit idempotency key, a provider-side "external_id"
+        in the data is used as the natural key (per record type).
+
+        Raises:
+            ValueError: Unknown record type or invalid patient_national_id
+        """
+        validate_submission(record_type, data)
+        return {
+            'record_id': new_record_id(record_type),
+            'record_type': record_type,
+            'patient_national_id': data['patient_national_id'],
+            'provider_id': token_info['provider_id'],
+            'provider_name': token_info['provider_name'],
+            'idempotency_key': idempotency_key_for(record_type, data, idempotency_key),
+            'payload': data,
+            'submitted_at': datetime.now()
+        }
+
+    async def _find_existing(self, session, keys) -> Dict:
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            records = await session.execute(
+                select(ExternalRecord).where(
+                    tuple_(ExternalRecord.provider_id, ExternalRecord.idempotency_key).in_(keys[start:start + 500])
+                )
+            )
+            for record in records.scalars():
+                found[(record.provider_id, record.idempotency_key)] = _row_dict(record)
+        return found
+
+    async def insert_records(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Insert rows in one transaction (multi-row INSERT)
+
+        Rows whose idempotency key is already stored (or repeated in rows)
+        are not inserted again.
+
+        Returns:
+            list: The stored row for each input row - the original one for replays
+        """
+        if not rows:
+            return []
+
+        keyed = {}
+        for row in rows:
+            key = _dedup_key(row)
+            if key is not None:
+                keyed.setdefault(key, row)
+        existing = {key: self.dedup.get(key) for key in keyed}
+        existing = {key: row for key, row in existing.items() if row is not None}
+
+        session_factory = get_async_sessionmaker()
+        for attempt in range(2):
+            async with session_factory() as session:
+                missing = [key for key in keyed if key not in existing]
+                if missing:
+                    existing.update(await self._find_existing(session, missing))
+
+                stored, new_rows = [], []
+                for row in rows:
+                    key = _dedup_key(row)
+                    if key is None:
+                        new_rows.append(row)
+                        stored.append(row)
+                    elif key in existing:
+                        stored.append(existing[key])
+                    else:
+                        if keyed[key] is row:
+                            new_rows.append(row)
+                        stored.append(keyed[key])
+
+                try:
+                    if new_rows:
+                        await session.execute(_INSERT, new_rows)
+                        await session.commit()
+                except IntegrityError:
+                    # Another worker stored one of the keys meanwhile - look again
+                    await session.rollback()
+                    if attempt or not keyed:
+                        raise
+                    continue
+            break
+
+        self.replays += len(rows) - len(new_rows)
+        for key, row in keyed.items():
+            self.dedup.put(key, existing.get(key, row))
+        return stored
+
+    async def submit(self, record_type: str, token_info: Dict, data: Dict,
+                     idempotency_key: str = None) -> Dict:
+        """
+        Store one submission - returns after the batch holding it is committed
+
+        Args:
+            record_type: Key of RECORD_TYPES
+            token_info: Authenticated token info (provider_id, provider_name)
+            data: Submitted JSON (must contain patient_national_id)
+            idempotency_key: Optional client key - replays return the original row
+
+        Returns:
+            dict: The stored row (record_id, submitted_at, ...)
+        """
+        row = self.build_record(record_type, token_info, data, idempotency_key)
+        key = _dedup_key(row)
+        if key is not None:
+            cached = self.dedup.get(key)
+            if cached is not None:
+                self.replays += 1
+                return cached
+            if key in self._inflight:
+                # Same key already queued by a concurrent retry
+                self.replays += 1
+                return await asyncio.shield(self._inflight[key])
+
+        self._start_writer()
+        future = asyncio.get_running_loop().create_future()
+        if key is not None:
+            self._inflight[key] = future
+        try:
+            await self._queue.put((row, future))
+            return await future
+        finally:
+            if key is not None and self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _start_writer(self):
+        if self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def _next_batch(self):
+        """Block for one submission, then take what is queued (up to batch_size)"""
+        item = await self._queue.get()
+        if item is None:
+            return None, True
+
+        batch = [item]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _write_loop(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if not batch:
+                continue
+            try:
+                stored = await self.insert_records([row for row, _ in batch])
+            except Exception as e:
+                self.failed_batches += 1
+                print(f"❌ Gateway write failed ({len(batch)} records): {e}")
+                if len(batch) == 1 or isinstance(e, OperationalError):
+                    # Database unreachable - one transaction per row will not help
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                await self._write_rows(batch)
+                continue
+
+            self.written += len(batch)
+            self.batches += 1
+            for (_, future), row in zip(batch, stored):
+                if not future.done():
+                    future.set_result(row)
+
+    async def _write_rows(self, batch):
+        """Isolate bad records after a failed batch: one transaction per row"""
+        outage = None
+        for row, future in batch:
+            if outage is not None:
+                if not future.done():
+                    future.set_exception(outage)
+                continue
+            try:
+                stored = (await self.insert_records([row]))[0]
+            except Exception as e:
+                if isinstance(e, OperationalError):
+                    outage = e  # Database went away - fail the rest without trying
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.written += 1
+            self.batches += 1
+            if not future.done():
+                future.set_result(stored)
+
+    # ==================== RETRIEVAL ====================
+
+    async def get_patient_records(self, patient_id: str) -> Dict:
+        """All submitted records of a patient, grouped by type in submission order"""
+        result = {"national_id": patient_id}
+        result.update({record_type: [] for record_type in RECORD_TYPES})
+
+        session_factory = get_async_sessionmaker()
+        async with session_factory() as session:
+            rows = await session.execute(
+                select(
+                    ExternalRecord.record_type, ExternalRecord.record_id,
+                    ExternalRecord.provider_name, ExternalRecord.submitted_at,
+                    ExternalRecord.payload
+                )
+                .where(ExternalRecord.patient_national_id == patient_id)
+                .order_by(ExternalRecord.id)
+            )
+            for record_type, record_id, provider_name, submitted_at, payload in rows:
+                result.setdefault(record_type, []).append({
+                    "id": record_id,
+                    "submitted_by": provider_name,
+                    "submitted_at": _iso(submitted_at),
+                    **(payload or {})
+                })
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            'written': self.written,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'avg_batch': round(self.written / self.batches, 1) if self.batches else 0,
+            'replays': self.replays,
+            'dedup_entries': len(self.dedup),
+            'pending': self._queue.qsize() if self._queue is not None else 0
+        }
+
+
+# Global instance
+gateway_store = GatewayStore(**GATEWAY_STORAGE_SETTINGS)
@@ -5,6 +5,7 @@ Location: core/hospitalization_manager.py
 
 from core.database import get_db
 from core.models import Hospitalization
+from core.patient_cache import patient_cache
 from sqlalchemy import desc
 from typing import List, Dict, Optional
 from datetime import datetime, date
@@ -23,6 +24,7 @@ class HospitalizationManager:
             db.add(hosp)
             db.commit()
             db.refresh(hosp)
+            patient_cache.invalidate(hosp.patient_national_id)
             return hosp
     
     def get_patient_hospitalizations(self, national_id: str) -> List[Dict]:
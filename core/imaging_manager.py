@@ -7,6 +7,7 @@ Location: core/imaging_manager.py
 
 from core.database import get_db
 from core.models import ImagingResult
+from core.patient_cache import patient_cache
 from sqlalchemy import desc
 from typing import List, Dict, Optional
 from datetime import datetime, date
@@ -25,6 +26,7 @@ class ImagingManager:
             db.add(imaging)
             db.commit()
             db.refresh(imaging)
+            patient_cache.invalidate(imaging.patient_national_id)
             return imaging
     
     def get_patient_imaging_results(self, national_id: str, limit: int = 50) -> List[Dict]:
@@ -79,6 +81,7 @@ class ImagingManager:
                     setattr(imaging, key, value)
             
             db.commit()
+            patient_cache.invalidate(imaging.patient_national_id)
             return True
     
     def delete_imaging_result(self, imaging_id: int) -> bool:
@@ -91,8 +94,10 @@ class ImagingManager:
             if not imaging:
                 return False
             
+            national_id = imaging.patient_national_id
             db.delete(imaging)
             db.commit()
+            patient_cache.invalidate(national_id)
             return True
     
     def _imaging_to_dict(self, imaging: ImagingResult) -> Dict:
@@ -0,0 +1,466 @@
+"""
+Ingest Queue - Durable local queue between the gateway handlers and the database
+Handlers validate a submission, append it to a SQLite queue file and answer
+202 with a tracking ID. Consumer tasks claim jobs in batches and write them
+through core/gateway_store.py, retrying with backoff and dead-lettering jobs
+that keep failing. Every uvicorn worker on the host shares the same file.
+
+Location: core/ingest_queue.py
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import OperationalError
+
+from config.database_config import INGEST_QUEUE_SETTINGS
+from config.settings import BASE_DIR
+from core.gateway_store import gateway_store, idempotency_key_for, validate_submission
+
+
+# Job states
+QUEUED = 'queued'
+PROCESSING = 'processing'
+RETRYING = 'retrying'
+STORED = 'stored'
+DEAD = 'dead'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tracking_id TEXT NOT NULL UNIQUE,
+    record_type TEXT NOT NULL,
+    provider_id INTEGER NOT NULL,
+    provider_name TEXT,
+    idempotency_key TEXT,
+    data TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    record_id TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ix_jobs_idempotency ON jobs (provider_id, idempotency_key);
+CREATE INDEX IF NOT EXISTS ix_jobs_ready ON jobs (status, next_attempt_at);
+"""
+
+_JOB_COLUMNS = (
+    'id, tracking_id, record_type, provider_id, provider_name, idempotency_key, data, '
+    'status, attempts, next_attempt_at, claimed_by, claimed_at, record_id, error, created_at, updated_at'
+)
+
+
+def _job_dict(row) -> Dict:
+    job = dict(zip([c.strip() for c in _JOB_COLUMNS.split(',')], row))
+    job['data'] = json.loads(job['data'])
+    return job
+
+
+class IngestQueue:
+    """SQLite-backed job queue with async batch consumers"""
+
+    def __init__(self, path=None, enabled: bool = True, consumers: int = 2,
+                 batch_size: int = 200, poll_interval_ms: int = 200,
+                 max_attempts: int = 8, retry_backoff_ms: int = 500,
+                 max_backoff_seconds: int = 300, lease_seconds: int = 120,
+                 retention_hours: int = 72):
+        """
+        Initialize queue (the file is opened on first use)
+
+        Args:
+            path: SQLite queue file (relative paths are under the project root)
+            enabled: False = handlers write inline (no queue)
+            consumers: Consumer tasks per worker process
+            batch_size: Jobs written per database transaction
+            poll_interval_ms: Idle consumer polling interval
+            max_attempts: Failed writes before a job is dead-lettered
+            retry_backoff_ms: First retry delay (doubles per attempt)
+            max_backoff_seconds: Longest retry delay
+            lease_seconds: Claims older than this are treated as abandoned
+            retention_hours: Stored jobs kept for status lookups
+        """
+        path = path or 'data/gateway_ingest_queue.db'
+        self.path = str(path if os.path.isabs(str(path)) else BASE_DIR / path)
+        self.enabled = enabled
+        self.consumers = consumers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval_ms / 1000
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.max_backoff = max_backoff_seconds
+        self.lease = lease_seconds
+        self.retention = retention_hours * 3600
+
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._conn = None
+        self._lock = threading.Lock()
+        self._read_conn = None  # Status lookups - never waits on the writer lock
+        self._read_lock = threading.Lock()
+        self._pending = []  # Enqueue requests waiting for the next group commit
+        self._pending_lock = threading.Lock()
+        self._leading = False
+        self._tasks = []
+        self._stopping = None
+        self._last_purge = 0.0
+
+        self._outages = 0  # Consecutive batches deferred because the database was unreachable
+
+        self.processed = 0
+        self.failed = 0
+        self.deferred = 0
+        self.dead_lettered = 0
+
+    # ==================== STORAGE ====================
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")  # Accepted (202) jobs survive power loss
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _read(self, query: str, params=()) -> List:
+        """Fetch rows on the read-only connection (WAL readers do not block writers)"""
+        with self._read_lock:
+            if self._read_conn is None:
+                if not os.path.exists(self.path):
+                    with self._lock:
+                        self._connection()  # Creates the file and schema
+                self._read_conn = sqlite3.connect(
+                    f"file:{self.path}?mode=ro", uri=True, timeout=30, check_same_thread=False
+                )
+            return self._read_conn.execute(query, params).fetchall()
+
+    def _run(self, fn, *args):
+        """Run fn(conn, *args) in one IMMEDIATE transaction (serialized per process)"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    # ==================== PRODUCER ====================
+
+    def _enqueue(self, conn, record_type, token_info, data, idempotency_key):
+        now = time.time()
+        tracking_id = f"TRK-{uuid.uuid4().hex}"
+        cursor = conn.execute(
+            "INSERT INTO jobs (tracking_id, record_type, provider_id, provider_name, idempotency_key, "
+            "data, status, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (provider_id, idempotency_key) DO NOTHING",
+            (tracking_id, record_type, token_info['provider_id'], token_info['provider_name'],
+             idempotency_key, json.dumps(data, ensure_ascii=False), QUEUED, now, now, now)
+        )
+        if cursor.rowcount:
+            return {'tracking_id': tracking_id, 'status': QUEUED, 'replayed': False}
+
+        # Same idempotency key already queued - answer with the original job
+        tracking_id, status = conn.execute(
+            "SELECT tracking_id, status FROM jobs WHERE provider_id = ? AND idempotency_key = ?",
+            (token_info['provider_id'], idempotency_key)
+        ).fetchone()
+        return {'tracking_id': tracking_id, 'status': status, 'replayed': True}
+
+    def enqueue_sync(self, record_type: str, token_info: Dict, data: Dict,
+                     idempotency_key: str = None) -> Dict:
+        """
+        Durably queue one validated submission
+
+        Args:
+            record_type: Key of gateway_store.RECORD_TYPES
+            token_info: Authenticated token info (provider_id, provider_name)
+            data: Submitted JSON
+            idempotency_key: Optional client key - a repeat returns the first job
+
+        Returns:
+            dict: {'tracking_id', 'status', 'replayed'}
+        """
+        validate_submission(record_type, data)
+        key = idempotency_key_for(record_type, data, idempotency_key)
+        request = {'args': (record_type, token_info, data, key), 'done': threading.Event(),
+                   'result': None, 'error': None}
+
+        with self._pending_lock:
+            self._pending.append(request)
+            leader = not self._leading
+            self._leading = True
+
+        if leader:
+            # Group commit: one fsync'd transaction for every request queued meanwhile
+            while True:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                    if not batch:
+                        self._leading = False
+                        break
+                try:
+                    results = self._run(lambda conn: [self._enqueue(conn, *r['args']) for r in batch])
+                except Exception as e:
+                    for r in batch:
+                        r['error'] = e
+                else:
+                    for r, result in zip(batch, results):
+                        r['result'] = result
+                for r in batch:
+                    r['done'].set()
+
+        request['done'].wait()
+        if request['error'] is not None:
+            raise request['error']
+        return request['result']
+
+    async def enqueue(self, record_type: str, token_info: Dict, data: Dict,
+                      idempotency_key: str = None) -> Dict:
+        """enqueue_sync() off the event loop"""
+        return await asyncio.to_thread(self.enqueue_sync, record_type, token_info, data, idempotency_key)
+
+    # ==================== CONSUMERS ====================
+
+    def _claim(self, conn, limit):
+        now = time.time()
+        claim = f"{self.worker_id}-{uuid.uuid4().hex[:8]}"
+        conn.execute(
+            "UPDATE jobs SET status = ?, claimed_by = ?, claimed_at = ?, updated_at = ? WHERE id IN ("
+            "SELECT id FROM jobs WHERE (status IN (?, ?) AND next_attempt_at <= ?) "
+            "OR (status = ? AND claimed_at < ?) ORDER BY id LIMIT ?)",
+            (PROCESSING, claim, now, now, QUEUED, RETRYING, now,
+             PROCESSING, now - self.lease, limit)
+        )
+        rows = conn.execute(
+            f"SELECT {_JOB_COLUMNS} FROM jobs WHERE claimed_by = ? ORDER BY id", (claim,)
+        ).fetchall()
+        return [_job_dict(row) for row in rows]
+
+    def _outage_backoff(self) -> float:
+        """Delay after a batch deferred by a database outage (doubles per consecutive outage)"""
+        return min(self.max_backoff, self.retry_backoff * 2 ** max(self._outages - 1, 0))
+
+    def _finish(self, conn, stored, failed, deferred):
+        # Every update is fenced by the claim token: a job whose lease expired and
+        # was claimed again by another consumer is left to that consumer
+        now = time.time()
+        conn.executemany(
+            "UPDATE jobs SET status = ?, record_id = ?, error = NULL, claimed_by = NULL, updated_at = ? "
+            "WHERE id = ? AND claimed_by = ?",
+            [(STORED, record_id, now, job['id'], job['claimed_by']) for job, record_id in stored]
+        )
+        dead = 0
+        for job, error in failed:
+            attempts = job['attempts'] + 1
+            if attempts >= self.max_attempts:
+                status, next_attempt = DEAD, now
+            else:
+                status = RETRYING
+                next_attempt = now + min(self.max_backoff, self.retry_backoff * 2 ** (attempts - 1))
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, next_attempt_at = ?, error = ?, "
+                "claimed_by = NULL, updated_at = ? WHERE id = ? AND claimed_by = ?",
+                (status, attempts, next_attempt, error[:500], now, job['id'], job['claimed_by'])
+            ).rowcount
+            if updated and status == DEAD:
+                dead += 1
+
+        # Database outage: not the record's fault - back off without spending an attempt
+        next_attempt = now + self._outage_backoff()
+        conn.executemany(
+            "UPDATE jobs SET status = ?, next_attempt_at = ?, error = ?, claimed_by = NULL, updated_at = ? "
+            "WHERE id = ? AND claimed_by = ?",
+            [(QUEUED if job['attempts'] == 0 else RETRYING, next_attempt, error[:500], now,
+              job['id'], job['claimed_by']) for job, error in deferred]
+        )
+        return dead
+
+    async def _write(self, jobs: List[Dict]):
+        """
+        Store jobs
+
+        Returns:
+            tuple: stored [(job, record_id)], failed [(job, error)] - the record was
+                   rejected, deferred [(job, error)] - the database was unreachable
+        """
+        rows = [
+            gateway_store.build_record(
+                job['record_type'],
+                {'provider_id': job['provider_id'], 'provider_name': job['provider_name']},
+                job['data'],
+                # Retrying a job whose commit outcome was unknown must not duplicate it
+                job['idempotency_key'] or f"ingest:{job['tracking_id']}"
+            )
+            for job in jobs
+        ]
+        try:
+            stored = await gateway_store.insert_records(rows)
+            return [(job, row['record_id']) for job, row in zip(jobs, stored)], [], []
+        except OperationalError as e:
+            # Smaller transactions will not help while the database is unreachable
+            return [], [], [(job, str(e)) for job in jobs]
+        except Exception as e:
+            if len(jobs) == 1:
+                return [], [(jobs[0], str(e))], []
+
+        # Isolate bad records: one transaction per job
+        stored, failed, deferred = [], [], []
+        for i, (job, row) in enumerate(zip(jobs, rows)):
+            try:
+                stored.append((job, (await gateway_store.insert_records([row]))[0]['record_id']))
+            except OperationalError as e:
+                deferred = [(pending, str(e)) for pending in jobs[i:]]
+                break
+            except Exception as e:
+                failed.append((job, str(e)))
+        return stored, failed, deferred
+
+    async def process_once(self) -> int:
+        """Claim and write one batch; returns the number of jobs handled (0 while the database is down)"""
+        jobs = await asyncio.to_thread(self._run, self._claim, self.batch_size)
+        if not jobs:
+            return 0
+
+        stored, failed, deferred = await self._write(jobs)
+        self._outages = self._outages + 1 if deferred else 0
+        dead = await asyncio.to_thread(self._run, self._finish, stored, failed, deferred)
+
+        self.processed += len(stored)
+        self.failed += len(failed)
+        self.deferred += len(deferred)
+        self.dead_lettered += dead
+        if failed:
+            print(f"⚠️ Ingest queue: {len(failed)} jobs failed ({dead} dead-lettered): {failed[0][1][:200]}")
+        if deferred:
+            print(f"⚠️ Ingest queue: database unavailable, {len(deferred)} jobs deferred: {deferred[0][1][:200]}")
+            return 0
+        return len(jobs)
+
+    async def _consume(self):
+        while not self._stopping.is_set():
+            try:
+                handled = await self.process_once()
+                if time.monotonic() - self._last_purge > 3600:
+                    self._last_purge = time.monotonic()
+                    await asyncio.to_thread(self.purge)
+            except Exception as e:
+                print(f"❌ Ingest consumer error: {e}")
+                handled = 0
+
+            if not handled:
+                delay = self._outage_backoff() if self._outages else self.poll_interval
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self):
+        """Start the consumer tasks in the running event loop (app startup)"""
+        if not self.enabled or any(not task.done() for task in self._tasks):
+            return
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._consume()) for _ in range(self.consumers)]
+
+    async def stop(self):
+        """Let consumers finish their current batch, then stop (app shutdown)"""
+        if self._stopping is not None:
+            self._stopping.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ==================== STATUS ====================
+
+    def get_status(self, tracking_id: str, provider_id: int = None) -> Optional[Dict]:
+        """
+        Job status for a tracking ID
+
+        Args:
+            tracking_id: ID returned by enqueue
+            provider_id: Only return the job if it belongs to this provider
+
+        Returns:
+            dict or None: tracking_id, status, record_type, attempts, record_id, error, timestamps
+        """
+        rows = self._read(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE tracking_id = ?", (tracking_id,))
+        if not rows:
+            return None
+
+        job = _job_dict(rows[0])
+        if provider_id is not None and job['provider_id'] != provider_id:
+            return None
+
+        status = job['status']
+        if status == PROCESSING:
+            status = QUEUED if job['attempts'] == 0 else RETRYING
+        return {
+            'tracking_id': job['tracking_id'],
+            'status': status,
+            'record_type': job['record_type'],
+            'patient_national_id': job['data'].get('patient_national_id'),
+            'attempts': job['attempts'],
+            'record_id': job['record_id'],
+            'error': job['error'],
+            'next_attempt_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(job['next_attempt_at']))
+                               if status == RETRYING else None,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(job['created_at'])),
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(job['updated_at']))
+        }
+
+    def requeue_dead(self, tracking_ids: List[str] = None) -> int:
+        """Give dead-lettered jobs (all or the given ones) a fresh set of attempts"""
+        def requeue(conn):
+            now = time.time()
+            query = "UPDATE jobs SET status = ?, attempts = 0, next_attempt_at = ?, updated_at = ? WHERE status = ?"
+            params = [QUEUED, now, now, DEAD]
+            if tracking_ids:
+                query += f" AND tracking_id IN ({', '.join('?' * len(tracking_ids))})"
+                params += list(tracking_ids)
+            return conn.execute(query, params).rowcount
+        return self._run(requeue)
+
+    def purge(self) -> int:
+        """Delete stored jobs older than the retention period"""
+        cutoff = time.time() - self.retention
+        return self._run(lambda conn: conn.execute(
+            "DELETE FROM jobs WHERE status = ? AND updated_at < ?", (STORED, cutoff)
+        ).rowcount)
+
+    def stats(self) -> Dict:
+        counts = dict(self._read("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        return {
+            'jobs': {status: counts.get(status, 0) for status in (QUEUED, PROCESSING, RETRYING, STORED, DEAD)},
+            'processed': self.processed,
+            'failed': self.failed,
+            'deferred': self.deferred,
+            'dead_lettered': self.dead_lettered,
+            'consumers': len([task for task in self._tasks if not task.done()])
+        }
+
+
+# Global instance
+ingest_queue = IngestQueue(**INGEST_QUEUE_SETTINGS)
@@ -7,6 +7,7 @@ Location: core/lab_manager.py
 
 from core.database import get_db
 from core.models import LabResult
+from core.patient_cache import patient_cache
 from sqlalchemy import desc
 from typing import List, Dict, Optional
 from datetime import datetime, date
@@ -25,6 +26,7 @@ class LabManager:
             db.add(lab)
             db.commit()
             db.refresh(lab)
+            patient_cache.invalidate(lab.patient_national_id)
             return lab
     
     def get_patient_lab_results(self, national_id: str, limit: int = 50) -> List[Dict]:
@@ -79,6 +81,7 @@ class LabManager:
                     setattr(lab, key, value)
             
             db.commit()
+            patient_cache.invalidate(lab.patient_national_id)
             return True
     
     def delete_lab_result(self, lab_id: int) -> bool:
@@ -91,8 +94,10 @@ class LabManager:
             if not lab:
                 return False
             
+            national_id = lab.patient_national_id
             db.delete(lab)
             db.commit()
+            patient_cache.invalidate(national_id)
             return True
     
     def _lab_to_dict(self, lab: LabResult) -> Dict:
@@ -4,7 +4,10 @@ Visit, Lab Results, Imaging, and NFC Card Managers
 
 from datetime import datetime, date
 from database.database_manager import DatabaseManager
+from core.database import get_db
 from core.models import Visit, Prescription, LabResult, ImagingResult, NFCCard, HardwareAuditLog
+from core.card_registry import card_registry
+from core.patient_cache import patient_cache
 
 # ============================================================================
 # VISIT MANAGER
@@ -36,6 +39,7 @@ class VisitManager:
             
             db.commit()
             db.refresh(visit)
+            patient_cache.invalidate(visit.patient_national_id)
             return visit
     
     def get_visit(self, visit_id: str):
@@ -79,6 +83,7 @@ class VisitManager:
                 
                 db.commit()
                 db.refresh(visit)
+                patient_cache.invalidate(visit.patient_national_id)
                 return visit
             
             return None
@@ -89,8 +94,10 @@ class VisitManager:
             visit = db.query(Visit).filter(Visit.visit_id == visit_id).first()
             
             if visit:
+                national_id = visit.patient_national_id
                 db.delete(visit)
                 db.commit()
+                patient_cache.invalidate(national_id)
                 return True
             
             return False
@@ -116,6 +123,7 @@ class LabResultsManager:
             db.add(result)
             db.commit()
             db.refresh(result)
+            patient_cache.invalidate(result.patient_national_id)
             return result
     
     def get_lab_result(self, result_id: str):
@@ -159,6 +167,7 @@ class LabResultsManager:
                 
                 db.commit()
                 db.refresh(result)
+                patient_cache.invalidate(result.patient_national_id)
                 return result
             
             return None
@@ -171,8 +180,10 @@ class LabResultsManager:
             ).first()
             
             if result:
+                national_id = result.patient_national_id
                 db.delete(result)
                 db.commit()
+                patient_cache.invalidate(national_id)
                 return True
             
             return False
@@ -199,6 +210,7 @@ class ImagingManager:
             db.add(result)
             db.commit()
             db.refresh(result)
+            patient_cache.invalidate(result.patient_national_id)
             return result
     
     def get_imaging_result(self, imaging_id: str):
@@ -242,6 +254,7 @@ class ImagingManager:
                 
                 db.commit()
                 db.refresh(result)
+                patient_cache.invalidate(result.patient_national_id)
                 return result
             
             return None
@@ -254,8 +267,10 @@ class ImagingManager:
             ).first()
             
             if result:
+                national_id = result.patient_national_id
                 db.delete(result)
                 db.commit()
+                patient_cache.invalidate(national_id)
                 return True
             
             return False
@@ -274,6 +289,7 @@ class NFCManager:
             db.add(card)
             db.commit()
             db.refresh(card)
+            card_registry.refresh_card(card.card_uid)
             return card
     
     def get_card(self, card_uid: str):
@@ -316,6 +332,7 @@ class NFCManager:
             if card:
                 card.is_active = False
                 db.commit()
+                card_registry.refresh_card(card_uid)
                 return True
             
             return False
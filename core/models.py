@@ -6,7 +6,7 @@ Location: database/models.py
 
 from sqlalchemy import (
     Column, Integer, String, Text, Date, DateTime, Time, Boolean, 
-    Enum, ForeignKey, JSON, Index, Float
+    Enum, ForeignKey, JSON, Index, Float, UniqueConstraint
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -211,6 +211,10 @@ class Patient(Base):
 class Allergy(Base):
     """Patient allergies"""
     __tablename__ = 'allergies'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_allergies_patient_date', 'patient_national_id', 'date_identified'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -233,6 +237,10 @@ class Allergy(Base):
 class ChronicDisease(Base):
     """Patient chronic diseases"""
     __tablename__ = 'chronic_diseases'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_chronic_diseases_patient_date', 'patient_national_id', 'date_diagnosed'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -257,6 +265,10 @@ class ChronicDisease(Base):
 class CurrentMedication(Base):
     """Patient current medications"""
     __tablename__ = 'current_medications'
+    __table_args__ = (
+        # Active medications per patient
+        Index('ix_current_medications_patient_active', 'patient_national_id', 'is_active', 'start_date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -285,6 +297,10 @@ class CurrentMedication(Base):
 class Surgery(Base):
     """Surgical procedures"""
     __tablename__ = 'surgeries'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_surgeries_patient_date', 'patient_national_id', 'surgery_date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -314,6 +330,10 @@ class Surgery(Base):
 class Hospitalization(Base):
     """Hospital admissions"""
     __tablename__ = 'hospitalizations'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_hospitalizations_patient_date', 'patient_national_id', 'admission_date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -346,6 +366,10 @@ class Hospitalization(Base):
 class Vaccination(Base):
     """Vaccination records"""
     __tablename__ = 'vaccinations'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_vaccinations_patient_date', 'patient_national_id', 'date_administered'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -520,6 +544,10 @@ class Insurance(Base):
 class Visit(Base):
     """Medical visits"""
     __tablename__ = 'visits'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_visits_patient_date', 'patient_national_id', 'visit_date', 'visit_time'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     visit_id = Column(String(50), unique=True)
@@ -605,6 +633,10 @@ class VitalSign(Base):
 class LabResult(Base):
     """Laboratory test results"""
     __tablename__ = 'lab_results'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_lab_results_patient_date', 'patient_national_id', 'test_date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -634,6 +666,10 @@ class LabResult(Base):
 class ImagingResult(Base):
     """Imaging/radiology results"""
     __tablename__ = 'imaging_results'
+    __table_args__ = (
+        # Patient history ordered by date
+        Index('ix_imaging_results_patient_date', 'patient_national_id', 'imaging_date'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     patient_national_id = Column(String(14), ForeignKey('patients.national_id'), nullable=False)
@@ -750,4 +786,106 @@ class HardwareAuditLog(Base):
     timestamp = Column(DateTime, default=func.now(), index=True)
     
     def __repr__(self):
-        return f"<HardwareAuditLog(event='{self.event_type.value}', user='{self.user_id}')>"
\ No newline at end of file
+        return f"<HardwareAuditLog(event='{self.event_type.value}', user='{self.user_id}')>"
+
+# ==================== STATISTICS SUMMARY ====================
+
+class StatisticsSummary(Base):
+    """Precomputed dashboard statistics (maintained by core/statistics_engine.py)"""
+    __tablename__ = 'statistics_summary'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(50), unique=True, nullable=False)  # e.g. 'database'
+    payload = Column(JSON, nullable=False)
+    compute_ms = Column(Float)
+    computed_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<StatisticsSummary(name='{self.name}', computed_at='{self.computed_at}')>"
+
+
+# ==================== PROVIDER GATEWAY ====================
+
+class ApiProvider(Base):
+    """External healthcare provider (lab, hospital, imaging center, pharmacy)"""
+    __tablename__ = 'api_providers'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(200), nullable=False)
+    provider_type = Column(String(50))  # laboratory, hospital, imaging, pharmacy
+    contact = Column(String(150))
+    address = Column(String(300))
+    status = Column(String(20), default='active')
+    created_at = Column(DateTime, default=func.now())
+    
+    # Relationship
+    tokens = relationship("ApiToken", back_populates="provider", cascade="all, delete-orphan")
+    
+    def __repr__(self):
+        return f"<ApiProvider(id={self.id}, name='{self.name}')>"
+
+
+class ApiToken(Base):
+    """Provider API token and its permissions"""
+    __tablename__ = 'api_tokens'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    token = Column(String(100), unique=True, nullable=False)
+    provider_id = Column(Integer, ForeignKey('api_providers.id'), nullable=False)
+    permissions = Column(JSON)  # e.g. ["submit_lab_results"]
+    status = Column(String(20), default='active')
+    created_at = Column(Date)
+    expires_at = Column(Date)
+    
+    # Relationship
+    provider = relationship("ApiProvider", back_populates="tokens")
+    
+    def __repr__(self):
+        return f"<ApiToken(provider_id={self.provider_id}, status='{self.status}')>"
+
+
+class ExternalRecord(Base):
+    """Record submitted by an external provider through the gateway (stored as received)"""
+    __tablename__ = 'external_records'
+    __table_args__ = (
+        # Patient view grouped by type, in submission order
+        Index('ix_external_records_patient_type', 'patient_national_id', 'record_type', 'id'),
+        # Retried submissions are stored once per provider
+        UniqueConstraint('provider_id', 'idempotency_key', name='uq_external_records_idempotency'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    record_id = Column(String(40), unique=True, nullable=False)  # Public ID, generated by the gateway
+    record_type = Column(String(30), nullable=False)  # lab_results, imaging_results, visits, ...
+    patient_national_id = Column(String(14), nullable=False)  # No FK - providers may send unknown patients
+    provider_id = Column(Integer)
+    provider_name = Column(String(200))
+    idempotency_key = Column(String(100))  # Idempotency-Key header or record_type:external_id
+    payload = Column(JSON, nullable=False)
+    submitted_at = Column(DateTime, default=func.now(), nullable=False)
+    
+    def __repr__(self):
+        return f"<ExternalRecord(record_id='{self.record_id}', type='{self.record_type}')>"
+
+
+class ApiAccessLog(Base):
+    """Provider gateway request log (written in batches by core/api_access_log.py)"""
+    __tablename__ = 'api_access_logs'
+    __table_args__ = (
+        Index('ix_api_access_logs_provider_time', 'provider_id', 'timestamp'),
+        Index('ix_api_access_logs_endpoint_time', 'endpoint', 'timestamp'),
+        Index('ix_api_access_logs_patient_time', 'patient_national_id', 'timestamp'),
+    )
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    timestamp = Column(DateTime, nullable=False, index=True)
+    provider_id = Column(Integer)
+    provider_name = Column(String(200))
+    method = Column(String(10))
+    endpoint = Column(String(200))  # Route path, e.g. /api/external/lab-results
+    patient_national_id = Column(String(14))
+    status_code = Column(Integer)
+    latency_ms = Column(Float)
+    
+    def __repr__(self):
+        return f"<ApiAccessLog(provider_id={self.provider_id}, endpoint='{self.endpoint}')>"
@@ -0,0 +1,177 @@
+"""
+Keyset (cursor) Pagination Helpers
+Seek on the ORDER BY columns instead of OFFSET so deep pages cost the same as page one
+
+Location: core/pagination.py
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Encode the sort key of the last row into an opaque URL-safe token
+
+    Args:
+        values: Values of the ORDER BY columns of the last row
+
+    Returns:
+        str: Cursor token
+    """
+    payload = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values],
+        ensure_ascii=False,
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, size: int) -> List:
+    """
+    Decode a cursor token
+
+    Args:
+        token: Token from encode_cursor
+        size: Expected number of sort values
+
+    Returns:
+        List: Sort key values
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor: wrong number of values")
+    return values
+
+
+def seek_after(columns: Sequence, values: Sequence):
+    """
+    Build "row is after (values)" for ascending ORDER BY columns
+
+    Expanded form (a > x) OR (a = x AND b > y) ... so MySQL can use a
+    range scan on the leading index column.
+
+    Args:
+        columns: ORDER BY columns, e.g. (Patient.full_name, Patient.id)
+        values: Sort key of the last row of the previous page
+
+    Returns:
+        SQL expression for Query.filter()
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column > values[i]))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns: Sequence, limit: int, cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of a query ordered by columns
+
+    Args:
+        query: SQLAlchemy query (without ORDER BY / LIMIT / OFFSET)
+        columns: Unique ascending sort key, e.g. (Patient.full_name, Patient.id)
+        limit: Page size
+        cursor: Token from the previous page (None for the first page)
+
+    Returns:
+        tuple: (rows, next_cursor) - next_cursor is None on the last page
+    """
+    if cursor:
+        query = query.filter(seek_after(columns, decode_cursor(cursor, len(columns))))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(*columns).limit(limit + 1).all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([_column_value(last, column) for column in columns])
+
+
+async def keyset_page_async(db, statement, columns: Sequence, limit: int,
+                            cursor: Optional[str] = None) -> Tuple[List, Optional[str]]:
+    """
+    Async version of keyset_page for select() statements
+
+    Args:
+        db: AsyncSession
+        statement: select(...) statement (without ORDER BY / LIMIT / OFFSET)
+        columns: Unique ascending sort key
+        limit: Page size
+        cursor: Token from the previous page (None for the first page)
+
+    Returns:
+        tuple: (rows, next_cursor) - ORM objects for select(Model), Rows otherwise
+    """
+    if cursor:
+        statement = statement.where(seek_after(columns, decode_cursor(cursor, len(columns))))
+
+    result = await db.execute(statement.order_by(*columns).limit(limit + 1))
+    rows = result.scalars().all() if _selects_entity(statement) else result.all()
+
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([_column_value(last, column) for column in columns])
+
+
+def keyset_batches(session_factory, build_query, columns: Sequence, batch_size: int = 500,
+                   convert=None) -> Iterator[List]:
+    """
+    Stream a whole table in keyset batches (for batch jobs)
+
+    Each batch uses its own short session, so long exports do not hold a
+    transaction or the full result set in memory.
+
+    Args:
+        session_factory: Callable returning a session (e.g. get_db)
+        build_query: Function(db) -> query (without ORDER BY)
+        columns: Unique ascending sort key
+        batch_size: Rows per batch
+        convert: Optional function(row) -> item, called while the session is open
+
+    Yields:
+        List: Batch of rows (or converted items)
+    """
+    cursor = None
+    while True:
+        db = session_factory()
+        try:
+            rows, cursor = keyset_page(build_query(db), columns, batch_size, cursor)
+            batch = [convert(row) for row in rows] if convert else rows
+        finally:
+            db.close()
+
+        if batch:
+            yield batch
+        if cursor is None:
+            return
+
+
+def _selects_entity(statement) -> bool:
+    """True for select(Model) (one ORM entity), False for column selects"""
+    descriptions = statement.column_descriptions
+    return len(descriptions) == 1 and descriptions[0].get('entity') is descriptions[0].get('type')
+
+
+def _column_value(row, column):
+    """Read a column value from an ORM object or a Row"""
+    return getattr(row, column.key)
@@ -0,0 +1,239 @@
+"""
+Patient Aggregate Loader - Loads a patient and its relationships in a fixed number of queries
+Replaces lazy loading (one SELECT per relationship per patient) with eager loading
+
+Location: core/patient_aggregate.py
+"""
+
+from core.database import get_db
+from core.models import Patient, PatientCard
+from sqlalchemy.orm import selectinload, joinedload, subqueryload, lazyload
+from typing import Dict, Iterable, List, Optional
+
+
+# Eager loading strategy for every relationship on Patient
+#   selectin -> one extra "SELECT ... WHERE patient_national_id IN (...)" per relationship
+#               (best for collections and for lists of patients)
+#   joined   -> LEFT OUTER JOIN inside the main query (best for one-to-one relationships)
+#   subquery -> one extra SELECT that re-runs the main query as a subquery
+#   lazy     -> default SQLAlchemy behaviour (one SELECT on first access)
+EAGER_STRATEGIES = {
+    'allergies': 'selectin',
+    'chronic_diseases': 'selectin',
+    'current_medications': 'selectin',
+    'surgeries': 'selectin',
+    'hospitalizations': 'selectin',
+    'vaccinations': 'selectin',
+    'visits': 'selectin',
+    'lab_results': 'selectin',
+    'imaging_results': 'selectin',
+    'patient_cards': 'selectin',
+    'family_history': 'selectin',
+    'disabilities': 'selectin',
+    'emergency_directives': 'selectin',
+    'lifestyle': 'joined',
+    'insurance_info': 'joined',
+}
+
+# Relationships loaded below a Patient relationship (e.g. visit prescriptions)
+NESTED_RELATIONSHIPS = {
+    'visits': ('prescriptions', 'vital_signs'),
+}
+
+# Profiles - which relationships a caller needs
+#   summary  -> patient columns only (lists, dashboard tables)
+#   clinical -> medical profile (allergies, diseases, medications, history...)
+#   full     -> clinical + visits, lab results, imaging and cards
+_CLINICAL_RELATIONSHIPS = (
+    'allergies',
+    'chronic_diseases',
+    'current_medications',
+    'surgeries',
+    'hospitalizations',
+    'vaccinations',
+    'family_history',
+    'disabilities',
+    'emergency_directives',
+    'lifestyle',
+    'insurance_info',
+)
+
+PATIENT_PROFILES = {
+    'summary': (),
+    'clinical': _CLINICAL_RELATIONSHIPS,
+    'full': _CLINICAL_RELATIONSHIPS + (
+        'visits',
+        'lab_results',
+        'imaging_results',
+        'patient_cards',
+    ),
+}
+
+_LOADERS = {
+    'selectin': selectinload,
+    'joined': joinedload,
+    'subquery': subqueryload,
+    'lazy': lazyload,
+}
+
+
+class PatientAggregateLoader:
+    """Load patients with eager relationship loading by profile"""
+
+    def __init__(self, strategies: Optional[Dict[str, str]] = None):
+        """
+        Initialize loader
+
+        Args:
+            strategies: Optional overrides of EAGER_STRATEGIES
+                        e.g. {'lifestyle': 'selectin'}
+        """
+        self.strategies = dict(EAGER_STRATEGIES)
+        for name, strategy in (strategies or {}).items():
+            self.set_strategy(name, strategy)
+
+    def set_strategy(self, relationship_name: str, strategy: str):
+        """
+        Change the eager strategy used for one relationship
+
+        Args:
+            relationship_name: Patient relationship (e.g. 'surgeries')
+            strategy: 'selectin', 'joined', 'subquery' or 'lazy'
+        """
+        if relationship_name not in EAGER_STRATEGIES:
+            raise ValueError(f"Unknown Patient relationship: {relationship_name}")
+        if strategy not in _LOADERS:
+            raise ValueError(f"Unknown loading strategy: {strategy}")
+        self.strategies[relationship_name] = strategy
+
+    def options(self, profile: str = 'full', extra: Iterable[str] = ()) -> List:
+        """
+        Build SQLAlchemy loader options for a profile
+
+        Args:
+            profile: 'summary', 'clinical' or 'full'
+            extra: Additional relationships to load on top of the profile
+
+        Returns:
+            List: Loader options for Query.options()
+        """
+        if profile not in PATIENT_PROFILES:
+            raise ValueError(f"Unknown patient profile: {profile}")
+
+        names = list(PATIENT_PROFILES[profile])
+        names += [name for name in extra if name not in names]
+
+        options = []
+        for name in names:
+            loader = _LOADERS[self.strategies[name]]
+            option = loader(getattr(Patient, name))
+
+            # Chain nested relationships with selectin (e.g. visit prescriptions)
+            if name in NESTED_RELATIONSHIPS and self.strategies[name] != 'lazy':
+                target = Patient.__mapper__.relationships[name].mapper.class_
+                option = option.options(*[
+                    selectinload(getattr(target, nested))
+                    for nested in NESTED_RELATIONSHIPS[name]
+                ])
+
+            options.append(option)
+
+        return options
+
+    def apply(self, query, profile: str = 'full', extra: Iterable[str] = ()):
+        """
+        Apply a profile to an existing Patient query
+
+        Args:
+            query: db.query(Patient)... query
+            profile: 'summary', 'clinical' or 'full'
+            extra: Additional relationships to load
+
+        Returns:
+            Query: Query with eager loading options
+        """
+        return query.options(*self.options(profile, extra))
+
+    def load(self, db, national_id: str, profile: str = 'full') -> Optional[Patient]:
+        """
+        Load one patient with its relationships
+
+        Args:
+            db: Active database session
+            national_id: Patient National ID
+            profile: 'summary', 'clinical' or 'full'
+
+        Returns:
+            Patient: Patient with relationships loaded, or None
+        """
+        return self.apply(
+            db.query(Patient).filter(Patient.national_id == national_id),
+            profile
+        ).first()
+
+    def load_many(self, db, national_ids: Iterable[str], profile: str = 'summary') -> List[Patient]:
+        """
+        Load several patients with their relationships
+
+        Args:
+            db: Active database session
+            national_ids: Patient National IDs
+            profile: 'summary', 'clinical' or 'full'
+
+        Returns:
+            List[Patient]: Patients (order not guaranteed)
+        """
+        national_ids = list(national_ids)
+        if not national_ids:
+            return []
+
+        return self.apply(
+            db.query(Patient).filter(Patient.national_id.in_(national_ids)),
+            profile
+        ).all()
+
+    def load_by_card(self, db, card_uid: str, profile: str = 'full') -> Optional[Patient]:
+        """
+        Load the patient owning an active NFC card
+
+        Args:
+            db: Active database session
+            card_uid: NFC card UID
+            profile: 'summary', 'clinical' or 'full'
+
+        Returns:
+            Patient: Patient with relationships loaded, or None
+        """
+        return self.apply(
+            db.query(Patient).join(
+                PatientCard,
+                PatientCard.patient_national_id == Patient.national_id
+            ).filter(
+                PatientCard.card_uid == card_uid,
+                PatientCard.is_active == True
+            ),
+            profile
+        ).first()
+
+    def load_dict(self, national_id: str, converter, profile: str = 'full') -> Optional[Dict]:
+        """
+        Load a patient and convert it to a dict in one session
+
+        Args:
+            national_id: Patient National ID
+            converter: Function(patient) -> dict, called while session is open
+            profile: 'summary', 'clinical' or 'full'
+
+        Returns:
+            dict: Converted patient or None
+        """
+        db = get_db()
+        try:
+            patient = self.load(db, national_id, profile)
+            return converter(patient) if patient else None
+        finally:
+            db.close()
+
+
+# Global instance
+aggregate_loader = PatientAggregateLoader()
@@ -0,0 +1,200 @@
+"""
+Patient Cache - Process-wide read-through cache of patient records
+Keyed by national_id, bounded LRU with TTL and write invalidation
+
+Location: core/patient_cache.py
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from config.database_config import PATIENT_CACHE_SETTINGS
+
+
+class PatientCache:
+    """
+    Thread-safe LRU cache of patient dicts
+
+    One entry per national_id. Each entry holds one or more "views"
+    (e.g. the PatientManager dict and the SearchEngine dict) so that
+    invalidating a patient drops every cached shape of that patient.
+    """
+
+    def __init__(self, max_size: int = 500, ttl_seconds: float = 300, enabled: bool = True):
+        """
+        Initialize cache
+
+        Args:
+            max_size: Maximum number of patients kept in memory
+            ttl_seconds: Maximum age of a cached view
+            enabled: False turns every lookup into a miss
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+        self._entries = OrderedDict()  # national_id -> {view: (stored_at, value)}
+        self._lock = threading.RLock()
+        self._version = 0  # Bumped on every invalidation (guards in-flight loads)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ==================== LOOKUP ====================
+
+    def get(self, national_id: str, view: str = 'record') -> Optional[Any]:
+        """
+        Get cached patient view
+
+        Args:
+            national_id: Patient National ID
+            view: Name of the cached representation
+
+        Returns:
+            Deep copy of the cached value (callers may mutate it) or None on miss
+        """
+        if not self.enabled or not national_id:
+            return None
+
+        with self._lock:
+            views = self._entries.get(national_id)
+            item = views.get(view) if views else None
+
+            if item is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = item
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                # Expired
+                del views[view]
+                if not views:
+                    del self._entries[national_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(national_id)
+            self.hits += 1
+
+        return copy.deepcopy(value)
+
+    def put(self, national_id: str, value: Any, view: str = 'record', version: int = None):
+        """
+        Store patient view
+
+        Args:
+            national_id: Patient National ID
+            value: Patient dict (a deep copy is stored - the caller keeps ownership)
+            view: Name of the cached representation
+            version: Cache version read before loading; the value is dropped
+                     if an invalidation happened in the meantime
+        """
+        if not self.enabled or not national_id or value is None:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+
+            views = self._entries.get(national_id)
+            if views is None:
+                views = self._entries[national_id] = {}
+            views[view] = (time.monotonic(), value)
+            self._entries.move_to_end(national_id)
+
+            # Evict least recently used patients
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, national_id: str, loader: Callable[[], Any], view: str = 'record') -> Optional[Any]:
+        """
+        Read-through lookup
+
+        Args:
+            national_id: Patient National ID
+            loader: Function returning the patient dict (called on miss)
+            view: Name of the cached representation
+
+        Returns:
+            Patient dict or None
+        """
+        value = self.get(national_id, view)
+        if value is not None:
+            return value
+
+        version = self._version
+        value = loader()
+        if value is None:
+            return None
+
+        self.put(national_id, value, view, version=version)
+        return value
+
+    @property
+    def version(self) -> int:
+        """Current cache version (pass to put() after an external load)"""
+        return self._version
+
+    # ==================== INVALIDATION ====================
+
+    def invalidate(self, national_id: str):
+        """Drop every cached view of a patient (call after any write)"""
+        if not national_id:
+            return
+
+        with self._lock:
+            self._version += 1
+            self.invalidations += 1
+            self._entries.pop(national_id, None)
+
+    def clear(self):
+        """Drop all cached patients"""
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    # ==================== STATISTICS ====================
+
+    def stats(self) -> Dict:
+        """
+        Get cache counters
+
+        Returns:
+            dict: size, hits, misses, hit_rate, evictions, invalidations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def reset_stats(self):
+        """Reset hit/miss counters"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+
+# Global instance
+patient_cache = PatientCache(
+    max_size=PATIENT_CACHE_SETTINGS.get('max_size', 500),
+    ttl_seconds=PATIENT_CACHE_SETTINGS.get('ttl_seconds', 300),
+    enabled=PATIENT_CACHE_SETTINGS.get('enabled', True)
+)
@@ -0,0 +1,158 @@
+"""
+Patient Filter Builder - Composable patient criteria compiled to SQL
+Relationship criteria (allergies, chronic diseases...) become EXISTS
+subqueries, so filtering and LIMIT both happen in the database
+
+Location: core/patient_filters.py
+"""
+
+from core.models import Patient, CurrentMedication, Gender, BloodType
+from sqlalchemy import exists, and_
+from typing import Optional
+
+
+class PatientFilter:
+    """
+    Chainable patient criteria
+
+    Example:
+        criteria = PatientFilter().gender('Female').age_between(30, 50).has_allergies()
+        patients = criteria.apply(db.query(Patient)).limit(50).all()
+    """
+
+    def __init__(self):
+        self._conditions = []
+
+    def __len__(self):
+        return len(self._conditions)
+
+    # ==================== GENERIC ====================
+
+    def where(self, *conditions) -> 'PatientFilter':
+        """Add raw SQLAlchemy conditions on Patient"""
+        self._conditions.extend(conditions)
+        return self
+
+    def has_related(self, relationship_name: str, present: bool = True, *conditions) -> 'PatientFilter':
+        """
+        Require (or exclude) at least one related row
+
+        Args:
+            relationship_name: Patient relationship (e.g. 'allergies')
+            present: True -> EXISTS, False -> NOT EXISTS
+            conditions: Extra conditions on the related table
+                        e.g. CurrentMedication.is_active == True
+        """
+        relationship = Patient.__mapper__.relationships.get(relationship_name)
+        if relationship is None:
+            raise ValueError(f"Unknown Patient relationship: {relationship_name}")
+
+        child = relationship.mapper.class_
+        subquery = exists().where(and_(
+            child.patient_national_id == Patient.national_id,
+            *conditions
+        ))
+        self._conditions.append(subquery if present else ~subquery)
+        return self
+
+    # ==================== DEMOGRAPHICS ====================
+
+    def gender(self, value: Optional[str]) -> 'PatientFilter':
+        """Gender name ('Male' / 'Female'); unknown values are ignored"""
+        if value:
+            try:
+                self._conditions.append(Patient.gender == Gender[value])
+            except KeyError:
+                pass
+        return self
+
+    def min_age(self, value: Optional[int]) -> 'PatientFilter':
+        if value is not None:
+            self._conditions.append(Patient.age >= value)
+        return self
+
+    def max_age(self, value: Optional[int]) -> 'PatientFilter':
+        if value is not None:
+            self._conditions.append(Patient.age <= value)
+        return self
+
+    def age_between(self, min_age: Optional[int], max_age: Optional[int]) -> 'PatientFilter':
+        return self.min_age(min_age).max_age(max_age)
+
+    def city(self, value: Optional[str]) -> 'PatientFilter':
+        """City contains value (case-insensitive)"""
+        if value:
+            self._conditions.append(Patient.city.ilike(f"%{value}%"))
+        return self
+
+    def governorate(self, value: Optional[str]) -> 'PatientFilter':
+        """Governorate contains value (case-insensitive)"""
+        if value:
+            self._conditions.append(Patient.governorate.ilike(f"%{value}%"))
+        return self
+
+    def blood_type(self, value: Optional[str]) -> 'PatientFilter':
+        """Blood type as 'A+' or 'A_POSITIVE'; unknown values are ignored"""
+        if value:
+            blood_type = _parse_blood_type(value)
+            if blood_type is not None:
+                self._conditions.append(Patient.blood_type == blood_type)
+        return self
+
+    def has_nfc_card(self, present: Optional[bool] = True) -> 'PatientFilter':
+        if present is not None:
+            self._conditions.append(
+                Patient.nfc_card_assigned == True if present
+                else Patient.nfc_card_assigned.isnot(True)
+            )
+        return self
+
+    # ==================== MEDICAL HISTORY ====================
+
+    def has_allergies(self, present: Optional[bool] = True) -> 'PatientFilter':
+        if present is not None:
+            self.has_related('allergies', present)
+        return self
+
+    def has_chronic_diseases(self, present: Optional[bool] = True) -> 'PatientFilter':
+        if present is not None:
+            self.has_related('chronic_diseases', present)
+        return self
+
+    def has_surgeries(self, present: Optional[bool] = True) -> 'PatientFilter':
+        if present is not None:
+            self.has_related('surgeries', present)
+        return self
+
+    def has_active_medications(self, present: Optional[bool] = True) -> 'PatientFilter':
+        if present is not None:
+            self.has_related('current_medications', present, CurrentMedication.is_active == True)
+        return self
+
+    # ==================== APPLY ====================
+
+    def apply(self, query):
+        """
+        Add all criteria to a Patient query
+
+        Args:
+            query: db.query(Patient) or a query selecting Patient columns
+
+        Returns:
+            Query: Filtered query
+        """
+        if not self._conditions:
+            return query
+        return query.filter(*self._conditions)
+
+
+def _parse_blood_type(value: str) -> Optional[BloodType]:
+    """Accept the stored value ('A+') or the enum name ('A_POSITIVE')"""
+    try:
+        return BloodType(value)
+    except ValueError:
+        pass
+    try:
+        return BloodType[value.upper()]
+    except KeyError:
+        return None
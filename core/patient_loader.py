@@ -6,8 +6,103 @@ Location: core/patient_loader.py
 """
 
 from core.database import get_db
-from core.models import Patient
-from typing import Optional, Dict
+from core.patient_aggregate import aggregate_loader
+from typing import Optional, Dict, List
+
+
+# ==================== Relationship Converters ====================
+# Shared by every Patient -> dict converter so cached patient dicts hold
+# plain data only, never live ORM instances.
+
+def allergies_to_dicts(patient) -> List[Dict]:
+    """Allergy rows as plain dicts (empty list when none)"""
+    return [
+        {
+            'allergy_id': a.id,
+            'allergen_name': a.allergen_name if hasattr(a, 'allergen_name') else 'Unknown',
+            'severity': a.severity if hasattr(a, 'severity') else None,
+            'reaction': a.reaction if hasattr(a, 'reaction') else None,
+            'date_identified': a.date_identified if hasattr(a, 'date_identified') else None
+        }
+        for a in patient.allergies
+    ] if hasattr(patient, 'allergies') and patient.allergies else []
+
+
+def chronic_diseases_to_dicts(patient) -> List[Dict]:
+    """Chronic disease rows as plain dicts (empty list when none)"""
+    return [
+        {
+            'disease_id': cd.id,
+            'disease_name': cd.disease_name if hasattr(cd, 'disease_name') else 'Unknown',
+            'date_diagnosed': cd.date_diagnosed if hasattr(cd, 'date_diagnosed') else None,
+            'severity': cd.severity if hasattr(cd, 'severity') else None,
+            'treatment': cd.treatment if hasattr(cd, 'treatment') else None,
+            'is_active': cd.is_active if hasattr(cd, 'is_active') else True
+        }
+        for cd in patient.chronic_diseases
+    ] if hasattr(patient, 'chronic_diseases') and patient.chronic_diseases else []
+
+
+def family_history_to_dicts(patient) -> List[Dict]:
+    """Family history rows as plain dicts (empty list when none)"""
+    return [
+        {
+            'family_id': fh.id,
+            'relation': fh.relation,
+            'is_alive': fh.is_alive,
+            'medical_conditions': fh.medical_conditions,
+            'genetic_conditions': fh.genetic_conditions,
+            'age_at_death': fh.age_at_death,
+            'cause_of_death': fh.cause_of_death
+        }
+        for fh in patient.family_history
+    ] if hasattr(patient, 'family_history') and patient.family_history else []
+
+
+def disabilities_to_dicts(patient) -> List[Dict]:
+    """Disability rows as plain dicts (empty list when none)"""
+    return [
+        {
+            'disability_id': d.id,
+            'disability_type': d.disability_type,
+            'severity': d.severity,
+            'date_diagnosed': d.date_diagnosed,
+            'mobility_aids': d.mobility_aids,
+            'accessibility_requirements': d.accessibility_requirements
+        }
+        for d in patient.disabilities
+    ] if hasattr(patient, 'disabilities') and patient.disabilities else []
+
+
+def emergency_directives_to_dict(patient) -> Dict:
+    """First emergency directive as a plain dict ({} when none)"""
+    if not getattr(patient, 'emergency_directives', None):
+        return {}
+    ed = patient.emergency_directives[0]
+    return {
+        'dnr_status': ed.dnr_status,
+        'organ_donor': ed.organ_donor,
+        'power_of_attorney': ed.power_of_attorney_relation,
+        'power_of_attorney_name': ed.power_of_attorney_name,
+        'power_of_attorney_contact': ed.power_of_attorney_phone,
+        'end_of_life_wishes': ed.end_of_life_wishes,
+        'religious_preferences': ed.religious_preferences
+    }
+
+
+def lifestyle_to_dict(patient) -> Dict:
+    """Lifestyle row as a plain dict ({} when none)"""
+    ls = getattr(patient, 'lifestyle', None)
+    if not ls:
+        return {}
+    return {
+        'smoking_status': ls.smoking_status,
+        'alcohol_use': ls.alcohol_use,
+        'exercise_frequency': ls.exercise_frequency,
+        'diet_type': ls.diet_type,
+        'occupation': ls.occupation,
+        'stress_level': ls.stress_level
+    }
 
 
 def load_patient_with_relationships(national_id: str) -> Optional[Dict]:
@@ -18,9 +113,8 @@ def load_patient_with_relationships(national_id: str) -> Optional[Dict]:
     Returns: Dictionary with all patient data and relationships
     """
     with get_db() as db:
-        patient = db.query(Patient).filter(
-            Patient.national_id == national_id
-        ).first()
+        # Eager-load every relationship used below in a fixed number of queries
+        patient = aggregate_loader.load(db, national_id, 'clinical')
         
         if not patient:
             return None
@@ -43,28 +137,8 @@ def load_patient_with_relationships(national_id: str) -> Optional[Dict]:
             'created_at': patient.created_at if hasattr(patient, 'created_at') else None,
             
             # Relationships - Load while session is open! (with safety checks)
-            'allergies': [
-                {
-                    'allergy_id': a.allergy_id if hasattr(a, 'allergy_id') else None,
-                    'allergen_name': a.allergen_name if hasattr(a, 'allergen_name') else 'Unknown',
-                    'severity': a.severity if hasattr(a, 'severity') else None,
-                    'reaction': a.reaction if hasattr(a, 'reaction') else None,
-                    'date_identified': a.date_identified if hasattr(a, 'date_identified') else None
-                }
-                for a in patient.allergies
-            ] if hasattr(patient, 'allergies') and patient.allergies else [],
-            
-            'chronic_diseases': [
-                {
-                    'disease_id': cd.disease_id if hasattr(cd, 'disease_id') else None,
-                    'disease_name': cd.disease_name if hasattr(cd, 'disease_name') else 'Unknown',
-                    'date_diagnosed': cd.date_diagnosed if hasattr(cd, 'date_diagnosed') else None,
-                    'severity': cd.severity if hasattr(cd, 'severity') else None,
-                    'treatment': cd.treatment if hasattr(cd, 'treatment') else None,
-                    'is_active': cd.is_active if hasattr(cd, 'is_active') else True
-                }
-                for cd in patient.chronic_diseases
-            ] if hasattr(patient, 'chronic_diseases') and patient.chronic_diseases else [],
+            'allergies': allergies_to_dicts(patient),
+            'chronic_diseases': chronic_diseases_to_dicts(patient),
             
             'current_medications': [
                 {
@@ -106,7 +180,7 @@ def load_patient_with_relationships(national_id: str) -> Optional[Dict]:
             
             'vaccinations': [
                 {
-                    'vaccination_id': v.vaccination_id,
+                    'vaccination_id': v.id,
                     'vaccine_name': v.vaccine_name,
                     'date_administered': v.date_administered,
                     'dose_number': v.dose_number,
@@ -116,62 +190,22 @@ def load_patient_with_relationships(national_id: str) -> Optional[Dict]:
                 for v in patient.vaccinations
             ],
             
-            'family_history': [
-                {
-                    'family_id': fh.family_id,
-                    'relation': fh.relation,
-                    'is_alive': fh.is_alive,
-                    'medical_conditions': fh.medical_conditions,
-                    'genetic_conditions': fh.genetic_conditions,
-                    'age_at_death': fh.age_at_death,
-                    'cause_of_death': fh.cause_of_death
-                }
-                for fh in patient.family_history
-            ],
-            
-            'disabilities': [
-                {
-                    'disability_id': d.disability_id,
-                    'disability_type': d.disability_type,
-                    'severity': d.severity,
-                    'date_diagnosed': d.date_diagnosed,
-                    'mobility_aids': d.mobility_aids,
-                    'accessibility_requirements': d.accessibility_requirements
-                }
-                for d in patient.disabilities
-            ]
+            'family_history': family_history_to_dicts(patient),
+            'disabilities': disabilities_to_dicts(patient)
         }
         
-        # Add emergency directive if exists
-        if patient.emergency_directives:
-            ed = patient.emergency_directives[0] if patient.emergency_directives else None
-            if ed:
-                patient_dict['emergency_directives'] = {
-                    'dnr_status': ed.dnr_status,
-                    'organ_donor': ed.organ_donor,
-                    'power_of_attorney': ed.power_of_attorney,
-                    'power_of_attorney_name': ed.power_of_attorney_name,
-                    'power_of_attorney_contact': ed.power_of_attorney_contact,
-                    'end_of_life_wishes': ed.end_of_life_wishes,
-                    'religious_preferences': ed.religious_preferences
-                }
+        # Add emergency directive / lifestyle if they exist
+        emergency_directives = emergency_directives_to_dict(patient)
+        if emergency_directives:
+            patient_dict['emergency_directives'] = emergency_directives
         
-        # Add lifestyle if exists
-        if patient.lifestyle:
-            ls = patient.lifestyle[0] if patient.lifestyle else None
-            if ls:
-                patient_dict['lifestyle'] = {
-                    'smoking_status': ls.smoking_status,
-                    'alcohol_use': ls.alcohol_use,
-                    'exercise_frequency': ls.exercise_frequency,
-                    'diet_type': ls.diet_type,
-                    'occupation': ls.occupation,
-                    'stress_level': ls.stress_level
-                }
+        lifestyle = lifestyle_to_dict(patient)
+        if lifestyle:
+            patient_dict['lifestyle'] = lifestyle
         
         # Add insurance if exists
-        if patient.insurance:
-            ins = patient.insurance[0] if patient.insurance else None
+        if patient.insurance_info:
+            ins = patient.insurance_info
             if ins:
                 patient_dict['insurance'] = {
                     'insurance_provider': ins.insurance_provider,
@@ -179,7 +213,7 @@ def load_patient_with_relationships(national_id: str) -> Optional[Dict]:
                     'coverage_type': ins.coverage_type,
                     'coverage_details': ins.coverage_details,
                     'copay_amount': ins.copay_amount,
-                    'expiry_date': ins.expiry_date
+                    'expiry_date': ins.coverage_end_date
                 }
         
         return patient_dict
@@ -5,6 +5,14 @@ Location: core/patient_manager.py (REPLACE YOUR FILE)
 
 from core.database import get_db
 from core.models import User, Patient, Surgery, Hospitalization, Vaccination, CurrentMedication
+from core.patient_cache import patient_cache
+from core.patient_loader import (
+    allergies_to_dicts, chronic_diseases_to_dicts, family_history_to_dicts,
+    disabilities_to_dicts, emergency_directives_to_dict, lifestyle_to_dict
+)
+from core.patient_search_index import patient_search_index
+from core.pagination import keyset_page, keyset_batches
+from core.patient_summary import summary_query, to_summaries, load_summaries
 from datetime import datetime
 
 
@@ -67,6 +75,13 @@ class PatientManager:
         Returns:
             dict: Complete patient data or None
         """
+        return patient_cache.get_or_load(
+            national_id,
+            lambda: self._load_patient(national_id)
+        )
+    
+    def _load_patient(self, national_id: str):
+        """Load patient dict from the database (cache miss path)"""
         db = get_db()
         try:
             patient = db.query(Patient).filter_by(national_id=national_id).first() 
@@ -84,19 +99,72 @@ class PatientManager:
         return self.get_patient(national_id)
     
     def get_all_patients(self):
-        """Get all patients - returns list of dicts"""
+        """
+        Get all patients - returns list of dicts
+        Loads the whole table; use get_patients_page() or iter_patients() for lists
+        """
+        return list(self.iter_patients())
+    
+    def get_patients_page(self, limit: int = 50, cursor: str = None, summary: bool = True):
+        """
+        Get one page of patients ordered by name (keyset pagination)
         
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page (None for first page)
+            summary: True -> PatientSummary rows (list views), False -> full dicts
+            
+        Returns:
+            dict: {'patients': [...], 'next_cursor': str or None, 'has_more': bool}
+        """
         db = get_db()
         try:
-            patients = db.query(Patient).order_by(Patient.full_name).all()
-            return [self._patient_to_dict(p) for p in patients]
+            query = summary_query(db) if summary else db.query(Patient)
+            patients, next_cursor = keyset_page(
+                query,
+                (Patient.full_name, Patient.id),
+                limit,
+                cursor
+            )
+            return {
+                'patients': to_summaries(patients) if summary
+                            else [self._patient_to_dict(p) for p in patients],
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
         finally:
             db.close()
     
+    def iter_patients(self, batch_size: int = 500):
+        """
+        Stream every patient ordered by name, one query per batch
+        
+        Yields:
+            dict: Patient dict
+        """
+        for batch in keyset_batches(
+            get_db,
+            lambda db: db.query(Patient),
+            (Patient.full_name, Patient.id),
+            batch_size,
+            convert=self._patient_to_dict
+        ):
+            yield from batch
+    
     def search_patients(self, search_term: str):
         """Search patients by name or national ID"""
+        ranked = patient_search_index.lookup(search_term, 50)
+        
         db = get_db()
         try:
+            if ranked is not None:
+                patients = db.query(Patient).filter(
+                    Patient.national_id.in_(ranked)
+                ).all() if ranked else []
+                by_id = {p.national_id: p for p in patients}
+                return [self._patient_to_dict(by_id[nid]) for nid in ranked if nid in by_id]
+            
+            # Cold start - index still building
             self.search = f"%{search_term}%" # natianl id 
             patients = db.query(Patient).filter(
                 (Patient.full_name.ilike(self.search)) |
@@ -108,6 +176,30 @@ class PatientManager:
         finally:
             db.close()
     
+    def search_patient_summaries(self, search_term: str, limit: int = 50):
+        """
+        Search patients by name or national ID - returns PatientSummary rows
+        Use get_patient() to load the full record of the selected patient
+        """
+        ranked = patient_search_index.lookup(search_term, limit)
+        
+        db = get_db()
+        try:
+            if ranked is not None:
+                return load_summaries(db, ranked)
+            
+            # Cold start - index still building
+            search = f"%{search_term}%"
+            rows = summary_query(db).filter(
+                (Patient.full_name.ilike(search)) |
+                (Patient.national_id.ilike(search)) |
+                (Patient.phone.ilike(search))
+            ).limit(limit).all()
+            
+            return to_summaries(rows)
+        finally:
+            db.close()
+    
     def create_patient(self, patient_data: dict):
         patient_data = {"national_id":"123345546567"}
         """Create new patient"""
@@ -117,6 +209,8 @@ class PatientManager:
             db.add(patient) # add to database
             db.commit() # save 
             db.refresh(patient) 
+            patient_cache.invalidate(patient.national_id)
+            patient_search_index.index_patient(patient)
             return self._patient_to_dict(patient)
         except Exception as e:
             db.rollback()
@@ -142,6 +236,8 @@ class PatientManager:
             patient.last_updated = datetime.now()
             db.commit()
             db.refresh(patient)
+            patient_cache.invalidate(national_id)
+            patient_search_index.index_patient(patient)
             
             return self._patient_to_dict(patient)
         except Exception as e:
@@ -266,18 +362,17 @@ class PatientManager:
             
             # JSON fields - directly accessible
             'emergency_contact': patient.emergency_contact or {},
-            'chronic_diseases': patient.chronic_diseases or [],
-            'allergies': patient.allergies or [],
-            'family_history': patient.family_history or {},
-            
-            # ✅ FIXED LINE 221 - Safe access for Phase 8-13 fields
-            'disabilities_special_needs': safe_get_patient_attr(patient, 'disabilities_special_needs', {}),
-            
-            'emergency_directives': patient.emergency_directives or {},
-            'lifestyle': patient.lifestyle or {},
             'insurance': patient.insurance or {},
             'external_links': patient.external_links or {},
             
+            # Clinical relationships - plain dicts, never ORM instances
+            'chronic_diseases': chronic_diseases_to_dicts(patient),
+            'allergies': allergies_to_dicts(patient),
+            'family_history': family_history_to_dicts(patient),
+            'disabilities_special_needs': disabilities_to_dicts(patient),
+            'emergency_directives': emergency_directives_to_dict(patient),
+            'lifestyle': lifestyle_to_dict(patient),
+            
             # NFC card info
             'nfc_card_uid': patient.nfc_card_uid,
             'nfc_card_assigned': patient.nfc_card_assigned,
@@ -0,0 +1,668 @@
+"""
+Patient Search Index - In-process inverted index for patient type-ahead search
+Normalized Arabic/Latin name tokens, edge n-grams, and digit tries for
+national ID and phone. Replaces leading-wildcard ILIKE table scans.
+
+Location: core/patient_search_index.py
+"""
+
+import re
+from bisect import bisect_left
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+from config.database_config import SEARCH_INDEX_SETTINGS
+from core.database import get_db
+
+
+# ==================== NORMALIZATION ====================
+
+# Arabic diacritics (tashkeel), superscript alef and tatweel
+_ARABIC_MARKS = re.compile(r'[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]')
+
+# Arabic letter variants folded to one form
+_ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ؤ': 'و',
+    'ئ': 'ي',
+    # Arabic-Indic and Persian digits
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4',
+    '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
+})
+
+_TOKEN_SPLIT = re.compile(r'[^\w]+', re.UNICODE)
+_NON_DIGITS = re.compile(r'\D+')
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a name for indexing/search
+
+    - Latin: lowercase, accents removed (é -> e)
+    - Arabic: diacritics/tatweel removed, alef/yaa/taa marbuta variants folded
+    """
+    if not text:
+        return ''
+    if text.isascii():
+        return text.casefold()
+
+    text = _ARABIC_MARKS.sub('', text).translate(_ARABIC_FOLD)
+
+    # Strip Latin accents (NFKD splits base letter and combining mark)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+    return text.casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into tokens"""
+    return _split_tokens(normalize_text(text))
+
+
+def _split_tokens(normalized: str) -> List[str]:
+    return [t for t in _TOKEN_SPLIT.split(normalized) if t and t != '_']
+
+
+def normalize_digits(text: str) -> str:
+    """Keep digits only (Arabic-Indic digits converted)"""
+    if not text:
+        return ''
+    return _NON_DIGITS.sub('', str(text).translate(_ARABIC_FOLD))
+
+
+def phone_variants(phone: str) -> List[str]:
+    """
+    Digit forms a phone number can be searched by
+    e.g. +20 100 123 4567 -> ['201001234567', '01001234567']
+    """
+    digits = normalize_digits(phone)
+    if not digits:
+        return []
+
+    variants = [digits]
+    for prefix in ('0020', '20'):
+        if digits.startswith(prefix) and len(digits) - len(prefix) >= 9:
+            variants.append('0' + digits[len(prefix):])
+            break
+    return variants
+
+
+# ==================== DIGIT TRIE ====================
+
+class DigitTrie:
+    """
+    Prefix trie over digit strings (national IDs, phones)
+    Each node is a dict: digit -> child node, '$' -> set of patient keys
+    """
+
+    _END = '$'
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, digits: str, key: str):
+        node = self.root
+        for ch in digits:
+            node = node.setdefault(ch, {})
+        node.setdefault(self._END, set()).add(key)
+
+    def remove(self, digits: str, key: str):
+        path = []
+        node = self.root
+        for ch in digits:
+            child = node.get(ch)
+            if child is None:
+                return
+            path.append((node, ch))
+            node = child
+
+        keys = node.get(self._END)
+        if not keys:
+            return
+        keys.discard(key)
+        if not keys:
+            del node[self._END]
+
+        # Prune empty branches
+        for parent, ch in reversed(path):
+            if parent[ch]:
+                break
+            del parent[ch]
+
+    def exact(self, digits: str) -> Set[str]:
+        node = self._find(digits)
+        return set(node.get(self._END, ())) if node else set()
+
+    def prefix(self, digits: str, limit: int) -> List[str]:
+        """Keys under a prefix in numeric order, at most limit"""
+        node = self._find(digits)
+        if node is None:
+            return []
+
+        results = []
+        # Depth-first in digit order - stops as soon as limit keys are found,
+        # so cost depends on limit, not on how many numbers share the prefix
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for key in sorted(current.get(self._END, ())):
+                results.append(key)
+                if len(results) >= limit:
+                    return results
+            stack.extend(
+                current[ch] for ch in sorted(current, reverse=True) if ch != self._END
+            )
+        return results
+
+    def _find(self, digits: str):
+        node = self.root
+        for ch in digits:
+            node = node.get(ch)
+            if node is None:
+                return None
+        return node
+
+
+def _name_order(entries: List, first: str) -> Iterable:
+    """
+    Walk a name-sorted posting: names starting with first (one contiguous
+    run, found by bisection), then the others in name order
+    """
+    start = bisect_left(entries, (first,))
+    end = start
+    while end < len(entries) and entries[end][0].startswith(first):
+        yield entries[end]
+        end += 1
+    for i in range(start):
+        yield entries[i]
+    for i in range(end, len(entries)):
+        yield entries[i]
+
+
+# ==================== SEARCH INDEX ====================
+
+class PatientSearchIndex:
+    """
+    Inverted index over patient name, national ID, phone and email
+
+    Memory: one posting per (name-token prefix, patient) plus one trie
+    leaf per national ID / phone. Lookups touch only the postings of the
+    query tokens, never the full registry.
+
+    Name postings are lists of per-patient entries (full_name, national_id,
+    tokens) kept sorted by name, and replaced (never mutated) on write, so
+    ranking reads only the first matches of a posting and runs outside the
+    lock on the lists it grabbed.
+    """
+
+    def __init__(self, min_gram: int = 1, max_gram: int = 15, max_age_seconds: float = 900):
+        """
+        Initialize empty index
+
+        Args:
+            min_gram: Shortest indexed name prefix
+            max_gram: Longest indexed name prefix (longer query tokens are verified)
+            max_age_seconds: Rebuild in the background once the index is older
+                             (picks up writes made outside this process; 0 = never)
+        """
+        self.min_gram = min_gram
+        self.max_gram = max_gram
+        self.max_age = max_age_seconds
+
+        self._docs = {}          # national_id -> {'full_name', 'tokens', 'phones', 'email', 'entry'}
+        self._tokens = {}        # full token -> sorted [entry]
+        self._grams = {}         # edge n-gram -> sorted [entry]
+        self._emails = {}        # lowercase email -> set(national_id)
+        self._national_ids = DigitTrie()
+        self._phones = DigitTrie()
+
+        self._lock = threading.RLock()
+        self._build_thread = None
+        self._building = False
+        self._pending = []       # Writes received while a build is running
+        self.ready = False
+        self.built_at = None
+        self.build_seconds = None
+        self._fingerprint = None  # Patients table state the index was built from
+
+    # ==================== WRITES ====================
+
+    def upsert(self, national_id: str, full_name: str = None, phone: str = None, email: str = None):
+        """
+        Add or replace one patient in the index
+
+        Args:
+            national_id: Patient National ID
+            full_name: Patient name (Arabic or Latin)
+            phone: Phone number (any formatting)
+            email: Email address
+        """
+        if not national_id:
+            return
+
+        name = normalize_text(full_name or '')
+        tokens = _split_tokens(name)
+        phones = phone_variants(phone)
+        email_key = email.strip().casefold() if email else None
+
+        with self._lock:
+            if self._building:
+                self._pending.append((national_id, full_name, phone, email))
+            self._remove_postings(national_id)
+
+            doc = self._new_doc(national_id, name, tokens, phones, email_key)
+            self._docs[national_id] = doc
+            self._add_lookups(national_id, doc)
+
+            entry = doc['entry']
+            for token in set(tokens):
+                self._tokens[token] = self._inserted(self._tokens.get(token), entry)
+            for gram in self._doc_grams(tokens):
+                self._grams[gram] = self._inserted(self._grams.get(gram), entry)
+
+    @staticmethod
+    def _new_doc(national_id, name, tokens, phones, email_key) -> Dict:
+        return {
+            'full_name': name,
+            'tokens': tokens,
+            'phones': phones,
+            'email': email_key,
+            # Shared by every posting of this patient; sorts by name, then ID
+            'entry': (name, national_id, tuple(tokens))
+        }
+
+    def _add_lookups(self, national_id: str, doc: Dict):
+        self._national_ids.insert(normalize_digits(national_id) or national_id, national_id)
+        for digits in doc['phones']:
+            self._phones.insert(digits, national_id)
+        if doc['email']:
+            self._emails.setdefault(doc['email'], set()).add(national_id)
+
+    def index_patient(self, patient):
+        """Index a Patient ORM object (call after commit)"""
+        self.upsert(
+            patient.national_id,
+            full_name=patient.full_name,
+            phone=patient.phone,
+            email=patient.email
+        )
+
+    def remove(self, national_id: str):
+        """Remove one patient from the index"""
+        with self._lock:
+            if self._building:
+                self._pending.append((national_id, None, None, None, True))
+            self._remove_postings(national_id)
+
+    def clear(self):
+        """Drop everything (index becomes cold)"""
+        with self._lock:
+            self._docs.clear()
+            self._tokens.clear()
+            self._grams.clear()
+            self._emails.clear()
+            self._national_ids = DigitTrie()
+            self._phones = DigitTrie()
+            self.ready = False
+
+    def _remove_postings(self, national_id: str):
+        doc = self._docs.pop(national_id, None)
+        if not doc:
+            return
+
+        self._national_ids.remove(normalize_digits(national_id) or national_id, national_id)
+        for digits in doc['phones']:
+            self._phones.remove(digits, national_id)
+        if doc['email']:
+            self._discard(self._emails, doc['email'], national_id)
+
+        entry = doc['entry']
+        for token in set(doc['tokens']):
+            self._removed(self._tokens, token, entry)
+        for gram in self._doc_grams(doc['tokens']):
+            self._removed(self._grams, gram, entry)
+
+    @staticmethod
+    def _discard(postings: Dict[str, Set[str]], key: str, national_id: str):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(national_id)
+            if not ids:
+                del postings[key]
+
+    @staticmethod
+    def _inserted(entries: Optional[List], entry) -> List:
+        """Copy of a sorted posting with entry added (searches may hold the old list)"""
+        if not entries:
+            return [entry]
+        i = bisect_left(entries, entry)
+        return entries[:i] + [entry] + entries[i:]
+
+    @staticmethod
+    def _removed(postings: Dict[str, List], key: str, entry):
+        """Replace a sorted posting with a copy that lacks entry"""
+        entries = postings.get(key)
+        if not entries:
+            return
+        i = bisect_left(entries, entry)
+        if i == len(entries) or entries[i] is not entry:
+            return
+        if len(entries) == 1:
+            del postings[key]
+        else:
+            postings[key] = entries[:i] + entries[i + 1:]
+
+    def _edge_grams(self, token: str) -> Iterable[str]:
+        for size in range(self.min_gram, min(len(token), self.max_gram) + 1):
+            yield token[:size]
+
+    def _doc_grams(self, tokens: List[str]) -> Set[str]:
+        """Edge n-grams of all tokens (a patient appears once per posting)"""
+        low = self.min_gram
+        return {token[:size] for token in tokens for size in range(low, min(len(token), self.max_gram) + 1)}
+
+    # ==================== BUILD ====================
+
+    def build(self, db, batch_size: int = 5000) -> int:
+        """
+        (Re)build the index from the patients table
+
+        Only national_id, full_name, phone and email are fetched, streamed
+        in batches, so building does not materialize ORM objects.
+
+        Args:
+            db: Database session
+            batch_size: Rows per round trip
+
+        Returns:
+            int: Number of patients indexed
+        """
+        from core.models import Patient
+
+        started = time.perf_counter()
+        with self._lock:
+            self._building = True
+            self._pending = []
+
+        rows = db.query(
+            Patient.national_id,
+            Patient.full_name,
+            Patient.phone,
+            Patient.email
+        ).yield_per(batch_size)
+
+        fresh = PatientSearchIndex(self.min_gram, self.max_gram, self.max_age)
+        try:
+            fingerprint = self._table_fingerprint(db)
+            count = fresh._bulk_load(rows)
+        except Exception:
+            with self._lock:
+                self._building = False
+                self._pending = []
+            raise
+
+        # Swap in the new postings atomically, then replay writes that
+        # happened while the snapshot was being read
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._building = False
+            for national_id, full_name, phone, email, *removed in pending:
+                if removed:
+                    fresh.remove(national_id)
+                else:
+                    fresh.upsert(national_id, full_name, phone, email)
+
+            self._docs = fresh._docs
+            self._tokens = fresh._tokens
+            self._grams = fresh._grams
+            self._emails = fresh._emails
+            self._national_ids = fresh._national_ids
+            self._phones = fresh._phones
+            self.ready = True
+            self.built_at = time.time()
+            self.build_seconds = round(time.perf_counter() - started, 3)
+            self._fingerprint = fingerprint
+
+        return count
+
+    def _bulk_load(self, rows) -> int:
+        """
+        Fill an empty index in one pass: documents are sorted by name once
+        and appended in that order, so every posting comes out sorted
+        without per-row inserts
+        """
+        docs = []
+        for national_id, full_name, phone, email in rows:
+            if not national_id:
+                continue
+            name = normalize_text(full_name or '')
+            email_key = email.strip().casefold() if email else None
+            doc = self._new_doc(national_id, name, _split_tokens(name), phone_variants(phone), email_key)
+            self._docs[national_id] = doc
+            self._add_lookups(national_id, doc)
+            docs.append(doc)
+
+        docs.sort(key=lambda doc: doc['entry'][:2])
+        tokens, grams = self._tokens, self._grams
+        for doc in docs:
+            entry = doc['entry']
+            for token in set(doc['tokens']):
+                tokens.setdefault(token, []).append(entry)
+            for gram in self._doc_grams(doc['tokens']):
+                grams.setdefault(gram, []).append(entry)
+        return len(docs)
+
+    @staticmethod
+    def _table_fingerprint(db):
+        """
+        Cheap summary of the patients table (row count, newest ID and update)
+
+        Returns None while the newest update is in the current second of the
+        database clock: a write in that same second would not change it.
+        """
+        from sqlalchemy import func
+        from core.models import Patient
+
+        count, max_id, last_updated, now = db.query(
+            func.count(Patient.id), func.max(Patient.id), func.max(Patient.last_updated), func.now()
+        ).one()
+        if last_updated is not None and now is not None and (now - last_updated).total_seconds() < 1:
+            return None
+        return count, max_id, last_updated
+
+    def build_in_background(self, session_factory, batch_size: int = 5000, refresh: bool = False):
+        """
+        Start building on a daemon thread (no-op if already running, or
+        ready unless refresh is set)
+
+        Args:
+            session_factory: Callable returning a new session (e.g. get_db)
+            batch_size: Rows per round trip
+            refresh: Rebuild a ready index (searches keep using it meanwhile)
+        """
+        with self._lock:
+            if (self.ready and not refresh) or (self._build_thread and self._build_thread.is_alive()):
+                return
+
+            def _run():
+                db = session_factory()
+                try:
+                    if (refresh and self.ready and self._fingerprint is not None
+                            and self._table_fingerprint(db) == self._fingerprint):
+                        # Nothing changed outside this process - keep the postings
+                        self.built_at = time.time()
+                        return
+                    count = self.build(db, batch_size)
+                    print(f"✅ Patient search index built: {count} patients in {self.build_seconds}s")
+                except Exception as e:
+                    print(f"❌ Patient search index build failed: {e}")
+                finally:
+                    db.close()
+
+            self._build_thread = threading.Thread(
+                target=_run, name="patient-search-index", daemon=True
+            )
+            self._build_thread.start()
+
+    # ==================== SEARCH ====================
+
+    def search(self, query: str, limit: int = 50) -> List[str]:
+        """
+        Ranked type-ahead search
+
+        Digit queries match national ID then phone prefixes; text queries
+        match every name token by prefix (AND); '@' queries match email.
+
+        Args:
+            query: Search term
+            limit: Maximum results
+
+        Returns:
+            List[str]: National IDs, best match first
+        """
+        query = (query or '').strip()
+        if not query or limit <= 0:
+            return []
+
+        digits = normalize_digits(query)
+        with self._lock:
+            if digits and len(digits) == len(re.sub(r'[\s\-+()]', '', query)):
+                return self._search_digits(digits, limit)
+
+            if '@' in query:
+                ranked = self._search_email(query.casefold(), limit)
+                if ranked:
+                    return ranked
+
+            # Snapshot the postings; they are never modified in place
+            tokens = tokenize(query)
+            postings = [
+                (self._grams.get(token[:self.max_gram]), self._tokens.get(token))
+                for token in tokens
+            ]
+
+        return self._search_name(tokens, postings, limit)
+
+    def lookup(self, query: str, limit: int = 50) -> Optional[List[str]]:
+        """
+        Search if the index is warm
+
+        On a cold start the index is built in the background and None is
+        returned so the caller can fall back to SQL for this request. An
+        index older than max_age is rebuilt in the background.
+
+        Returns:
+            List[str]: Ranked national IDs, or None if the index is not ready
+        """
+        if not SEARCH_INDEX_SETTINGS.get('enabled', True):
+            return None
+
+        if not self.ready:
+            if SEARCH_INDEX_SETTINGS.get('build_on_first_search', True):
+                self.build_in_background(
+                    get_db, SEARCH_INDEX_SETTINGS.get('build_batch_size', 5000)
+                )
+            return None
+
+        if self.max_age and time.time() - self.built_at > self.max_age:
+            self.build_in_background(
+                get_db, SEARCH_INDEX_SETTINGS.get('build_batch_size', 5000), refresh=True
+            )
+
+        return self.search(query, limit)
+
+    def _search_digits(self, digits: str, limit: int) -> List[str]:
+        ranked = []
+        seen = set()
+
+        def add(keys):
+            for key in keys:
+                if key not in seen:
+                    seen.add(key)
+                    ranked.append(key)
+                    if len(ranked) >= limit:
+                        return True
+            return False
+
+        if add(sorted(self._national_ids.exact(digits))):
+            return ranked
+        if add(self._national_ids.prefix(digits, limit)):
+            return ranked
+        if add(sorted(self._phones.exact(digits))):
+            return ranked
+        add(self._phones.prefix(digits, limit))
+        return ranked
+
+    def _search_email(self, query: str, limit: int) -> List[str]:
+        return sorted(self._emails.get(query, ()))[:limit]
+
+    @staticmethod
+    def _search_name(tokens: List[str], postings: List, limit: int) -> List[str]:
+        """
+        Rank name matches from snapshotted postings (runs outside the lock)
+
+        Tier 1: every query token is a whole name token; tier 2: prefix
+        matches. Within a tier, names starting with the first query token
+        come first, then alphabetical. Postings are sorted by name, so each
+        tier stops reading once limit matches are found.
+        """
+        if not tokens:
+            return []
+        if any(not prefix for prefix, _ in postings):
+            return []
+
+        def is_match(entry):
+            return all(any(t.startswith(token) for t in entry[2]) for token in tokens)
+
+        def is_exact(entry):
+            return all(token in entry[2] for token in tokens)
+
+        ranked = []
+        exact_lists = [exact for _, exact in postings]
+        if all(exact_lists):
+            # Smallest whole-token posting holds every tier 1 candidate
+            for entry in _name_order(min(exact_lists, key=len), tokens[0]):
+                if is_exact(entry):
+                    ranked.append(entry[1])
+                    if len(ranked) >= limit:
+                        return ranked
+
+        # Smallest prefix posting holds every candidate
+        for entry in _name_order(min((prefix for prefix, _ in postings), key=len), tokens[0]):
+            if is_match(entry) and not is_exact(entry):
+                ranked.append(entry[1])
+                if len(ranked) >= limit:
+                    break
+        return ranked
+
+    # ==================== STATISTICS ====================
+
+    def stats(self) -> Dict:
+        """Index size and build information"""
+        with self._lock:
+            return {
+                'ready': self.ready,
+                'patients': len(self._docs),
+                'tokens': len(self._tokens),
+                'grams': len(self._grams),
+                'built_at': self.built_at,
+                'build_seconds': self.build_seconds
+            }
+
+    def __len__(self):
+        return len(self._docs)
+
+
+# Global instance
+patient_search_index = PatientSearchIndex(
+    min_gram=SEARCH_INDEX_SETTINGS.get('min_gram', 1),
+    max_gram=SEARCH_INDEX_SETTINGS.get('max_gram', 15),
+    max_age_seconds=SEARCH_INDEX_SETTINGS.get('max_age_seconds', 900)
+)
@@ -0,0 +1,89 @@
+"""
+Patient Summary - Column-projected patient rows for lists and tables
+Selects only the columns a list shows (no ORM identity map, no relationships);
+load the full record with search_engine.search_by_national_id() on drill-down
+
+Location: core/patient_summary.py
+"""
+
+from core.models import Patient
+from typing import Dict, Iterable, List
+
+
+class PatientSummary:
+    """Compact read-only patient row (uses __slots__, no per-instance dict)"""
+
+    __slots__ = (
+        'id', 'national_id', 'full_name', 'age', 'gender',
+        'blood_type', 'phone', 'city'
+    )
+
+    # Columns selected for a summary (same order as __slots__)
+    COLUMNS = (
+        Patient.id,
+        Patient.national_id,
+        Patient.full_name,
+        Patient.age,
+        Patient.gender,
+        Patient.blood_type,
+        Patient.phone,
+        Patient.city,
+    )
+
+    def __init__(self, id, national_id, full_name, age=None, gender=None,
+                 blood_type=None, phone=None, city=None):
+        self.id = id
+        self.national_id = national_id
+        self.full_name = full_name
+        self.age = age
+        self.gender = gender
+        self.blood_type = blood_type
+        self.phone = phone
+        self.city = city
+
+    @classmethod
+    def from_row(cls, row) -> 'PatientSummary':
+        """Build from a row of COLUMNS (enum columns become their values)"""
+        id, national_id, full_name, age, gender, blood_type, phone, city = row
+        return cls(
+            id, national_id, full_name, age,
+            gender.value if gender is not None else None,
+            blood_type.value if blood_type is not None else None,
+            phone, city
+        )
+
+    def to_dict(self) -> Dict:
+        """Convert to a plain dict (e.g. for JSON responses)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"<PatientSummary(national_id='{self.national_id}', name='{self.full_name}')>"
+
+
+def summary_query(db):
+    """Query selecting only PatientSummary.COLUMNS"""
+    return db.query(*PatientSummary.COLUMNS)
+
+
+def to_summaries(rows: Iterable) -> List[PatientSummary]:
+    """Convert rows of summary_query() to PatientSummary objects"""
+    return [PatientSummary.from_row(row) for row in rows]
+
+
+def load_summaries(db, national_ids: List[str]) -> List[PatientSummary]:
+    """
+    Load summaries for national IDs, keeping the given order
+
+    Args:
+        db: Active database session
+        national_ids: National IDs (e.g. ranked search index hits)
+
+    Returns:
+        List[PatientSummary]: Summaries in the same order (missing IDs skipped)
+    """
+    if not national_ids:
+        return []
+
+    rows = summary_query(db).filter(Patient.national_id.in_(national_ids)).all()
+    by_id = {row.national_id: row for row in rows}
+    return [PatientSummary.from_row(by_id[nid]) for nid in national_ids if nid in by_id]
@@ -0,0 +1,322 @@
+"""
+Query Monitor - SQL instrumentation and N+1 detection
+Engine event listeners that record statement latency and rows, group them
+by the calling manager method, flag repeated statements (N+1), log slow
+queries and enforce query budgets in tests
+
+Location: core/query_monitor.py
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+from typing import Dict, List
+
+from sqlalchemy import event
+
+from config.database_config import SQL_INSTRUMENTATION_SETTINGS
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Frames in these files are skipped when looking for the calling method
+_SKIP_FILES = (
+    os.path.abspath(__file__),
+    os.path.join(PROJECT_ROOT, 'core', 'database.py'),
+    os.path.join(PROJECT_ROOT, 'core', 'pagination.py'),
+    os.path.join(PROJECT_ROOT, 'core', 'patient_aggregate.py'),
+)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _find_caller() -> str:
+    """module.function of the first project frame outside database helpers"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(PROJECT_ROOT) and filename not in _SKIP_FILES \
+                and 'site-packages' not in filename:
+            module = os.path.relpath(filename, PROJECT_ROOT)[:-3].replace(os.sep, '.')
+            name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+            return f"{module}.{name}"
+        frame = frame.f_back
+    return '<unknown>'
+
+
+class QueryBudget(ContextDecorator):
+    """
+    Assert a maximum number of SQL statements (context manager or decorator)
+
+    Usage:
+        with query_budget(3):
+            search_engine.search_patients('Ahmed')
+
+        @query_budget(1, allow_n_plus_one=False)
+        def test_card_lookup(): ...
+    """
+
+    def __init__(self, monitor: 'QueryMonitor', max_queries: int, allow_n_plus_one: bool = True):
+        self.monitor = monitor
+        self.max_queries = max_queries
+        self.allow_n_plus_one = allow_n_plus_one
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        self.statements = []
+        self.monitor._push_budget(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.monitor._pop_budget(self)
+        if exc_type is not None:
+            return False
+
+        if self.count > self.max_queries:
+            raise AssertionError(
+                f"{self.count} queries issued, budget is {self.max_queries}:\n"
+                + '\n'.join(f"  {i + 1}. {sql[:200]}" for i, sql in enumerate(self.statements))
+            )
+
+        if not self.allow_n_plus_one:
+            repeated = self.monitor._repeated(self.statements)
+            if repeated:
+                sql, times = repeated[0]
+                raise AssertionError(f"N+1: statement ran {times} times: {sql[:200]}")
+        return False
+
+
+class QueryMonitor:
+    """Opt-in SQL statement recorder attached to SQLAlchemy engines"""
+
+    def __init__(self, slow_query_ms: float = 200, n_plus_one_threshold: int = 5,
+                 recent_statements: int = 500):
+        """
+        Initialize monitor
+
+        Args:
+            slow_query_ms: Statements slower than this are logged
+            n_plus_one_threshold: Same statement this many times within one
+                                  connection checkout is reported as N+1
+            recent_statements: Number of statements kept in recent()
+        """
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+        self.enabled = False
+        self._engines = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        self._by_caller = {}  # caller -> {'count', 'total_ms', 'max_ms', 'rows'}
+        self._recent = deque(maxlen=recent_statements)
+        self._slow = deque(maxlen=recent_statements)
+        self._n_plus_one = {}  # (caller, statement) -> max repetitions seen
+        self.total_statements = 0
+
+    # ==================== SETUP ====================
+
+    def install(self, engine):
+        """
+        Attach listeners to an engine (idempotent)
+        Listeners do nothing until enable() or a query budget is active.
+        """
+        if id(engine) in self._engines:
+            return
+        self._engines.add(id(engine))
+
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+
+    def enable(self, engine=None):
+        """Start recording (optionally installing on engine first)"""
+        if engine is not None:
+            self.install(engine)
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording (collected statistics are kept)"""
+        self.enabled = False
+
+    def reset(self):
+        """Drop all collected statistics"""
+        with self._lock:
+            self._by_caller.clear()
+            self._recent.clear()
+            self._slow.clear()
+            self._n_plus_one.clear()
+            self.total_statements = 0
+
+    # ==================== BUDGETS ====================
+
+    def query_budget(self, max_queries: int, allow_n_plus_one: bool = True) -> QueryBudget:
+        """Create a QueryBudget for this monitor"""
+        return QueryBudget(self, max_queries, allow_n_plus_one)
+
+    def _budgets(self) -> List[QueryBudget]:
+        budgets = getattr(self._local, 'budgets', None)
+        if budgets is None:
+            budgets = self._local.budgets = []
+        return budgets
+
+    def _push_budget(self, budget: QueryBudget):
+        self._budgets().append(budget)
+
+    def _pop_budget(self, budget: QueryBudget):
+        budgets = self._budgets()
+        if budget in budgets:
+            budgets.remove(budget)
+
+    def _repeated(self, statements: List[str]) -> List:
+        """Statements repeated at least n_plus_one_threshold times, most first"""
+        counts = {}
+        for sql in statements:
+            counts[sql] = counts.get(sql, 0) + 1
+        repeated = [(sql, n) for sql, n in counts.items() if n >= self.n_plus_one_threshold]
+        return sorted(repeated, key=lambda item: -item[1])
+
+    # ==================== LISTENERS ====================
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        # One checkout ~ one session's unit of work
+        connection_record.info['query_monitor_counts'] = {}
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        connection_record.info.pop('query_monitor_counts', None)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        # Start time lives on the statement's ExecutionContext: a statement that
+        # raises leaves nothing behind on the connection
+        if context is not None and (self.enabled or self._budgets()):
+            context._query_monitor_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_query_monitor_start', None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        sql = _WHITESPACE.sub(' ', statement).strip()
+
+        for budget in self._budgets():
+            budget.statements.append(sql)
+
+        if not self.enabled:
+            return
+
+        caller = _find_caller()
+        rows = cursor.rowcount if cursor is not None and cursor.rowcount >= 0 else None
+
+        with self._lock:
+            self.total_statements += 1
+
+            stats = self._by_caller.get(caller)
+            if stats is None:
+                stats = self._by_caller[caller] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0}
+            stats['count'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['rows'] += rows or 0
+
+            record = {'caller': caller, 'statement': sql, 'ms': round(elapsed_ms, 3), 'rows': rows}
+            self._recent.append(record)
+
+            # N+1 - same statement repeated within one connection checkout
+            counts = conn.info.get('query_monitor_counts')
+            repeated = None
+            if counts is not None:
+                counts[sql] = counts.get(sql, 0) + 1
+                if counts[sql] >= self.n_plus_one_threshold:
+                    key = (caller, sql)
+                    first_report = key not in self._n_plus_one
+                    self._n_plus_one[key] = max(self._n_plus_one.get(key, 0), counts[sql])
+                    if first_report:
+                        repeated = counts[sql]
+
+            if elapsed_ms >= self.slow_query_ms:
+                self._slow.append(record)
+
+        if repeated:
+            print(f"⚠️ Possible N+1 in {caller}: statement ran {repeated} times: {sql[:200]}")
+        if elapsed_ms >= self.slow_query_ms:
+            print(f"⚠️ Slow query ({elapsed_ms:.1f} ms) in {caller}: {sql[:200]}")
+
+    # ==================== REPORTING ====================
+
+    def report(self) -> Dict:
+        """
+        Get collected statistics
+
+        Returns:
+            dict: total_statements, by_caller (slowest total first),
+                  n_plus_one and slow_queries
+        """
+        with self._lock:
+            by_caller = sorted(
+                (
+                    {
+                        'caller': caller,
+                        'count': s['count'],
+                        'total_ms': round(s['total_ms'], 3),
+                        'avg_ms': round(s['total_ms'] / s['count'], 3),
+                        'max_ms': round(s['max_ms'], 3),
+                        'rows': s['rows']
+                    }
+                    for caller, s in self._by_caller.items()
+                ),
+                key=lambda item: -item['total_ms']
+            )
+            return {
+                'total_statements': self.total_statements,
+                'by_caller': by_caller,
+                'n_plus_one': [
+                    {'caller': caller, 'statement': sql, 'times': times}
+                    for (caller, sql), times in self._n_plus_one.items()
+                ],
+                'slow_queries': list(self._slow)
+            }
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Most recent statements (newest last)"""
+        with self._lock:
+            return list(self._recent)[-limit:]
+
+    def print_report(self, limit: int = 20):
+        """Print per-caller statistics"""
+        report = self.report()
+        print(f"\n📊 SQL statements: {report['total_statements']}")
+        for item in report['by_caller'][:limit]:
+            print(f"  {item['count']:>6}x {item['total_ms']:>10.1f} ms  {item['caller']}")
+        for item in report['n_plus_one']:
+            print(f"  ⚠️ N+1 ({item['times']}x) in {item['caller']}: {item['statement'][:120]}")
+
+
+# Global instance
+query_monitor = QueryMonitor(
+    slow_query_ms=SQL_INSTRUMENTATION_SETTINGS.get('slow_query_ms', 200),
+    n_plus_one_threshold=SQL_INSTRUMENTATION_SETTINGS.get('n_plus_one_threshold', 5),
+    recent_statements=SQL_INSTRUMENTATION_SETTINGS.get('recent_statements', 500)
+)
+
+
+def query_budget(max_queries: int, allow_n_plus_one: bool = True) -> QueryBudget:
+    """
+    Assert that a block issues at most max_queries statements
+
+    Args:
+        max_queries: Maximum number of statements
+        allow_n_plus_one: False also fails on repeated identical statements
+
+    Returns:
+        QueryBudget: Context manager / decorator
+    """
+    return query_monitor.query_budget(max_queries, allow_n_plus_one)
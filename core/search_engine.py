@@ -6,12 +6,23 @@ Location: core/search_engine.py (REPLACE YOUR FILE)
 """
 
 from core.database import get_db
+from core.patient_aggregate import aggregate_loader
+from core.patient_cache import patient_cache
+from core.patient_loader import (
+    allergies_to_dicts, chronic_diseases_to_dicts, family_history_to_dicts,
+    disabilities_to_dicts, emergency_directives_to_dict, lifestyle_to_dict
+)
+from core.patient_search_index import patient_search_index
+from core.pagination import keyset_page, keyset_batches
+from core.statistics_engine import statistics_engine
+from core.patient_filters import PatientFilter
+from core.patient_summary import PatientSummary, summary_query, to_summaries, load_summaries
 from core.models import (
-    Patient, User, Visit, LabResult, ImagingResult,
+    Patient, Visit, LabResult, ImagingResult,
     Surgery, Hospitalization, Vaccination
 )
-from sqlalchemy import or_, and_, desc, func
-from typing import List, Dict, Optional
+from sqlalchemy import or_, and_, desc
+from typing import List, Dict, Optional, Iterator
 from datetime import datetime, date, timedelta
 
 
@@ -40,22 +51,24 @@ def convert_patient_to_dict(patient) -> dict:
             
             # JSON fields
             'emergency_contact': patient.emergency_contact or {},
-            'allergies': patient.allergies or [],
-            'chronic_diseases': patient.chronic_diseases or [],
-            'family_history': patient.family_history or {},
-            'disabilities_special_needs': patient.disabilities_special_needs or {},
-            'emergency_directives': patient.emergency_directives or {},
-            'lifestyle': patient.lifestyle or {},
             'insurance': patient.insurance or {},
             'external_links': patient.external_links or {},
             
+            # Clinical relationships - plain dicts, never ORM instances
+            'allergies': allergies_to_dicts(patient),
+            'chronic_diseases': chronic_diseases_to_dicts(patient),
+            'family_history': family_history_to_dicts(patient),
+            'disabilities_special_needs': disabilities_to_dicts(patient),
+            'emergency_directives': emergency_directives_to_dict(patient),
+            'lifestyle': lifestyle_to_dict(patient),
+            
             # Relationships - convert to dicts
             'current_medications': [
                 {
                     'name': m.medication_name,
                     'dosage': m.dosage,
                     'frequency': m.frequency,
-                    'started_date': str(m.started_date) if m.started_date else None
+                    'started_date': str(m.start_date) if m.start_date else None
                 }
                 for m in patient.current_medications 
                 if hasattr(m, 'is_active') and m.is_active
@@ -122,9 +135,49 @@ def convert_patient_to_dict(patient) -> dict:
 class SearchEngine:
     """Advanced search for patients and medical records - FIXED"""
     
+    # Relationships walked by convert_patient_to_dict
+    RESULT_PROFILE = 'clinical'
+    
+    # Unique sort key for keyset pagination (matches the full_name index)
+    PAGE_ORDER = (Patient.full_name, Patient.id)
+    
     def __init__(self):
         pass
     
+    def _patient_query(self, db):
+        """
+        Patient query with eager loading for convert_patient_to_dict
+        Keeps a result list at a fixed number of queries (no N+1)
+        """
+        return aggregate_loader.apply(db.query(Patient), self.RESULT_PROFILE)
+    
+    def _load_ranked(self, national_ids: List[str]) -> List[dict]:
+        """
+        Load patients for ranked search index hits, keeping the ranking
+        
+        Args:
+            national_ids: National IDs, best match first
+            
+        Returns:
+            List[dict]: Patient dicts in the same order
+        """
+        if not national_ids:
+            return []
+        
+        db = get_db()
+        try:
+            patients = self._patient_query(db).filter(
+                Patient.national_id.in_(national_ids)
+            ).all()
+            
+            by_id = {p.national_id: p for p in patients}
+            return [
+                convert_patient_to_dict(by_id[nid])
+                for nid in national_ids if nid in by_id
+            ]
+        finally:
+            db.close()
+    
     # ==================== PATIENT SEARCH (All return dicts!) ====================
     
     def search_by_national_id(self, national_id: str) -> Optional[dict]:
@@ -137,9 +190,17 @@ class SearchEngine:
         Returns:
             dict: Complete patient data or None
         """
+        return patient_cache.get_or_load(
+            national_id,
+            lambda: self._load_by_national_id(national_id),
+            view='search'
+        )
+    
+    def _load_by_national_id(self, national_id: str) -> Optional[dict]:
+        """Load patient dict from the database (cache miss path)"""
         db = get_db()
         try:
-            patient = db.query(Patient).filter_by(
+            patient = self._patient_query(db).filter_by(
                 national_id=national_id
             ).first()
             
@@ -162,9 +223,14 @@ class SearchEngine:
         Returns:
             List[dict]: List of patient dicts
         """
+        ranked = patient_search_index.lookup(name, limit)
+        if ranked is not None:
+            return self._load_ranked(ranked)
+        
+        # Cold start - index still building
         db = get_db()
         try:
-            patients = db.query(Patient).filter(
+            patients = self._patient_query(db).filter(
                 Patient.full_name.ilike(f"%{name}%")
             ).limit(limit).all()
             
@@ -189,7 +255,12 @@ class SearchEngine:
             # Remove common phone formatting
             clean_phone = phone.replace('-', '').replace(' ', '').replace('(', '').replace(')', '')
             
-            patients = db.query(Patient).filter(
+            ranked = patient_search_index.lookup(clean_phone, limit)
+            if ranked is not None:
+                return self._load_ranked(ranked)
+            
+            # Cold start - index still building
+            patients = self._patient_query(db).filter(
                 Patient.phone.contains(clean_phone)
             ).limit(limit).all()
             
@@ -214,7 +285,12 @@ class SearchEngine:
             # Clean query
             clean_query = query.strip()
             
-            patients = db.query(Patient).filter(
+            ranked = patient_search_index.lookup(clean_query, limit)
+            if ranked is not None:
+                return self._load_ranked(ranked)
+            
+            # Cold start - index still building
+            patients = self._patient_query(db).filter(
                 or_(
                     Patient.full_name.ilike(f"%{clean_query}%"),
                     Patient.national_id.contains(clean_query),
@@ -228,6 +304,42 @@ class SearchEngine:
         finally:
             db.close()
     
+    def search_summaries(self, query: str, limit: int = 50) -> List[PatientSummary]:
+        """
+        Universal patient search returning PatientSummary rows (for result lists)
+        
+        Same matching as search_patients() but only list columns are fetched;
+        load the selected patient with search_by_national_id()
+        
+        Args:
+            query: Search term
+            limit: Maximum results to return
+            
+        Returns:
+            List[PatientSummary]: Matching patients
+        """
+        clean_query = query.strip()
+        ranked = patient_search_index.lookup(clean_query, limit)
+        
+        db = get_db()
+        try:
+            if ranked is not None:
+                return load_summaries(db, ranked)
+            
+            # Cold start - index still building
+            rows = summary_query(db).filter(
+                or_(
+                    Patient.full_name.ilike(f"%{clean_query}%"),
+                    Patient.national_id.contains(clean_query),
+                    Patient.phone.contains(clean_query),
+                    Patient.email.ilike(f"%{clean_query}%")
+                )
+            ).limit(limit).all()
+            
+            return to_summaries(rows)
+        finally:
+            db.close()
+    
     def search_by_age_range(self, min_age: int, max_age: int, limit: int = 50) -> List[dict]:
         """
         Search patients by age range
@@ -242,7 +354,7 @@ class SearchEngine:
         """
         db = get_db()
         try:
-            patients = db.query(Patient).filter(
+            patients = self._patient_query(db).filter(
                 and_(
                     Patient.age >= min_age,
                     Patient.age <= max_age
@@ -272,7 +384,7 @@ class SearchEngine:
             try:
                 blood_type_enum = BloodType[blood_type.replace('+', '_pos').replace('-', '_neg')]
                 
-                patients = db.query(Patient).filter(
+                patients = self._patient_query(db).filter(
                     Patient.blood_type == blood_type_enum
                 ).limit(limit).all()
                 
@@ -295,7 +407,7 @@ class SearchEngine:
         """
         db = get_db()
         try:
-            patients = db.query(Patient).filter(
+            patients = self._patient_query(db).filter(
                 Patient.city.ilike(f"%{city}%")
             ).limit(limit).all()
             
@@ -305,7 +417,10 @@ class SearchEngine:
     
     def get_all_patients(self, limit: int = 100, offset: int = 0) -> List[dict]:
         """
-        Get all patients (with pagination)
+        Get all patients (with OFFSET pagination)
+        
+        Deep offsets scan and discard every skipped row - prefer
+        get_patients_page() for paging and iter_patients() for batch jobs
         
         Args:
             limit: Number of patients to return
@@ -316,7 +431,7 @@ class SearchEngine:
         """
         db = get_db()
         try:
-            patients = db.query(Patient).order_by(
+            patients = self._patient_query(db).order_by(
                 Patient.full_name
             ).limit(limit).offset(offset).all()
             
@@ -324,13 +439,62 @@ class SearchEngine:
         finally:
             db.close()
     
-    def get_recent_patients(self, days: int = 30, limit: int = 50) -> List[dict]:
+    def get_patients_page(self, limit: int = 100, cursor: Optional[str] = None,
+                          summary: bool = True) -> dict:
+        """
+        Get one page of patients ordered by name (keyset pagination)
+        
+        Seeks on (full_name, id) so every page costs the same as page one
+        
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page (None for first page)
+            summary: True -> PatientSummary rows, False -> full patient dicts
+            
+        Returns:
+            dict: {'patients': [...], 'next_cursor': str or None, 'has_more': bool}
+        """
+        db = get_db()
+        try:
+            query = summary_query(db) if summary else self._patient_query(db)
+            patients, next_cursor = keyset_page(query, self.PAGE_ORDER, limit, cursor)
+            
+            return {
+                'patients': to_summaries(patients) if summary
+                            else [convert_patient_to_dict(p) for p in patients],
+                'next_cursor': next_cursor,
+                'has_more': next_cursor is not None
+            }
+        finally:
+            db.close()
+    
+    def iter_patients(self, batch_size: int = 500) -> Iterator[dict]:
+        """
+        Stream every patient ordered by name (for exports / batch jobs)
+        
+        Args:
+            batch_size: Patients fetched per query
+            
+        Yields:
+            dict: Patient dict
+        """
+        for batch in keyset_batches(
+            get_db,
+            self._patient_query,
+            self.PAGE_ORDER,
+            batch_size,
+            convert=convert_patient_to_dict
+        ):
+            yield from batch
+    
+    def get_recent_patients(self, days: int = 30, limit: int = 50, summary: bool = False) -> List:
         """
         Get recently registered patients
         
         Args:
             days: Number of days to look back
             limit: Maximum results
+            summary: Return PatientSummary rows instead of full dicts
             
         Returns:
             List[dict]: Recently registered patients
@@ -339,12 +503,15 @@ class SearchEngine:
         try:
             cutoff_date = datetime.now() - timedelta(days=days)
             
-            patients = db.query(Patient).filter(
+            query = summary_query(db) if summary else self._patient_query(db)
+            patients = query.filter(
                 Patient.created_at >= cutoff_date
             ).order_by(
                 desc(Patient.created_at)
             ).limit(limit).all()
             
+            if summary:
+                return to_summaries(patients)
             return [convert_patient_to_dict(p) for p in patients]
         finally:
             db.close()
@@ -410,45 +577,38 @@ class SearchEngine:
         finally:
             db.close()
     
-    def get_database_statistics(self) -> dict:
+    def get_database_statistics(self, force_refresh: bool = False) -> dict:
         """
-        Get overall database statistics
+        Get overall database statistics (cached, see core/statistics_engine.py)
+        
+        Args:
+            force_refresh: Recompute instead of using the cached snapshot
         
         Returns:
             dict: Database-wide statistics
         """
-        db = get_db()
-        try:
-            stats = {
-                'total_patients': db.query(Patient).count(),
-                'total_doctors': db.query(User).filter(User.role == 'doctor').count(),
-                'total_visits': db.query(Visit).count(),
-                'total_lab_results': db.query(LabResult).count(),
-                'total_imaging_results': db.query(ImagingResult).count(),
-                'total_surgeries': db.query(Surgery).count(),
-                'total_hospitalizations': db.query(Hospitalization).count(),
-                'total_vaccinations': db.query(Vaccination).count(),
-                
-                # Blood type distribution
-                'blood_type_distribution': {},
-                
-                # Age statistics
-                'avg_patient_age': db.query(func.avg(Patient.age)).scalar() or 0,
-                'min_patient_age': db.query(func.min(Patient.age)).scalar() or 0,
-                'max_patient_age': db.query(func.max(Patient.age)).scalar() or 0,
-            }
-            
-            # Calculate blood type distribution
-            from core.models import BloodType
-            for blood_type in BloodType:
-                count = db.query(Patient).filter(
-                    Patient.blood_type == blood_type
-                ).count()
-                stats['blood_type_distribution'][blood_type.value] = count
-            
-            return stats
-        finally:
-            db.close()
+        stats = statistics_engine.get_statistics(force_refresh)
+        patients = stats['patients']
+        records = stats['records']
+        
+        return {
+            'total_patients': patients['total'],
+            'total_doctors': stats['doctors']['user_accounts'],
+            'total_visits': records['visits'],
+            'total_lab_results': records['lab_results'],
+            'total_imaging_results': records['imaging_results'],
+            'total_surgeries': records['surgeries'],
+            'total_hospitalizations': records['hospitalizations'],
+            'total_vaccinations': records['vaccinations'],
+            
+            # Blood type distribution
+            'blood_type_distribution': patients['blood_type_distribution'],
+            
+            # Age statistics
+            'avg_patient_age': patients['avg_age'],
+            'min_patient_age': patients['min_age'],
+            'max_patient_age': patients['max_age'],
+        }
     
     # ==================== ADVANCED FILTERS ====================
     
@@ -477,52 +637,37 @@ class SearchEngine:
         Returns:
             List[dict]: Filtered patients
         """
+        criteria = (
+            PatientFilter()
+            .gender(gender)
+            .age_between(min_age, max_age)
+            .city(city)
+            .blood_type(blood_type)
+            .has_chronic_diseases(has_chronic_diseases)
+            .has_allergies(has_allergies)
+        )
+        return self.filter_by(criteria, limit)
+    
+    def filter_by(self, criteria: PatientFilter, limit: int = 50, summary: bool = False) -> List:
+        """
+        Run a PatientFilter (all criteria and the LIMIT run in the database)
+        
+        Args:
+            criteria: PatientFilter built by the caller
+            limit: Maximum results
+            summary: Return PatientSummary rows instead of full dicts
+            
+        Returns:
+            List[dict]: Filtered patients ordered by name
+        """
         db = get_db()
         try:
-            query = db.query(Patient)
-            
-            # Apply filters
-            if gender:
-                from core.models import Gender
-                try:
-                    gender_enum = Gender[gender]
-                    query = query.filter(Patient.gender == gender_enum)
-                except KeyError:
-                    pass
-            
-            if min_age is not None:
-                query = query.filter(Patient.age >= min_age)
-            
-            if max_age is not None:
-                query = query.filter(Patient.age <= max_age)
-            
-            if city:
-                query = query.filter(Patient.city.ilike(f"%{city}%"))
-            
-            if blood_type:
-                from core.models import BloodType
-                try:
-                    blood_type_enum = BloodType[blood_type.replace('+', '_pos').replace('-', '_neg')]
-                    query = query.filter(Patient.blood_type == blood_type_enum)
-                except KeyError:
-                    pass
-            
-            # Get results
-            patients = query.limit(limit).all()
-            
-            # Convert to dicts
-            result = [convert_patient_to_dict(p) for p in patients]
-            
-            # Apply JSON field filters (must be done after query)
-            if has_chronic_diseases is not None:
-                result = [p for p in result 
-                         if (len(p.get('chronic_diseases', [])) > 0) == has_chronic_diseases]
-            
-            if has_allergies is not None:
-                result = [p for p in result 
-                         if (len(p.get('allergies', [])) > 0) == has_allergies]
-            
-            return result
+            query = summary_query(db) if summary else self._patient_query(db)
+            patients = criteria.apply(query).order_by(*self.PAGE_ORDER).limit(limit).all()
+            
+            if summary:
+                return to_summaries(patients)
+            return [convert_patient_to_dict(p) for p in patients]
         finally:
             db.close()
 
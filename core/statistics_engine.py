@@ -0,0 +1,307 @@
+"""
+Statistics Engine - Dashboard counts and distributions in two round trips
+Replaces one COUNT(*) query per table / per blood type with conditional
+aggregates and scalar subqueries, cached with a refresh interval
+
+Location: core/statistics_engine.py
+"""
+
+import copy
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import select, func, case
+
+from config.database_config import STATISTICS_SETTINGS
+from core.database import get_db
+from core.models import (
+    Patient, User, UserRole, Doctor, Visit, LabResult, ImagingResult,
+    Surgery, Hospitalization, Vaccination, Allergy, ChronicDisease,
+    CurrentMedication, NFCCard, StatisticsSummary, Gender, BloodType
+)
+
+
+# Name of the statistics_summary row written by this engine
+SUMMARY_NAME = 'database'
+
+# Record tables counted in the second round trip
+RECORD_COUNTS = {
+    'visits': Visit,
+    'lab_results': LabResult,
+    'imaging_results': ImagingResult,
+    'surgeries': Surgery,
+    'hospitalizations': Hospitalization,
+    'vaccinations': Vaccination,
+    'allergies': Allergy,
+    'chronic_diseases': ChronicDisease,
+}
+
+
+def _count_if(condition):
+    """SUM(CASE WHEN condition THEN 1 ELSE 0 END)"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+class StatisticsEngine:
+    """Compute, cache and optionally persist database statistics"""
+
+    def __init__(self, refresh_interval: float = 60, persist_summary: bool = False,
+                 background_refresh: bool = False):
+        """
+        Initialize engine
+
+        Args:
+            refresh_interval: Max age (seconds) of cached statistics
+            persist_summary: Store snapshots in the statistics_summary table
+                             so other processes can reuse them
+            background_refresh: Recompute on a timer thread instead of on read
+        """
+        self.refresh_interval = refresh_interval
+        self.persist_summary = persist_summary
+        self.background_refresh = background_refresh
+
+        self._stats = None
+        self._stats_at = 0.0  # time.monotonic() of the cached snapshot
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # Single compute at a time
+
+        self._thread = None
+        self._thread_lock = threading.Lock()  # Guards starting/stopping the refresher
+        self._stop_event = threading.Event()
+
+    # ==================== COMPUTE ====================
+
+    def compute(self, db) -> Dict:
+        """
+        Compute all statistics (2 queries)
+
+        Args:
+            db: Active database session
+
+        Returns:
+            dict: {'patients': {...}, 'doctors': {...}, 'records': {...},
+                   'active_cards': int, 'computed_at': str}
+        """
+        # 1) One scan of patients - totals, gender, NFC, age and blood types
+        blood_types = list(BloodType)
+        patient_row = db.execute(
+            select(
+                func.count(Patient.id),
+                _count_if(Patient.gender == Gender.Male),
+                _count_if(Patient.gender == Gender.Female),
+                _count_if(Patient.nfc_card_assigned == True),
+                func.avg(Patient.age),
+                func.min(Patient.age),
+                func.max(Patient.age),
+                *[_count_if(Patient.blood_type == bt) for bt in blood_types]
+            )
+        ).one()
+
+        # 2) Every other table count as scalar subqueries in one SELECT
+        record_names = list(RECORD_COUNTS)
+        count_row = db.execute(
+            select(
+                select(func.count()).select_from(Doctor).scalar_subquery(),
+                select(func.count()).select_from(User).where(
+                    User.role == UserRole.doctor
+                ).scalar_subquery(),
+                select(func.count()).select_from(CurrentMedication).where(
+                    CurrentMedication.is_active == True
+                ).scalar_subquery(),
+                select(func.count()).select_from(NFCCard).where(
+                    NFCCard.is_active == True
+                ).scalar_subquery(),
+                *[
+                    select(func.count()).select_from(RECORD_COUNTS[name]).scalar_subquery()
+                    for name in record_names
+                ]
+            )
+        ).one()
+
+        total, male, female, with_nfc, avg_age, min_age, max_age = patient_row[:7]
+        records = dict(zip(record_names, (int(c or 0) for c in count_row[4:])))
+        records['active_medications'] = int(count_row[2] or 0)
+
+        return {
+            'patients': {
+                'total': int(total or 0),
+                'male': int(male),
+                'female': int(female),
+                'with_nfc': int(with_nfc),
+                'avg_age': float(avg_age) if avg_age is not None else 0,
+                'min_age': min_age or 0,
+                'max_age': max_age or 0,
+                'blood_type_distribution': {
+                    bt.value: int(count) for bt, count in zip(blood_types, patient_row[7:])
+                }
+            },
+            'doctors': {
+                'total': int(count_row[0] or 0),       # doctors table
+                'user_accounts': int(count_row[1] or 0)  # users with role doctor
+            },
+            'records': records,
+            'active_cards': int(count_row[3] or 0),
+            'computed_at': datetime.now().isoformat()
+        }
+
+    def refresh(self) -> Dict:
+        """
+        Recompute statistics now and update cache (and summary table)
+
+        Returns:
+            dict: Fresh statistics
+        """
+        with self._refresh_lock:
+            started = time.perf_counter()
+            db = get_db()
+            try:
+                stats = self.compute(db)
+                compute_ms = (time.perf_counter() - started) * 1000
+
+                if self.persist_summary:
+                    self._save_summary(db, stats, compute_ms)
+            finally:
+                db.close()
+
+            self._store(stats)
+            return stats
+
+    # ==================== READ ====================
+
+    def get_statistics(self, force_refresh: bool = False) -> Dict:
+        """
+        Get statistics, recomputing only when older than refresh_interval
+
+        Args:
+            force_refresh: Ignore cache and recompute
+
+        Returns:
+            dict: Statistics (see compute())
+        """
+        if self.background_refresh:
+            self.start_background_refresh()
+
+        if not force_refresh:
+            stats = self._cached(allow_stale=self.background_refresh)
+            if stats is not None:
+                return stats
+
+            if self.persist_summary:
+                stats = self._load_summary()
+                if stats is not None:
+                    self._store(stats)
+                    return copy.deepcopy(stats)
+
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited
+            if not force_refresh:
+                stats = self._cached()
+                if stats is not None:
+                    return stats
+
+        return copy.deepcopy(self.refresh())
+
+    def invalidate(self):
+        """Force the next read to recompute"""
+        with self._lock:
+            self._stats_at = 0.0
+
+    def _cached(self, allow_stale: bool = False) -> Optional[Dict]:
+        """Cached snapshot if fresh enough (or any snapshot if allow_stale)"""
+        with self._lock:
+            if self._stats is None:
+                return None
+            if not allow_stale and time.monotonic() - self._stats_at > self.refresh_interval:
+                return None
+            return copy.deepcopy(self._stats)
+
+    def _store(self, stats: Dict):
+        """Replace cached snapshot"""
+        with self._lock:
+            self._stats = stats
+            self._stats_at = time.monotonic()
+
+    # ==================== SUMMARY TABLE ====================
+
+    def _save_summary(self, db, stats: Dict, compute_ms: float):
+        """Upsert the snapshot into statistics_summary"""
+        try:
+            row = db.query(StatisticsSummary).filter(
+                StatisticsSummary.name == SUMMARY_NAME
+            ).first()
+            if row is None:
+                row = StatisticsSummary(name=SUMMARY_NAME)
+                db.add(row)
+
+            row.payload = stats
+            row.compute_ms = round(compute_ms, 2)
+            row.computed_at = datetime.now()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Error saving statistics summary: {e}")
+
+    def _load_summary(self) -> Optional[Dict]:
+        """Read the persisted snapshot if it is within refresh_interval"""
+        db = get_db()
+        try:
+            row = db.query(StatisticsSummary).filter(
+                StatisticsSummary.name == SUMMARY_NAME
+            ).first()
+            if row is None or row.computed_at is None:
+                return None
+
+            age = (datetime.now() - row.computed_at).total_seconds()
+            if age > self.refresh_interval:
+                return None
+            return row.payload
+        except Exception as e:
+            print(f"❌ Error loading statistics summary: {e}")
+            return None
+        finally:
+            db.close()
+
+    # ==================== BACKGROUND REFRESHER ====================
+
+    def start_background_refresh(self, interval: float = None):
+        """
+        Start a daemon thread that recomputes statistics every interval
+
+        Args:
+            interval: Seconds between refreshes (default: refresh_interval)
+        """
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            interval = interval or self.refresh_interval
+            self._stop_event.clear()
+
+            def run():
+                while not self._stop_event.is_set():
+                    try:
+                        self.refresh()
+                    except Exception as e:
+                        print(f"❌ Statistics refresh failed: {e}")
+                    self._stop_event.wait(interval)
+
+            self._thread = threading.Thread(target=run, name='statistics-refresh', daemon=True)
+            self._thread.start()
+
+    def stop_background_refresh(self):
+        """Stop the refresher thread"""
+        with self._thread_lock:
+            self._stop_event.set()
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+                self._thread = None
+
+
+# Global instance
+statistics_engine = StatisticsEngine(
+    refresh_interval=STATISTICS_SETTINGS.get('refresh_interval_seconds', 60),
+    persist_summary=STATISTICS_SETTINGS.get('persist_summary', False),
+    background_refresh=STATISTICS_SETTINGS.get('background_refresh', False)
+)
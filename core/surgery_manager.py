@@ -7,6 +7,7 @@ Location: core/surgery_manager.py
 
 from core.database import get_db
 from core.models import Surgery
+from core.patient_cache import patient_cache
 from sqlalchemy import desc
 from typing import List, Dict, Optional
 from datetime import datetime, date
@@ -25,6 +26,7 @@ class SurgeryManager:
             db.add(surgery)
             db.commit()
             db.refresh(surgery)
+            patient_cache.invalidate(surgery.patient_national_id)
             return surgery
     
     def get_patient_surgeries(self, national_id: str) -> List[Surgery]:
@@ -71,6 +73,7 @@ class SurgeryManager:
                     setattr(surgery, key, value)
             
             db.commit()
+            patient_cache.invalidate(surgery.patient_national_id)
             return True
     
     def delete_surgery(self, surgery_id: int) -> bool:
@@ -83,8 +86,10 @@ class SurgeryManager:
             if not surgery:
                 return False
             
+            national_id = surgery.patient_national_id
             db.delete(surgery)
             db.commit()
+            patient_cache.invalidate(national_id)
             return True
     
     def get_surgery_count(self, national_id: str) -> int:
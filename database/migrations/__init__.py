@@ -9,6 +9,7 @@ from database.migrations.migrate_visits import migrate_visits
 from database.migrations.migrate_lab_results import migrate_lab_results
 from database.migrations.migrate_imaging import migrate_imaging
 from database.migrations.migrate_cards import migrate_cards
+from database.migrations.migrate_indexes import migrate_indexes, verify_indexes
 
 __all__ = [
     'migrate_users',
@@ -16,5 +17,7 @@ __all__ = [
     'migrate_visits',
     'migrate_lab_results',
     'migrate_imaging',
-    'migrate_cards'
+    'migrate_cards',
+    'migrate_indexes',
+    'verify_indexes'
 ]
\ No newline at end of file
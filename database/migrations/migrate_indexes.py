@@ -0,0 +1,160 @@
+"""
+Add composite (patient_national_id, date) indexes to patient history tables
+Indexes are defined in core/models.py; this script adds the missing ones to
+an existing database (online on MySQL) and verifies them with EXPLAIN
+Location: database/migrations/migrate_indexes.py
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import inspect, select, desc, text
+from database.connection import engine
+from core.models import (
+    Visit, LabResult, ImagingResult, Surgery, Hospitalization, Vaccination,
+    Allergy, ChronicDisease, CurrentMedication
+)
+
+
+# Manager access pattern per table: WHERE patient_national_id = ? ORDER BY ... DESC
+ACCESS_PATTERNS = [
+    (Visit, (Visit.visit_date, Visit.visit_time)),
+    (LabResult, (LabResult.test_date,)),
+    (ImagingResult, (ImagingResult.imaging_date,)),
+    (Surgery, (Surgery.surgery_date,)),
+    (Hospitalization, (Hospitalization.admission_date,)),
+    (Vaccination, (Vaccination.date_administered,)),
+    (Allergy, (Allergy.date_identified,)),
+    (ChronicDisease, (ChronicDisease.date_diagnosed,)),
+    (CurrentMedication, (CurrentMedication.start_date,)),
+]
+
+
+def _composite_indexes(model):
+    """Multi-column indexes declared on a model"""
+    return [index for index in model.__table__.indexes if len(index.columns) > 1]
+
+
+def migrate_indexes():
+    """
+    Create missing composite indexes
+
+    MySQL builds them with ALGORITHM=INPLACE, LOCK=NONE so the tables stay
+    readable and writable while the index is built.
+
+    Returns:
+        (success: bool, message: str, count: int)
+    """
+    print("\n" + "="*60)
+    print("🗂️  ADDING COMPOSITE INDEXES")
+    print("="*60)
+
+    created_count = 0
+    skipped_count = 0
+
+    try:
+        inspector = inspect(engine)
+
+        for model, _ in ACCESS_PATTERNS:
+            table = model.__tablename__
+            existing = {index['name'] for index in inspector.get_indexes(table)}
+
+            for index in _composite_indexes(model):
+                if index.name in existing:
+                    print(f"  ⏭️  Exists: {table}.{index.name}")
+                    skipped_count += 1
+                    continue
+
+                columns = ', '.join(column.name for column in index.columns)
+                with engine.begin() as conn:
+                    if engine.dialect.name == 'mysql':
+                        conn.execute(text(
+                            f"CREATE INDEX {index.name} ON {table} ({columns}) "
+                            "ALGORITHM=INPLACE LOCK=NONE"
+                        ))
+                    else:
+                        index.create(bind=conn)
+
+                print(f"  ✅ Created: {table}.{index.name} ({columns})")
+                created_count += 1
+
+        print("\n✅ Index migration complete!")
+        print(f"   Created: {created_count}")
+        print(f"   Skipped: {skipped_count}")
+
+        return True, f"Successfully created {created_count} indexes", created_count
+
+    except Exception as e:
+        error_msg = f"❌ Error during index migration: {str(e)}"
+        print(error_msg)
+        import traceback
+        traceback.print_exc()
+        return False, error_msg, created_count
+
+
+def _explain(conn, statement):
+    """
+    Run EXPLAIN for a statement
+
+    Returns:
+        (index_name or None, plan text)
+    """
+    sql = str(statement.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+
+    if engine.dialect.name == 'sqlite':
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).mappings().all()
+        plan = ' | '.join(row['detail'] for row in rows)
+        marker = 'USING INDEX '
+        if marker in plan:
+            return plan.split(marker, 1)[1].split()[0], plan
+        return None, plan
+
+    rows = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    row = rows[0]
+    plan = f"type={row.get('type')} key={row.get('key')} rows={row.get('rows')} extra={row.get('Extra')}"
+    return row.get('key'), plan
+
+
+def verify_indexes(national_id: str = '00000000000000'):
+    """
+    EXPLAIN each manager history query and check it uses the composite index
+
+    Args:
+        national_id: Any National ID (the plan does not depend on it)
+
+    Returns:
+        bool: True if every query uses its composite index
+    """
+    print("\n" + "="*60)
+    print("🔍 VERIFYING INDEX USAGE (EXPLAIN)")
+    print("="*60)
+
+    all_ok = True
+    with engine.connect() as conn:
+        for model, order_columns in ACCESS_PATTERNS:
+            statement = select(model).where(
+                model.patient_national_id == national_id
+            ).order_by(*[desc(column) for column in order_columns]).limit(50)
+
+            expected = {index.name for index in _composite_indexes(model)}
+            used, plan = _explain(conn, statement)
+
+            if used in expected:
+                print(f"  ✅ {model.__tablename__}: {used}")
+            else:
+                print(f"  ❌ {model.__tablename__}: expected {', '.join(sorted(expected))}, got {used}")
+                all_ok = False
+            print(f"     {plan}")
+
+    print(f"\n{'✅ All history queries use composite indexes' if all_ok else '❌ Some queries do not use composite indexes'}")
+    return all_ok
+
+
+if __name__ == "__main__":
+    # Run standalone
+    success, message, count = migrate_indexes()
+    if success:
+        success = verify_indexes()
+    sys.exit(0 if success else 1)
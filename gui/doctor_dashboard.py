@@ -267,8 +267,7 @@ class DoctorDashboard(ctk.CTkToplevel):
 
             # Get stats
             try:
-                all_patients = patient_manager.get_all_patients()
-                total_patients = len(all_patients)
+                total_patients = patient_manager.get_patient_count()
             except:
                 total_patients = 0
 
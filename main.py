@@ -5,12 +5,18 @@
 import customtkinter as ctk
 from gui.login_window import LoginWindow
 from gui.styles import setup_theme
+from config.hardware_config import CARD_REGISTRY_CONFIG
+from core.card_registry import card_registry
 
 def main():
     """Main application entry point"""
     # Setup theme
     setup_theme()
 
+    # Load NFC card UIDs into memory while the login window opens
+    if CARD_REGISTRY_CONFIG.get('warm_on_startup', True):
+        card_registry.warm_in_background()
+
     # Create and run login window
     app = LoginWindow()
     app.mainloop()
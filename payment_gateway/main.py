@@ -5,11 +5,14 @@ Main FastAPI application that receives data from external healthcare providers
 Port: 8000
 Author: Youssef Mekkkawy
 """
-from fastapi import FastAPI, HTTPException, Depends, Header, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional, List
 from datetime import datetime
+import anyio
+import asyncio
+import json
 import uvicorn
 import sys
 from pathlib import Path
@@ -17,6 +20,13 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from config.database_config import GATEWAY_BULK_SETTINGS
+from core.api_access_log import api_access_log, AccessLogMiddleware
+from core.async_database import dispose_async_engine
+from core.gateway_store import gateway_store, validate_submission
+from core.ingest_queue import ingest_queue
+from sqlalchemy.exc import OperationalError
+
 app = FastAPI(
     title="MedLink Core API",
     description="Central medical records management system - Receives data from hospitals, labs, and imaging centers",
@@ -34,17 +44,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# ==================== IN-MEMORY STORAGE ====================
-# In production, this would be in MySQL database
-# For demo, we use simple dictionaries
+# Times every request; provider requests go to the access log
+app.add_middleware(AccessLogMiddleware)
 
-PROVIDERS = {}  # Registered healthcare providers
-API_TOKENS = {}  # Provider API tokens
-PATIENTS_DATA = {}  # Patient medical records
-API_LOGS = []  # API access logs
+# ==================== STORAGE ====================
+# Providers, tokens and submitted records are stored in the database
+# (core/gateway_store.py) - shared by all uvicorn workers, kept across restarts.
+# API access logs: core/api_access_log.py
 
-# Initialize with sample providers
-PROVIDERS = {
+# Sample providers (seeded into an empty database on startup)
+SAMPLE_PROVIDERS = {
     1: {
         "id": 1,
         "name": "Cairo Lab",
@@ -79,8 +88,8 @@ PROVIDERS = {
     }
 }
 
-# Initialize with sample API tokens
-API_TOKENS = {
+# Sample API tokens (seeded with the providers)
+SAMPLE_TOKENS = {
     "CAIRO_LAB_abc123def456": {
         "provider_id": 1,
         "provider_name": "Cairo Lab",
@@ -119,9 +128,24 @@ API_TOKENS = {
     }
 }
 
+
+@app.on_event("startup")
+async def startup():
+    """Create gateway tables, seed the sample providers and start the ingest consumers"""
+    await gateway_store.init(list(SAMPLE_PROVIDERS.values()), list(SAMPLE_TOKENS.values()))
+    ingest_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Write pending submissions and close pooled connections"""
+    await ingest_queue.stop()
+    await gateway_store.close()
+    await api_access_log.close()
+    await dispose_async_engine()
+
 # ==================== SECURITY ====================
 
-def verify_api_token(authorization: str = Header(None)):
+async def verify_api_token(authorization: str = Header(None)):
     """Verify provider API token"""
     if not authorization:
         raise HTTPException(
@@ -132,13 +156,16 @@ def verify_api_token(authorization: str = Header(None)):
     # Extract token (format: "Bearer TOKEN" or just "TOKEN")
     token = authorization.replace("Bearer ", "").strip()
     
-    if token not in API_TOKENS:
+    token_info = await gateway_store.get_token(token)
+    
+    if token_info is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API token"
         )
     
-    token_info = API_TOKENS[token]
+    # Log this request under the provider (even if it fails below)
+    api_access_log.annotate(provider_id=token_info["provider_id"], provider_name=token_info["provider_name"])
     
     if token_info["status"] != "active":
         raise HTTPException(
@@ -152,19 +179,55 @@ def verify_api_token(authorization: str = Header(None)):
     return token_info
 
 def log_api_access(token_info: dict, endpoint: str, patient_id: str = None):
-    """Log API access for audit trail"""
-    log_entry = {
-        "timestamp": datetime.now().isoformat(),
-        "provider_id": token_info["provider_id"],
-        "provider_name": token_info["provider_name"],
-        "endpoint": endpoint,
-        "patient_id": patient_id
-    }
-    API_LOGS.append(log_entry)
-    
-    # Keep only last 1000 logs
-    if len(API_LOGS) > 1000:
-        API_LOGS.pop(0)
+    """Log API access for audit trail (timed by AccessLogMiddleware)"""
+    if not api_access_log.annotate(provider_id=token_info["provider_id"],
+                                   provider_name=token_info["provider_name"],
+                                   endpoint=endpoint, patient_id=patient_id):
+        api_access_log.record(token_info["provider_id"], token_info["provider_name"], endpoint, patient_id)
+
+async def store_submission(record_type: str, token_info: dict, data: dict,
+                           idempotency_key: str = None) -> dict:
+    """
+    Store a submission (group-committed with concurrent requests)
+
+    A retry with the same Idempotency-Key header (or the same "external_id"
+    for this record type) returns the originally stored record.
+    """
+    try:
+        return await gateway_store.submit(record_type, token_info, data, idempotency_key)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        print(f"❌ Could not store {record_type}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Storage temporarily unavailable - please retry"
+        )
+
+async def enqueue_submission(record_type: str, endpoint: str, token_info: dict, data: dict,
+                             idempotency_key: str = None) -> JSONResponse:
+    """Queue a validated submission and answer 202 with its tracking ID"""
+    try:
+        job = await ingest_queue.enqueue(record_type, token_info, data, idempotency_key)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        print(f"❌ Could not queue {record_type}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Ingest queue unavailable - please retry"
+        )
+
+    log_api_access(token_info, endpoint, data.get("patient_national_id"))
+
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content={
+        "success": True,
+        "message": "Submission accepted for processing",
+        "tracking_id": job["tracking_id"],
+        "status": job["status"],
+        "status_url": f"/api/ingest/{job['tracking_id']}",
+        "patient_id": data.get("patient_national_id")
+    })
 
 # ==================== ROUTES ====================
 
@@ -187,11 +250,14 @@ async def root():
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
+    providers = await gateway_store.list_providers()
+    tokens = await gateway_store.list_tokens()
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "providers_registered": len(PROVIDERS),
-        "active_tokens": len([t for t in API_TOKENS.values() if t["status"] == "active"])
+        "providers_registered": len(providers),
+        "active_tokens": len([t for t in tokens if t["status"] == "active"]),
+        "storage": gateway_store.stats()
     }
 
 # ==================== PROVIDER MANAGEMENT ====================
@@ -199,24 +265,27 @@ async def health_check():
 @app.get("/api/providers")
 async def list_providers():
     """List all registered healthcare providers"""
+    providers = await gateway_store.list_providers()
     return {
-        "total": len(PROVIDERS),
-        "providers": list(PROVIDERS.values())
+        "total": len(providers),
+        "providers": providers
     }
 
 @app.get("/api/providers/{provider_id}")
 async def get_provider(provider_id: int):
     """Get specific provider details"""
-    if provider_id not in PROVIDERS:
+    provider = await gateway_store.get_provider(provider_id)
+    if provider is None:
         raise HTTPException(status_code=404, detail="Provider not found")
     
-    return PROVIDERS[provider_id]
+    return provider
 
 @app.get("/api/tokens")
 async def list_tokens():
     """List all API tokens (admin only - for demo)"""
+    tokens = await gateway_store.list_tokens()
     return {
-        "total": len(API_TOKENS),
+        "total": len(tokens),
         "tokens": [
             {
                 "provider_name": t["provider_name"],
@@ -224,7 +293,7 @@ async def list_tokens():
                 "permissions": t["permissions"],
                 "status": t["status"]
             }
-            for t in API_TOKENS.values()
+            for t in tokens
         ]
     }
 
@@ -233,7 +302,8 @@ async def list_tokens():
 @app.post("/api/external/lab-results")
 async def submit_lab_results(
     data: dict,
-    token_info: dict = Depends(verify_api_token)
+    token_info: dict = Depends(verify_api_token),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
     Receive lab results from external laboratory
@@ -274,27 +344,10 @@ async def submit_lab_results(
     
     patient_id = data["patient_national_id"]
     
-    # Initialize patient data if not exists
-    if patient_id not in PATIENTS_DATA:
-        PATIENTS_DATA[patient_id] = {
-            "national_id": patient_id,
-            "lab_results": [],
-            "imaging_results": [],
-            "visits": [],
-            "surgeries": [],
-            "hospitalizations": [],
-            "prescriptions": []
-        }
-    
-    # Add lab result
-    lab_result = {
-        "id": len(PATIENTS_DATA[patient_id]["lab_results"]) + 1,
-        "submitted_by": token_info["provider_name"],
-        "submitted_at": datetime.now().isoformat(),
-        **data
-    }
+    if ingest_queue.enabled:
+        return await enqueue_submission("lab_results", "/api/external/lab-results", token_info, data, idempotency_key)
     
-    PATIENTS_DATA[patient_id]["lab_results"].append(lab_result)
+    lab_result = await store_submission("lab_results", token_info, data, idempotency_key)
     
     # Log access
     log_api_access(token_info, "/api/external/lab-results", patient_id)
@@ -302,7 +355,7 @@ async def submit_lab_results(
     return {
         "success": True,
         "message": "Lab results submitted successfully",
-        "result_id": lab_result["id"],
+        "result_id": lab_result["record_id"],
         "patient_id": patient_id,
         "provider": token_info["provider_name"]
     }
@@ -310,7 +363,8 @@ async def submit_lab_results(
 @app.post("/api/external/imaging")
 async def submit_imaging(
     data: dict,
-    token_info: dict = Depends(verify_api_token)
+    token_info: dict = Depends(verify_api_token),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
     Receive imaging results from imaging centers
@@ -339,38 +393,24 @@ async def submit_imaging(
     
     patient_id = data["patient_national_id"]
     
-    if patient_id not in PATIENTS_DATA:
-        PATIENTS_DATA[patient_id] = {
-            "national_id": patient_id,
-            "lab_results": [],
-            "imaging_results": [],
-            "visits": [],
-            "surgeries": [],
-            "hospitalizations": [],
-            "prescriptions": []
-        }
-    
-    imaging_result = {
-        "id": len(PATIENTS_DATA[patient_id]["imaging_results"]) + 1,
-        "submitted_by": token_info["provider_name"],
-        "submitted_at": datetime.now().isoformat(),
-        **data
-    }
+    if ingest_queue.enabled:
+        return await enqueue_submission("imaging_results", "/api/external/imaging", token_info, data, idempotency_key)
     
-    PATIENTS_DATA[patient_id]["imaging_results"].append(imaging_result)
+    imaging_result = await store_submission("imaging_results", token_info, data, idempotency_key)
     log_api_access(token_info, "/api/external/imaging", patient_id)
     
     return {
         "success": True,
         "message": "Imaging results submitted successfully",
-        "result_id": imaging_result["id"],
+        "result_id": imaging_result["record_id"],
         "patient_id": patient_id
     }
 
 @app.post("/api/external/visits")
 async def submit_visit(
     data: dict,
-    token_info: dict = Depends(verify_api_token)
+    token_info: dict = Depends(verify_api_token),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Receive medical visit records from hospitals"""
     if "submit_visits" not in token_info["permissions"]:
@@ -380,37 +420,23 @@ async def submit_visit(
     if not patient_id:
         raise HTTPException(status_code=400, detail="Missing patient_national_id")
     
-    if patient_id not in PATIENTS_DATA:
-        PATIENTS_DATA[patient_id] = {
-            "national_id": patient_id,
-            "lab_results": [],
-            "imaging_results": [],
-            "visits": [],
-            "surgeries": [],
-            "hospitalizations": [],
-            "prescriptions": []
-        }
-    
-    visit = {
-        "id": len(PATIENTS_DATA[patient_id]["visits"]) + 1,
-        "submitted_by": token_info["provider_name"],
-        "submitted_at": datetime.now().isoformat(),
-        **data
-    }
+    if ingest_queue.enabled:
+        return await enqueue_submission("visits", "/api/external/visits", token_info, data, idempotency_key)
     
-    PATIENTS_DATA[patient_id]["visits"].append(visit)
+    visit = await store_submission("visits", token_info, data, idempotency_key)
     log_api_access(token_info, "/api/external/visits", patient_id)
     
     return {
         "success": True,
         "message": "Visit record submitted successfully",
-        "visit_id": visit["id"]
+        "visit_id": visit["record_id"]
     }
 
 @app.post("/api/external/surgeries")
 async def submit_surgery(
     data: dict,
-    token_info: dict = Depends(verify_api_token)
+    token_info: dict = Depends(verify_api_token),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Receive surgery records from hospitals"""
     if "submit_surgeries" not in token_info["permissions"]:
@@ -420,37 +446,23 @@ async def submit_surgery(
     if not patient_id:
         raise HTTPException(status_code=400, detail="Missing patient_national_id")
     
-    if patient_id not in PATIENTS_DATA:
-        PATIENTS_DATA[patient_id] = {
-            "national_id": patient_id,
-            "lab_results": [],
-            "imaging_results": [],
-            "visits": [],
-            "surgeries": [],
-            "hospitalizations": [],
-            "prescriptions": []
-        }
-    
-    surgery = {
-        "id": len(PATIENTS_DATA[patient_id]["surgeries"]) + 1,
-        "submitted_by": token_info["provider_name"],
-        "submitted_at": datetime.now().isoformat(),
-        **data
-    }
+    if ingest_queue.enabled:
+        return await enqueue_submission("surgeries", "/api/external/surgeries", token_info, data, idempotency_key)
     
-    PATIENTS_DATA[patient_id]["surgeries"].append(surgery)
+    surgery = await store_submission("surgeries", token_info, data, idempotency_key)
     log_api_access(token_info, "/api/external/surgeries", patient_id)
     
     return {
         "success": True,
         "message": "Surgery record submitted successfully",
-        "surgery_id": surgery["id"]
+        "surgery_id": surgery["record_id"]
     }
 
 @app.post("/api/external/hospitalizations")
 async def submit_hospitalization(
     data: dict,
-    token_info: dict = Depends(verify_api_token)
+    token_info: dict = Depends(verify_api_token),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Receive hospitalization records"""
     if "submit_hospitalizations" not in token_info["permissions"]:
@@ -460,37 +472,23 @@ async def submit_hospitalization(
     if not patient_id:
         raise HTTPException(status_code=400, detail="Missing patient_national_id")
     
-    if patient_id not in PATIENTS_DATA:
-        PATIENTS_DATA[patient_id] = {
-            "national_id": patient_id,
-            "lab_results": [],
-            "imaging_results": [],
-            "visits": [],
-            "surgeries": [],
-            "hospitalizations": [],
-            "prescriptions": []
-        }
+    if ingest_queue.enabled:
+        return await enqueue_submission("hospitalizations", "/api/external/hospitalizations", token_info, data, idempotency_key)
     
-    hospitalization = {
-        "id": len(PATIENTS_DATA[patient_id]["hospitalizations"]) + 1,
-        "submitted_by": token_info["provider_name"],
-        "submitted_at": datetime.now().isoformat(),
-        **data
-    }
-    
-    PATIENTS_DATA[patient_id]["hospitalizations"].append(hospitalization)
+    hospitalization = await store_submission("hospitalizations", token_info, data, idempotency_key)
     log_api_access(token_info, "/api/external/hospitalizations", patient_id)
     
     return {
         "success": True,
         "message": "Hospitalization record submitted successfully",
-        "hospitalization_id": hospitalization["id"]
+        "hospitalization_id": hospitalization["record_id"]
     }
 
 @app.post("/api/external/prescriptions")
 async def submit_prescription(
     data: dict,
-    token_info: dict = Depends(verify_api_token)
+    token_info: dict = Depends(verify_api_token),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """Receive prescription fulfillment from pharmacies"""
     if "submit_prescriptions" not in token_info["permissions"]:
@@ -500,59 +498,280 @@ async def submit_prescription(
     if not patient_id:
         raise HTTPException(status_code=400, detail="Missing patient_national_id")
     
-    if patient_id not in PATIENTS_DATA:
-        PATIENTS_DATA[patient_id] = {
-            "national_id": patient_id,
-            "lab_results": [],
-            "imaging_results": [],
-            "visits": [],
-            "surgeries": [],
-            "hospitalizations": [],
-            "prescriptions": []
-        }
-    
-    prescription = {
-        "id": len(PATIENTS_DATA[patient_id]["prescriptions"]) + 1,
-        "submitted_by": token_info["provider_name"],
-        "submitted_at": datetime.now().isoformat(),
-        **data
-    }
+    if ingest_queue.enabled:
+        return await enqueue_submission("prescriptions", "/api/external/prescriptions", token_info, data, idempotency_key)
     
-    PATIENTS_DATA[patient_id]["prescriptions"].append(prescription)
+    prescription = await store_submission("prescriptions", token_info, data, idempotency_key)
     log_api_access(token_info, "/api/external/prescriptions", patient_id)
     
     return {
         "success": True,
         "message": "Prescription submitted successfully",
-        "prescription_id": prescription["id"]
+        "prescription_id": prescription["record_id"]
     }
 
+# ==================== BULK SUBMISSION ====================
+
+# Record type -> (required permission, required fields)
+SUBMISSION_RULES = {
+    "lab_results": ("submit_lab_results", ["patient_national_id", "test_type", "results"]),
+    "imaging_results": ("submit_imaging", ["patient_national_id", "imaging_type", "findings"]),
+    "visits": ("submit_visits", ["patient_national_id"]),
+    "surgeries": ("submit_surgeries", ["patient_national_id"]),
+    "hospitalizations": ("submit_hospitalizations", ["patient_national_id"]),
+    "prescriptions": ("submit_prescriptions", ["patient_national_id"])
+}
+
+# Accepted "type" values in bulk lines
+BULK_TYPE_ALIASES = {
+    "lab": "lab_results",
+    "imaging": "imaging_results",
+    "visit": "visits",
+    "surgery": "surgeries",
+    "hospitalization": "hospitalizations",
+    "prescription": "prescriptions",
+    **{record_type: record_type for record_type in SUBMISSION_RULES}
+}
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """Streams results while the request body is still being read"""
+    media_type = "application/x-ndjson"
+
+    async def listen_for_disconnect(self, receive):
+        # The generator reads the body through receive() - don't compete for it
+        await anyio.sleep_forever()
+
+
+async def ndjson_lines(request: Request, max_line_bytes: int):
+    """
+    Split the streamed request body into lines without buffering it
+
+    Yields:
+        tuple: (line number, line bytes or None if longer than max_line_bytes)
+    """
+    buffer = b""
+    line_number = 0
+    too_long = False
+
+    async for chunk in request.stream():
+        lines = (buffer + chunk).split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            line_number += 1
+            yield line_number, None if too_long else line
+            too_long = False
+        if len(buffer) > max_line_bytes:
+            buffer, too_long = b"", True
+
+    if buffer.strip() or too_long:
+        yield line_number + 1, None if too_long else buffer
+
+
+def parse_bulk_line(line: bytes, token_info: dict):
+    """
+    Validate one NDJSON line
+
+    Returns:
+        tuple: (record_type, data, error) - error is None when valid
+    """
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None, None, "Invalid JSON"
+    if not isinstance(data, dict):
+        return None, None, "Line must be a JSON object"
+
+    record_type = BULK_TYPE_ALIASES.get(data.pop("type", None))
+    if record_type is None:
+        return None, None, f"Unknown or missing type (use one of: {', '.join(sorted(BULK_TYPE_ALIASES))})"
+
+    permission, required = SUBMISSION_RULES[record_type]
+    if permission not in token_info["permissions"]:
+        return record_type, None, "Insufficient permissions"
+
+    missing = [field for field in required if data.get(field) in (None, "")]
+    if missing:
+        return record_type, None, f"Missing field: {', '.join(missing)}"
+
+    idempotency_key = data.get("idempotency_key")
+    if idempotency_key is not None and not isinstance(idempotency_key, str):
+        return record_type, None, "idempotency_key must be a string"
+
+    try:
+        validate_submission(record_type, data)
+    except ValueError as e:
+        return record_type, None, str(e)
+
+    return record_type, data, None
+
+
+async def store_bulk_rows(rows: List[dict]) -> list:
+    """
+    Store rows in one transaction; a failed chunk is split in halves down to
+    single rows so one bad record does not reject its neighbours
+
+    Returns:
+        list: Stored row, or an error message, for each input row
+    """
+    try:
+        return await gateway_store.insert_records(rows)
+    except OperationalError as e:
+        # Database unreachable - smaller transactions will not help
+        print(f"❌ Bulk chunk of {len(rows)} records failed: {e}")
+        return ["Storage temporarily unavailable - please retry"] * len(rows)
+    except Exception as e:
+        if len(rows) == 1:
+            print(f"❌ Bulk record could not be stored: {e}")
+            return [f"Record could not be stored ({e.__class__.__name__})"]
+
+    middle = len(rows) // 2
+    return await store_bulk_rows(rows[:middle]) + await store_bulk_rows(rows[middle:])
+
+
+async def bulk_results(request: Request, token_info: dict):
+    """Parse, store (one transaction per chunk) and report every line"""
+    chunk_size = GATEWAY_BULK_SETTINGS['chunk_size']
+    summary = {"lines": 0, "accepted": 0, "rejected": 0}
+    results, rows, pending = [], [], []
+
+    async def write_chunk():
+        if rows:
+            stored = await store_bulk_rows(rows)
+            for result, row, stored_row in zip(pending, rows, stored):
+                if isinstance(stored_row, str):
+                    result.update(success=False, error=stored_row)
+                    continue
+                result["id"] = stored_row["record_id"]
+                if stored_row is not row:
+                    result["replayed"] = True
+        summary["accepted"] += sum(1 for result in results if result["success"])
+        summary["rejected"] += sum(1 for result in results if not result["success"])
+        output = "".join(json.dumps(result) + "\n" for result in results)
+        results.clear()
+        rows.clear()
+        pending.clear()
+        return output
+
+    async for line_number, line in ndjson_lines(request, GATEWAY_BULK_SETTINGS['max_line_bytes']):
+        if line is not None and not line.strip():
+            continue
+        summary["lines"] += 1
+
+        if line is None:
+            record_type, data, error = None, None, "Line too long"
+        else:
+            record_type, data, error = parse_bulk_line(line, token_info)
+
+        if not error:
+            try:
+                row = gateway_store.build_record(record_type, token_info, data, data.pop("idempotency_key", None))
+            except ValueError as e:
+                error = str(e)
+
+        if error:
+            results.append({"line": line_number, "success": False, "type": record_type, "error": error})
+        else:
+            result = {"line": line_number, "success": True, "type": record_type}
+            rows.append(row)
+            pending.append(result)
+            results.append(result)
+
+        if len(results) >= chunk_size:
+            yield await write_chunk()
+
+    yield await write_chunk()
+
+    log_api_access(token_info, "/api/external/bulk")
+    yield json.dumps({"summary": summary}) + "\n"
+
+
+@app.post("/api/external/bulk")
+async def submit_bulk(
+    request: Request,
+    token_info: dict = Depends(verify_api_token)
+):
+    """
+    Receive many records of any type in one streamed NDJSON request
+
+    One JSON object per line with a "type" (lab, imaging, visit, surgery,
+    hospitalization, prescription) and the same fields as the single-record
+    endpoints. An optional "idempotency_key" (or "external_id") makes a
+    line safe to resend:
+    ```
+    {"type": "lab", "patient_national_id": "29501012345678", "test_type": "CBC", "results": {"wbc": 7200}}
+    {"type": "imaging", "patient_national_id": "29501012345678", "imaging_type": "X-Ray", "findings": "Normal"}
+    ```
+
+    The response is NDJSON too: one {"line", "success", "type", "id" | "error"}
+    object per input line ("replayed": true when already stored), written after each chunk is committed, then a
+    final {"summary": {"lines", "accepted", "rejected"}} line.
+    """
+    return NDJSONStreamingResponse(bulk_results(request, token_info))
+
+# ==================== INGEST STATUS ====================
+
+@app.get("/api/ingest/stats")
+async def get_ingest_stats():
+    """Ingest queue counters by job status (admin only - for demo)"""
+    return await asyncio.to_thread(ingest_queue.stats)
+
+@app.get("/api/ingest/{tracking_id}")
+async def get_ingest_status(
+    tracking_id: str,
+    token_info: dict = Depends(verify_api_token)
+):
+    """
+    Processing status of a queued submission
+
+    status: queued, retrying, stored (record_id is set) or dead (error is set -
+    the submission was not stored and must be fixed or resent)
+    """
+    job = await asyncio.to_thread(ingest_queue.get_status, tracking_id, token_info["provider_id"])
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tracking ID not found")
+    return job
+
 # ==================== PATIENT DATA RETRIEVAL ====================
 
 @app.get("/api/patients/{patient_id}")
 async def get_patient_data(patient_id: str):
     """Get all medical data for a patient (for desktop app)"""
-    if patient_id not in PATIENTS_DATA:
+    return await gateway_store.get_patient_records(patient_id)
+
+@app.get("/api/logs")
+async def get_api_logs(
+    provider_id: Optional[int] = None,
+    endpoint: Optional[str] = None,
+    patient_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """
+    Get API access logs (admin only - for demo)
+
+    Without filters the newest entries come from memory; with any filter
+    (provider_id, endpoint, patient_id, start/end ISO time range) the
+    persisted log is searched, newest first.
+    """
+    if provider_id is None and not any([endpoint, patient_id, start, end]):
         return {
-            "patient_id": patient_id,
-            "lab_results": [],
-            "imaging_results": [],
-            "visits": [],
-            "surgeries": [],
-            "hospitalizations": [],
-            "prescriptions": []
+            "total": len(api_access_log.ring),
+            "recent_logs": api_access_log.recent(limit)
         }
     
-    return PATIENTS_DATA[patient_id]
-
-@app.get("/api/logs")
-async def get_api_logs():
-    """Get recent API access logs (admin only - for demo)"""
+    logs = await api_access_log.query(provider_id, endpoint, patient_id, start, end, limit)
     return {
-        "total": len(API_LOGS),
-        "recent_logs": API_LOGS[-50:]  # Last 50 logs
+        "total": len(logs),
+        "recent_logs": logs
     }
 
+@app.get("/api/logs/stats")
+async def get_api_log_stats():
+    """Per-provider request, error and latency counters of this worker (admin only - for demo)"""
+    return api_access_log.stats()
+
 # ==================== PAYMENT WEBHOOK ====================
 
 @app.post("/api/webhooks/payment-success")
@@ -0,0 +1,92 @@
+"""
+Benchmark: exact vs IVF face gallery search on synthetic embeddings
+Usage: python tests/benchmark_face_ann.py [staff_count] [photos_per_person]
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# face_ann_index is NumPy-only - import it without the DeepFace stack
+sys.path.insert(0, str(Path(__file__).parent.parent / 'ai'))
+
+from face_ann_index import IVFIndex
+
+
+DIM = 512
+
+
+def normalize(x):
+    return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+
+def make_gallery(staff, photos, rng):
+    """Identity centres + per-photo noise (similar spread to Facenet512 photos)"""
+    identities = normalize(rng.normal(size=(staff, DIM)).astype(np.float32))
+    gallery = normalize(np.repeat(identities, photos, axis=0)
+                        + rng.normal(scale=0.04, size=(staff * photos, DIM)).astype(np.float32))
+    owners = np.repeat(np.arange(staff), photos)
+    return identities, gallery.astype(np.float32), owners
+
+
+def time_queries(search, queries):
+    started = time.perf_counter()
+    results = [search(q) for q in queries]
+    return results, (time.perf_counter() - started) / len(queries) * 1000
+
+
+def benchmark(staff=5000, photos=4, query_count=500):
+    rng = np.random.default_rng(42)
+    identities, gallery, owners = make_gallery(staff, photos, rng)
+    people = rng.choice(staff, size=query_count)
+    queries = normalize(identities[people]
+                        + rng.normal(scale=0.04, size=(query_count, DIM)).astype(np.float32))
+
+    print("=" * 60)
+    print(f"FACE GALLERY SEARCH - {staff} staff x {photos} photos = {len(gallery)} embeddings")
+    print("=" * 60)
+
+    exact, exact_ms = time_queries(lambda q: int(np.argmax(gallery @ q)), queries)
+    exact_accuracy = np.mean(owners[exact] == people)
+    print(f"\nExact search:          {exact_ms:7.3f} ms/query   identity accuracy {exact_accuracy:.3f}")
+
+    index = IVFIndex(DIM)
+    started = time.perf_counter()
+    index.train(gallery)
+    print(f"IVF training:          {time.perf_counter() - started:7.3f} s "
+          f"({len(index.centroids)} cells)\n")
+
+    print(f"{'nprobe':>8} {'ms/query':>10} {'speedup':>9} {'recall@1':>10} {'accuracy':>10}")
+    for nprobe in (1, 2, 4, 8, 16, 32):
+        approx, ann_ms = time_queries(
+            lambda q: int(index.search(gallery, q, k=1, nprobe=nprobe)[0][0]), queries
+        )
+        recall = np.mean(np.array(approx) == np.array(exact))
+        accuracy = np.mean(owners[approx] == people)
+        print(f"{nprobe:>8} {ann_ms:>10.3f} {exact_ms / ann_ms:>8.1f}x {recall:>10.3f} {accuracy:>10.3f}")
+
+    # Incremental updates (index bookkeeping only - the matrix append is the caller's)
+    new_people = normalize(rng.normal(size=(100, DIM)).astype(np.float32))
+    gallery = np.vstack([gallery, new_people])
+    started = time.perf_counter()
+    for vector in new_people:
+        index.add(vector)
+    add_ms = (time.perf_counter() - started) / len(new_people) * 1000
+
+    keep = np.ones(len(gallery), dtype=bool)
+    keep[:photos] = False  # Remove one staff member
+    started = time.perf_counter()
+    index.remove(keep)
+    remove_ms = (time.perf_counter() - started) * 1000
+    gallery = gallery[keep]
+
+    found = int(index.search(gallery, new_people[0], k=1)[0][0])
+    print(f"\nInsert: {add_ms:.3f} ms/photo   Delete staff member: {remove_ms:.3f} ms   "
+          f"new photo found: {'✅' if found == len(gallery) - len(new_people) else '❌'}")
+
+
+if __name__ == "__main__":
+    staff_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    photos_per_person = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    benchmark(staff_count, photos_per_person)
@@ -0,0 +1,117 @@
+"""
+Card registry / NFC login tests
+A card that is deactivated (or reported lost) must stop logging in, whether
+the change went through NFCManager or straight to the database. Unknown
+UIDs are remembered briefly instead of querying every card table per scan.
+Run: python -m pytest tests/test_card_registry.py
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core.database as database
+from core.models import Base, Patient, PatientCard, NFCCard, CardStatus, Gender, BloodType
+from core.card_registry import card_registry
+from core.auth_manager import AuthManager
+from core.card_manager import card_manager
+from core.medical_managers import nfc_manager
+
+NATIONAL_ID = "29501011234567"
+CARD_UID = "04A1B2C3D4"
+PATIENT_CARD_UID = "04E5F6A7B8"
+
+
+@pytest.fixture
+def auth(monkeypatch):
+    """AuthManager over an in-memory database holding one patient card"""
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, 'engine', engine)
+    database.SessionLocal.configure(bind=engine)
+
+    with database.get_db() as db:
+        db.add(Patient(national_id=NATIONAL_ID, full_name="Ahmed Hassan", date_of_birth=date(1995, 1, 1),
+                       age=30, gender=Gender.Male, blood_type=BloodType.A_POSITIVE, phone="01001234567"))
+        db.add(PatientCard(card_uid=PATIENT_CARD_UID, patient_national_id=NATIONAL_ID, full_name="Ahmed Hassan"))
+        db.commit()
+
+    nfc_manager.register_card({
+        'card_uid': CARD_UID, 'card_type': 'patient',
+        'owner_id': NATIONAL_ID, 'owner_name': "Ahmed Hassan"
+    })
+    card_registry.warm()
+    yield AuthManager()
+    card_registry.stop_polling()
+
+
+def test_active_card_logs_in(auth):
+    success, _, user = auth.login_with_nfc(CARD_UID)
+    assert success
+    assert user['national_id'] == NATIONAL_ID
+
+
+def test_deactivated_card_is_refused(auth):
+    assert auth.login_with_nfc(CARD_UID)[0]
+
+    assert nfc_manager.deactivate_card(CARD_UID)
+
+    success, message, user = auth.login_with_nfc(CARD_UID)
+    assert not success
+    assert user is None
+    assert message == "Card is inactive"
+
+
+def test_card_deactivated_elsewhere_is_refused(auth):
+    """Registry still holds the card as active; login re-checks the database"""
+    with database.get_db() as db:
+        db.query(NFCCard).filter(NFCCard.card_uid == CARD_UID).update({'status': CardStatus.lost})
+        db.commit()
+
+    success, message, _ = auth.login_with_nfc(CARD_UID)
+    assert not success
+    assert message == "Card status: lost"
+    assert card_registry.lookup(CARD_UID, ['nfc_cards']).status == 'lost'
+
+
+def test_poll_picks_up_status_change(auth):
+    with database.get_db() as db:
+        db.query(NFCCard).filter(NFCCard.card_uid == CARD_UID).update({'status': CardStatus.damaged})
+        db.commit()
+
+    assert 'nfc_cards' in card_registry.poll()
+    assert not card_registry.lookup(CARD_UID, ['nfc_cards']).usable
+
+
+def test_patient_card_deactivated_elsewhere_is_refused(auth):
+    assert card_manager.authenticate_card(PATIENT_CARD_UID)[0]
+
+    with database.get_db() as db:
+        db.query(PatientCard).filter(PatientCard.card_uid == PATIENT_CARD_UID).update({'is_active': False})
+        db.commit()
+
+    success, data, _ = card_manager.authenticate_card(PATIENT_CARD_UID)
+    assert not success
+    assert data is None
+    assert card_manager.get_patient_by_card(PATIENT_CARD_UID) is None
+
+
+def test_unknown_uid_is_remembered(auth, monkeypatch):
+    refreshed = []
+    refresh_card = card_registry.refresh_card
+    monkeypatch.setattr(card_registry, 'refresh_card', lambda uid: (refreshed.append(uid), refresh_card(uid)))
+
+    assert card_registry.lookup("FFFFFFFF") is None
+    assert card_registry.lookup("FFFFFFFF") is None
+    assert refreshed == ["FFFFFFFF"]
+
+    nfc_manager.register_card({
+        'card_uid': "FFFFFFFF", 'card_type': 'patient',
+        'owner_id': NATIONAL_ID, 'owner_name': "Ahmed Hassan"
+    })
+    assert card_registry.lookup("FFFFFFFF", ['nfc_cards']).owner_id == NATIONAL_ID
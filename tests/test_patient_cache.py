@@ -0,0 +1,60 @@
+"""
+Patient cache tests
+Cached patient views must be plain data: a patient with allergies has to
+survive the cache's copy-on-read/write after its session is closed.
+Run: python -m pytest tests/test_patient_cache.py
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core.database as database
+from core.models import Base, Patient, Allergy, Disability, Gender, BloodType
+from core.patient_cache import patient_cache
+from core.search_engine import search_engine
+from core.patient_manager import patient_manager
+
+NATIONAL_ID = "29501011234567"
+
+
+@pytest.fixture
+def patient(monkeypatch):
+    """In-memory database holding one patient with an allergy and a disability"""
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(database, 'engine', engine)
+    database.SessionLocal.configure(bind=engine)
+    patient_cache.clear()
+
+    with database.get_db() as db:
+        db.add(Patient(national_id=NATIONAL_ID, full_name="Ahmed Hassan", date_of_birth=date(1995, 1, 1),
+                       age=30, gender=Gender.Male, blood_type=BloodType.A_POSITIVE, phone="01001234567"))
+        db.add(Allergy(patient_national_id=NATIONAL_ID, allergen_name="Penicillin", severity="Severe"))
+        db.add(Disability(patient_national_id=NATIONAL_ID, disability_type="Visual", severity="Mild"))
+        db.commit()
+
+    yield NATIONAL_ID
+    patient_cache.clear()
+
+
+def test_search_caches_allergies_as_plain_data(patient):
+    first = search_engine.search_by_national_id(patient)
+    second = search_engine.search_by_national_id(patient)
+
+    assert first['allergies'][0]['allergen_name'] == "Penicillin"
+    assert first['disabilities_special_needs'][0]['disability_type'] == "Visual"
+    assert second == first
+
+
+def test_cached_copy_is_independent(patient):
+    record = patient_manager.get_patient(patient)
+    record['allergies'].append({'allergen_name': "Latex"})
+
+    cached = patient_manager.get_patient(patient)
+    assert [a['allergen_name'] for a in cached['allergies']] == ["Penicillin"]
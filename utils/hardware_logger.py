@@ -1,10 +1,393 @@
 """
 Hardware event logging system
+Append-only, size-rotated JSON lines segments with a sidecar index per
+segment (time range, sparse time index, event type / user / patient / card
+postings), so logging is one append and queries only read matching records
+
+Location: utils/hardware_logger.py
 """
-from datetime import datetime
-from pathlib import Path
-from core.data_manager import data_manager
+import json
+import os
 import socket
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config.hardware_config import HARDWARE_EVENT_LOG_CONFIG
+from config.settings import BASE_DIR, DATETIME_FORMAT
+
+
+# Event fields with postings in the segment index
+INDEXED_FIELDS = ('event_type', 'user_id', 'patient_national_id', 'card_uid')
+
+
+class SegmentedEventLog:
+    """
+    Append-only event log split into numbered segments
+
+    Files (per segment):
+        00000001.jsonl  one JSON event per line
+        00000001.idx    sidecar index, written when the segment is sealed
+    The active (last) segment's index is kept in memory and rebuilt from the
+    segment on startup.
+    """
+
+    def __init__(self, directory, segment_max_bytes: int = 4 * 1024 * 1024,
+                 retention_days: int = 365, max_segments: int = 0,
+                 time_index_stride: int = 64, fsync: bool = False):
+        """
+        Initialize log (files are opened on first use)
+
+        Args:
+            directory: Segment directory
+            segment_max_bytes: Rotate the active segment at this size
+            retention_days: Delete sealed segments older than this (0 = keep)
+            max_segments: Keep at most this many segments (0 = no limit)
+            time_index_stride: One sparse time index entry per N events
+            fsync: fsync after every event
+        """
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.retention_days = retention_days
+        self.max_segments = max_segments
+        self.time_index_stride = max(1, time_index_stride)
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._segments = []       # Sequence numbers, oldest first
+        self._indexes = {}        # seq -> index (sealed ones loaded lazily)
+        self._active_file = None
+        self._active_size = 0
+
+    # ==================== FILES ====================
+
+    def _data_path(self, seq: int) -> Path:
+        return self.directory / f"{seq:08d}.jsonl"
+
+    def _index_path(self, seq: int) -> Path:
+        return self.directory / f"{seq:08d}.idx"
+
+    @property
+    def _active_seq(self) -> int:
+        return self._segments[-1]
+
+    def _ensure_open(self):
+        """Open the active segment (creating the directory on first use)"""
+        if self._active_file is not None:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._segments = sorted(
+            int(path.stem) for path in self.directory.glob('*.jsonl') if path.stem.isdigit()
+        )
+        if not self._segments:
+            self._segments = [1]
+
+        seq = self._active_seq
+        path = self._data_path(seq)
+        self._truncate_partial_line(path)
+        self._indexes[seq] = self._build_index(path)
+
+        self._active_file = open(path, 'ab')
+        self._active_size = self._active_file.tell()
+        self._apply_retention()
+
+    def _truncate_partial_line(self, path: Path):
+        """Drop a half-written last line left by a crash"""
+        if not path.exists():
+            return
+        with open(path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            data_end = size
+            while data_end > 0:
+                step = min(65536, data_end)
+                f.seek(data_end - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    f.truncate(data_end - step + newline + 1)
+                    return
+                data_end -= step
+            f.truncate(0)
+
+    # ==================== INDEX ====================
+
+    def _new_index(self) -> Dict:
+        return {
+            'count': 0,
+            'first_ts': None,
+            'last_ts': None,
+            'times': [],  # [[timestamp, offset]] every time_index_stride events
+            'postings': {field: {} for field in INDEXED_FIELDS}
+        }
+
+    def _index_event(self, index: Dict, event: Dict, offset: int):
+        timestamp = event.get('timestamp', '')
+        if index['count'] % self.time_index_stride == 0:
+            index['times'].append([timestamp, offset])
+        index['count'] += 1
+        if index['first_ts'] is None:
+            index['first_ts'] = timestamp
+        index['last_ts'] = timestamp
+
+        for field in INDEXED_FIELDS:
+            value = event.get(field)
+            if value is not None:
+                index['postings'][field].setdefault(str(value), []).append(offset)
+
+    def _build_index(self, path: Path) -> Dict:
+        """Index a segment by scanning it (active segment / missing sidecar)"""
+        index = self._new_index()
+        if not path.exists():
+            return index
+
+        offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    self._index_event(index, json.loads(line), offset)
+                except ValueError:
+                    pass  # Corrupt line - skipped by queries too
+                offset += len(line)
+        return index
+
+    def _get_index(self, seq: int) -> Dict:
+        """Index for a segment (sidecar file for sealed segments)"""
+        index = self._indexes.get(seq)
+        if index is not None:
+            return index
+
+        try:
+            with open(self._index_path(seq), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = self._build_index(self._data_path(seq))
+            self._write_index(seq, index)
+
+        self._indexes[seq] = index
+        return index
+
+    def _write_index(self, seq: int, index: Dict):
+        tmp_path = self._index_path(seq).with_suffix('.idx.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_path, self._index_path(seq))
+
+    # ==================== WRITE ====================
+
+    def append(self, event: Dict) -> bool:
+        """
+        Append one event
+
+        Args:
+            event: JSON-serializable event with a 'timestamp' string
+
+        Returns:
+            bool: Success
+        """
+        line = (json.dumps(event, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+        with self._lock:
+            self._ensure_open()
+            if self._active_size and self._active_size + len(line) > self.segment_max_bytes:
+                self._rotate()
+
+            offset = self._active_size
+            self._active_file.write(line)
+            self._active_file.flush()
+            if self.fsync:
+                os.fsync(self._active_file.fileno())
+            self._active_size += len(line)
+
+            self._index_event(self._indexes[self._active_seq], event, offset)
+        return True
+
+    def _rotate(self):
+        """Seal the active segment (write its sidecar index) and start a new one"""
+        seq = self._active_seq
+        self._active_file.close()
+        self._write_index(seq, self._indexes[seq])
+
+        # Sealed indexes are reloaded from disk on demand
+        self._indexes.pop(seq, None)
+
+        new_seq = seq + 1
+        self._segments.append(new_seq)
+        self._indexes[new_seq] = self._new_index()
+        self._active_file = open(self._data_path(new_seq), 'ab')
+        self._active_size = 0
+
+        self._apply_retention()
+
+    def _apply_retention(self):
+        """Delete sealed segments beyond max_segments or older than retention_days"""
+        sealed = self._segments[:-1]
+        expired = []
+
+        if self.max_segments and len(self._segments) > self.max_segments:
+            expired = sealed[:len(self._segments) - self.max_segments]
+
+        if self.retention_days:
+            cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime(DATETIME_FORMAT)
+            for seq in sealed:
+                if seq in expired:
+                    continue
+                last_ts = self._get_index(seq).get('last_ts')
+                if last_ts is not None and last_ts >= cutoff:
+                    break  # Segments are in time order
+                expired.append(seq)
+
+        for seq in expired:
+            for path in (self._data_path(seq), self._index_path(seq)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._segments.remove(seq)
+            self._indexes.pop(seq, None)
+
+    # ==================== QUERY ====================
+
+    def query(self, filters: Dict = None, start: str = None, end: str = None,
+              limit: int = 100) -> List[Dict]:
+        """
+        Get matching events, newest first
+
+        Args:
+            filters: {field: value} on INDEXED_FIELDS
+            start: Minimum timestamp (inclusive, string comparison)
+            end: Maximum timestamp (inclusive, string comparison)
+            limit: Max results
+
+        Returns:
+            List of events
+        """
+        filters = {k: str(v) for k, v in (filters or {}).items() if v is not None}
+        unknown = set(filters) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot filter hardware events by {', '.join(sorted(unknown))}")
+
+        results = []
+        with self._lock:
+            self._ensure_open()
+            for seq in reversed(self._segments):
+                if len(results) >= limit:
+                    break
+                index = self._get_index(seq)
+                if not index['count']:
+                    continue
+                if start and index['last_ts'] < start:
+                    break  # Older segments are all before start
+                if end and index['first_ts'] > end:
+                    continue
+                self._query_segment(seq, index, filters, start, end, limit - len(results), results)
+        return results
+
+    def _query_segment(self, seq: int, index: Dict, filters: Dict, start: Optional[str],
+                       end: Optional[str], limit: int, results: List[Dict]):
+        """Append up to limit matching events from one segment (newest first)"""
+        low, high = self._byte_range(index, start, end)
+
+        def matches(event):
+            timestamp = event.get('timestamp', '')
+            if (start and timestamp < start) or (end and timestamp > end):
+                return False
+            return all(str(event.get(field)) == value for field, value in filters.items())
+
+        found = 0
+        with open(self._data_path(seq), 'rb') as f:
+            if filters:
+                # Intersect postings - read only candidate records
+                candidates = None
+                for field, value in filters.items():
+                    offsets = index['postings'].get(field, {}).get(value)
+                    if not offsets:
+                        return
+                    candidates = set(offsets) if candidates is None else candidates & set(offsets)
+                for offset in sorted(candidates, reverse=True):
+                    if offset < low or (high is not None and offset >= high):
+                        continue
+                    f.seek(offset)
+                    event = self._parse(f.readline())
+                    if event is not None and matches(event):
+                        results.append(event)
+                        found += 1
+                        if found >= limit:
+                            return
+                return
+
+            # No field filters - read the time-bounded byte range only
+            f.seek(low)
+            data = f.read() if high is None else f.read(high - low)
+            for line in reversed(data.splitlines()):
+                event = self._parse(line)
+                if event is not None and matches(event):
+                    results.append(event)
+                    found += 1
+                    if found >= limit:
+                        return
+
+    def _byte_range(self, index: Dict, start: Optional[str], end: Optional[str]):
+        """(low, high) byte offsets that can contain events in [start, end] (high None = EOF)"""
+        times = index['times']
+        keys = [t[0] for t in times]
+        low, high = 0, None
+
+        if start:
+            i = bisect_left(keys, start) - 1
+            if i > 0:
+                low = times[i][1]
+        if end:
+            i = bisect_right(keys, end)
+            if i < len(times):
+                high = times[i][1]
+        return low, high
+
+    @staticmethod
+    def _parse(line: bytes) -> Optional[Dict]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    # ==================== MAINTENANCE ====================
+
+    def close(self):
+        """Close the active segment file"""
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._ensure_open()
+            return {
+                'directory': str(self.directory),
+                'segments': len(self._segments),
+                'active_segment': self._active_seq,
+                'active_bytes': self._active_size,
+                'active_events': self._indexes[self._active_seq]['count']
+            }
+
+
+# Global instance
+hardware_event_log = SegmentedEventLog(
+    BASE_DIR / HARDWARE_EVENT_LOG_CONFIG.get('directory', 'data/hardware_audit_log'),
+    segment_max_bytes=HARDWARE_EVENT_LOG_CONFIG.get('segment_max_bytes', 4 * 1024 * 1024),
+    retention_days=HARDWARE_EVENT_LOG_CONFIG.get('retention_days', 365),
+    max_segments=HARDWARE_EVENT_LOG_CONFIG.get('max_segments', 0),
+    time_index_stride=HARDWARE_EVENT_LOG_CONFIG.get('time_index_stride', 64),
+    fsync=HARDWARE_EVENT_LOG_CONFIG.get('fsync', False)
+)
 
 
 def log_hardware_event(
@@ -37,7 +420,7 @@ def log_hardware_event(
         # Create event record
         event = {
             'event_id': generate_event_id(),
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'timestamp': datetime.now().strftime(DATETIME_FORMAT),
             'event_type': event_type,
             'success': success
         }
@@ -56,23 +439,13 @@ def log_hardware_event(
 
         # Add system information
         event['ip_address'] = get_local_ip()
-        event['device_name'] = socket.gethostname()
+        event['device_name'] = get_device_name()
 
         # Add extra kwargs
         event.update(kwargs)
 
-        # Save to audit log
-        log_data = data_manager.load_data('hardware_audit_log')
-        if 'hardware_events' not in log_data:
-            log_data['hardware_events'] = []
-
-        log_data['hardware_events'].append(event)
-
-        # Keep only last 10,000 events (prevent unlimited growth)
-        if len(log_data['hardware_events']) > 10000:
-            log_data['hardware_events'] = log_data['hardware_events'][-10000:]
-
-        return data_manager.save_data('hardware_audit_log', log_data)
+        # Append to the current segment
+        return hardware_event_log.append(event)
 
     except Exception as e:
         print(f"Failed to log hardware event: {e}")
@@ -85,16 +458,30 @@ def generate_event_id() -> str:
     return f"HW{uuid.uuid4().hex[:8].upper()}"
 
 
+_local_ip = None
+_device_name = None
+
+
 def get_local_ip() -> str:
-    """Get local IP address"""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except:
-        return "127.0.0.1"
+    """Get local IP address (resolved once per process)"""
+    global _local_ip
+    if _local_ip is None:
+        try:
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))
+            _local_ip = s.getsockname()[0]
+            s.close()
+        except:
+            _local_ip = "127.0.0.1"
+    return _local_ip
+
+
+def get_device_name() -> str:
+    """Get host name (resolved once per process)"""
+    global _device_name
+    if _device_name is None:
+        _device_name = socket.gethostname()
+    return _device_name
 
 
 def get_hardware_audit_log(
@@ -103,7 +490,8 @@ def get_hardware_audit_log(
     patient_national_id: str = None,
     start_date: str = None,
     end_date: str = None,
-    limit: int = 100
+    limit: int = 100,
+    card_uid: str = None
 ) -> list:
     """
     Query hardware audit log
@@ -115,34 +503,19 @@ def get_hardware_audit_log(
         start_date: Filter by start date
         end_date: Filter by end date
         limit: Max results
+        card_uid: Filter by NFC card
 
     Returns:
-        List of events
+        List of events (newest first)
     """
-    log_data = data_manager.load_data('hardware_audit_log')
-    events = log_data.get('hardware_events', [])
-
-    # Apply filters
-    filtered = events
-
-    if event_type:
-        filtered = [e for e in filtered if e.get('event_type') == event_type]
-
-    if user_id:
-        filtered = [e for e in filtered if e.get('user_id') == user_id]
-
-    if patient_national_id:
-        filtered = [e for e in filtered if e.get(
-            'patient_national_id') == patient_national_id]
-
-    if start_date:
-        filtered = [e for e in filtered if e.get(
-            'timestamp', '') >= start_date]
-
-    if end_date:
-        filtered = [e for e in filtered if e.get('timestamp', '') <= end_date]
-
-    # Sort by timestamp (newest first)
-    filtered.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-
-    return filtered[:limit]
+    return hardware_event_log.query(
+        filters={
+            'event_type': event_type,
+            'user_id': user_id,
+            'patient_national_id': patient_national_id,
+            'card_uid': card_uid
+        },
+        start=start_date,
+        end=end_date,
+        limit=limit
+    )